@@ -1,26 +1,39 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Literal, Union, Dict
+from typing import Iterator, List, Optional, Literal, Tuple, Union, Dict
+import asyncio
+import hashlib
+import json
 import os
-import io
-import re
-from collections import Counter
+import threading
+import zipfile
+import numpy as np
 
 # Import advanced ML engine
+from app.services.association_rules import resume_transaction
+from app.services.cache import LRUCache
+from app.services.catalog import CatalogWatcher, clean_name, name_sector
 from app.services.ml_engine import ml_engine
-
-try:
-    # Optional dependencies; declared in requirements.txt
-    import PyPDF2  # type: ignore
-except Exception:  # pragma: no cover - optional import
-    PyPDF2 = None  # type: ignore
-
-try:
-    import docx  # python-docx  # type: ignore
-except Exception:  # pragma: no cover - optional import
-    docx = None  # type: ignore
-
+from app.services.confidence_engine import ConfidenceEngine
+from app.services.keyword_automaton import KeywordAutomaton
+from app.services.resume_parser import (
+    PARSER_POOL,
+    PARSE_WORKERS,
+    DocumentTooLarge,
+    ParseTimeout,
+    ParserUnavailable,
+    UploadTooLarge,
+    archive_members,
+    discard_upload,
+    extract_member,
+    is_archive,
+    parse_document,
+    spool_upload,
+)
+from app.services.rule_store import RuleStore
+from app.services.stage_timing import STAGE_STATS, StageTimer
 
 class Recommendation(BaseModel):
     id: str
@@ -52,6 +65,10 @@ class InterestsPayload(BaseModel):
     type: Literal["interests"] = "interests"
 
 
+class BatchRecommendPayload(BaseModel):
+    items: List[Union[InterestsPayload, ResumePayload]]
+
+
 app = FastAPI(title="ML Services", version="1.0.0")
 
 # CORS (align with backend/frontend local dev)
@@ -66,31 +83,92 @@ app.add_middleware(
 
 def load_company_names() -> List[str]:
     """
-    Load company names ONLY from company_database.json.
-    Returns empty list if database cannot be loaded (no hardcoded fallbacks).
+    Company names ONLY from company_database.json, through the catalog the ML engine
+    already loaded (the file is parsed once). Empty if it could not be loaded.
     """
-    import json
-    db_path = os.path.join(os.path.dirname(__file__), "..", "data", "company_database.json")
-    try:
-        with open(os.path.abspath(db_path), "r", encoding="utf-8") as db_file:
-            db_data = json.load(db_file)
-            companies = list(db_data.get("companies", {}).keys())
-            if not companies:
-                print("Warning: company_database.json contains no companies")
-            return companies
-    except FileNotFoundError:
-        print(f"Error: company_database.json not found at {db_path}")
-        return []
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in company_database.json: {e}")
-        return []
-    except Exception as e:
-        print(f"Error: Could not load company database: {e}")
-        return []
+    companies = list(ml_engine.catalog.names)
+    if not companies:
+        print("Warning: company_database.json contains no companies")
+    return companies
 
 
 COMPANY_NAMES = load_company_names()
 
+def _confidence_engine(catalog) -> ConfidenceEngine:
+    """The catalog's scoring engine, mapped from the compiled artifact when it has one"""
+    artifact = catalog.artifact
+    if artifact is not None and "engine_has_info" in artifact:
+        return ConfidenceEngine.from_arrays(catalog.names, artifact)
+    return ConfidenceEngine(catalog.companies)
+
+
+# Catalog compiled once for vectorized confidence scoring in /recommend
+CONFIDENCE_ENGINE = _confidence_engine(ml_engine.catalog)
+
+# Serializes catalog reloads (admin endpoint and file watcher)
+_catalog_lock = threading.Lock()
+
+# Shared secret for /admin endpoints (X-Admin-Token header); unset disables them
+ADMIN_TOKEN = os.environ.get("ML_ADMIN_TOKEN")
+
+
+def reload_catalog(force: bool = False) -> Dict:
+    """
+    Load company_database.json again and swap it in if it changed. Embeddings and
+    indexes are rebuilt off to the side (re-encoding only added/changed companies),
+    then installed by reference; requests keep the catalog they started with.
+    """
+    global CONFIDENCE_ENGINE, COMPANY_NAMES
+    with _catalog_lock:
+        update = ml_engine.prepare_catalog(force=force)
+        if update is None:
+            return {"reloaded": False, "version": ml_engine.catalog_version}
+        engine = _confidence_engine(update.catalog)
+        ml_engine.install_catalog(update)
+        CONFIDENCE_ENGINE = engine
+        COMPANY_NAMES = list(update.catalog.names)
+        summary = {"reloaded": True, "version": update.version, "companies": len(COMPANY_NAMES),
+                   "encoded": update.encoded, **update.diff.summary()}
+        print(f"Reloaded company catalog: {summary}")
+        return summary
+
+
+CATALOG_WATCHER = CatalogWatcher(reload_catalog)
+
+# Association rules from models/association_rules.json (reloaded when republished) or
+# from the engine's incrementally updated miner; see ML_RULES_SOURCE. The miner is only
+# built (replaying the transaction log) on the first reload, at startup or first request
+RULE_STORE = RuleStore(live_source=lambda: ml_engine.rule_miner)
+
+# Non-matching companies kept per class when pruning candidates (>= recommendations returned)
+CANDIDATE_FALLBACK = int(os.environ.get("ML_CANDIDATE_FALLBACK", "3"))
+
+# Approximate mode: stage one of /recommend keeps at most this many candidates (by
+# weighted postings overlap) for confidence scoring, which can drop a company the
+# full scoring would have picked. 0 (the default) scores every matching company and
+# returns exactly the results of scoring the whole catalog
+RECOMMEND_MAX_CANDIDATES = int(os.environ.get("ML_RECOMMEND_MAX_CANDIDATES", "0"))
+
+# /recommend/batch limits: items per request, candidates per score matrix, and matrix
+# cells (candidates × companies), which shrinks the chunk for large catalogs
+BATCH_MAX_ITEMS = int(os.environ.get("ML_BATCH_MAX_ITEMS", "10000"))
+BATCH_CHUNK = int(os.environ.get("ML_BATCH_CHUNK", "256"))
+BATCH_MATRIX_CELLS = int(os.environ.get("ML_BATCH_MATRIX_CELLS", "4000000"))
+
+# /recommend response cache: encoded responses keyed on the normalized payload and the
+# catalog / model / rules versions behind them; 0 disables, TTL in seconds (0 = none)
+RESPONSE_CACHE = LRUCache(
+    int(os.environ.get("ML_RESPONSE_CACHE_SIZE", "4096")),
+    ttl=float(os.environ.get("ML_RESPONSE_CACHE_TTL", "300")),
+)
+_response_cache_version: Optional[Tuple] = None
+_response_cache_lock = threading.Lock()
+
+# /parse_resume/batch limits: resumes per request (files + archive members), and
+# resumes extracted / parsing at once, which bounds memory whatever the archive size
+PARSE_BATCH_MAX_FILES = int(os.environ.get("ML_PARSE_BATCH_MAX_FILES", "500"))
+PARSE_BATCH_CONCURRENCY = int(os.environ.get("ML_PARSE_BATCH_CONCURRENCY", str(max(2, 2 * PARSE_WORKERS))))
+
 # Enhanced sector taxonomy with detailed roles, skills, and benefits
 SECTOR_TO_DETAILS = {
     "Technology / Software / Digital Services": {
@@ -387,226 +465,91 @@ INTEREST_TO_SECTORS = {
 
 
 def _company_sector(company: str) -> str:
-    name = company.lower()
-    
+    # Catalog companies carry the sector inferred from their name
+    record = ml_engine.catalog.get(company)
+    if record is not None:
+        return record.name_sector
     # Remove common suffixes for better matching
-    name_clean = name.replace(" limited", "").replace(" private limited", "").replace(" corporation", "")
-    
-    # Check for finance companies first (most specific)
-    if any(k in name_clean for k in ["hdfc bank", "icici bank", "axis bank", "kotak mahindra bank", "indusind bank", 
-                                    "bajaj finance", "lic housing finance", "power finance corporation", 
-                                    "rural electrification", "shriram finance", "muthoot finance"]):
-        return "Fintech / Banking / Finance"
-    
-    # Check for banking/finance keywords
-    if any(k in name_clean for k in ["bank", "finance", "fintech", "payment", "credit", "lending", "investment", "wealth", "insurance", "mutual fund", "trading", "housing finance"]):
-        return "Fintech / Banking / Finance"
-    
-    # Check for technology companies (including social media and gaming)
-    if any(k in name_clean for k in ["microsoft", "google", "amazon", "meta", "adobe", "oracle", "salesforce", "netflix", "uber", "flipkart", "paytm", "zomato", "swiggy", "oyo", "byju", "unacademy", "vedantu", "upgrad", "cred", "razorpay", "phonepe", "bharatpe", "juspay", "payu", "cashfree", "freshworks", "zoho", "postman", "hashicorp", "docker", "atlassian", "slack", "twilio", "stripe", "shopify", "woocommerce", "magento", "wix", "squarespace", "webflow", "figma", "canva", "notion", "asana", "trello", "miro", "invision", "sketch", "principle", "framer", "spotify", "soundcloud", "bandcamp", "apple", "samsung", "oneplus", "xiaomi", "oppo", "vivo", "realme", "intel", "amd", "nvidia", "qualcomm", "broadcom", "mediatek", "arm", "tcs", "infosys", "wipro", "hcl", "tech mahindra", "accenture", "cognizant", "capgemini", "ibm", "deloitte", "kpmg", "pwc", "ernst", "mckinsey", "bain", "boston consulting", "oliver wyman", "at kearney", "strategy", "booz allen", "youtube", "instagram", "tiktok", "twitter", "linkedin", "snapchat", "pinterest", "reddit", "discord", "twitch", "vimeo", "dailymotion", "unity", "epic games", "unreal engine", "steam", "sony", "nintendo", "valve", "blizzard", "electronic arts", "ubisoft", "rockstar", "activision", "bungie", "riot games", "supercell", "mojang", "roblox", "fortnite", "minecraft", "league of legends", "world of warcraft", "call of duty", "grand theft auto", "fifa", "assassin's creed", "far cry", "watch dogs", "just dance"]):
-        return "Technology / Software / Digital Services"
-    
-    # Check for e-commerce/retail
-    if any(k in name_clean for k in ["retail", "ecommerce", "e-commerce", "consumer", "fmcg", "fashion", "lifestyle", "grocery", "marketplace", "logistics", "supply chain", "merchandising"]):
-        return "E-commerce / Retail / Consumer"
-    
-    # Check for automotive/manufacturing
-    if any(k in name_clean for k in ["auto", "maruti", "mahindra", "bajaj auto", "hero", "tvs", "eicher", "ashok leyland", "hyundai", "kia", "volkswagen", "skoda", "audi", "bmw", "mercedes", "jaguar", "volvo", "ford", "general motors", "chrysler", "jeep", "ram", "dodge", "fiat", "alfa romeo", "maserati", "ferrari", "lamborghini", "bentley", "rolls-royce", "aston martin", "mclaren", "porsche", "lotus", "morgan", "caterham", "tvr", "noble", "koenigsegg", "bugatti", "pagani", "rimac", "l&t", "larsen", "ultratech", "suzuki", "manufactur", "industrial"]):
-        return "Automotive / Manufacturing / Industrial"
-    
-    # Check for energy/oil & gas
-    if any(k in name_clean for k in ["oil", "ongc", "gail", "bharat petroleum", "hpcl", "bpcl", "indian oil", "oil india", "adani", "reliance", "ntpc", "nhpc", "power grid", "nuclear", "energy", "gas", "power", "utilities", "renewable", "solar", "wind", "hydro", "thermal", "coal", "petroleum"]):
-        return "Energy / Oil & Gas / Utilities"
-    
-    # Check for healthcare/pharma
-    if any(k in name_clean for k in ["serum", "pharma", "pharmaceutical", "health", "hospital", "medical", "biotech", "biotechnology", "clinical", "research", "drug", "medicine", "therapeutic", "diagnostic", "vaccine", "biomedical", "life sciences", "healthcare", "wellness"]):
-        return "Healthcare / Pharmaceuticals / Biotech"
-    
-    # Check for consulting
-    if any(k in name_clean for k in ["deloitte", "kpmg", "pwc", "ernst", "mckinsey", "bain", "boston consulting", "oliver wyman", "at kearney", "strategy", "booz allen", "consulting", "advisory", "professional services", "management consulting", "strategy consulting"]):
-        return "Consulting / Professional Services"
-    
-    # Default to technology sector
-    return "Technology / Software / Digital Services"
+    return name_sector(clean_name(company.lower()))
 
 
-@app.get("/health")
-def health():
-    return {"status": "healthy"}
+@app.on_event("startup")
+def warmup_models():
+    # Load heavy NLP backends off the request path; ML_WARMUP=0 defers them to first use
+    if os.environ.get("ML_WARMUP", "1") != "0":
+        ml_engine.start_background_warmup()
+        PARSER_POOL.start()
+        threading.Thread(target=RULE_STORE.reload, name="rule-store-load", daemon=True).start()
+    CATALOG_WATCHER.start()
 
 
-def _extract_text_from_pdf(content_stream: io.BytesIO) -> str:
-    if PyPDF2 is None:
-        return ""
-    try:
-        reader = PyPDF2.PdfReader(content_stream)
-        texts = []
-        for page in getattr(reader, "pages", []):
-            try:
-                texts.append(page.extract_text() or "")
-            except Exception:
-                continue
-        return "\n".join(texts)
-    except Exception:
-        return ""
+@app.on_event("shutdown")
+def stop_parser_pool():
+    PARSER_POOL.shutdown()
+    CATALOG_WATCHER.stop()
 
 
-def _extract_text_from_docx(content_stream: io.BytesIO) -> str:
-    if docx is None:
-        return ""
+@app.post("/admin/reload_catalog")
+def admin_reload_catalog(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """Reload company_database.json now; reports added/changed/removed companies"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ML_ADMIN_TOKEN is not set)")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
     try:
-        document = docx.Document(content_stream)
-        return "\n".join(p.text for p in document.paragraphs if p.text)
-    except Exception:
-        return ""
-
-
-def _extract_text_generic(filename: str, data: bytes, mime: Optional[str]) -> str:
-    ext = (os.path.splitext(filename or "")[1] or "").lower()
-    mime = (mime or "").lower()
-    stream = io.BytesIO(data)
-
-    if ext == ".pdf" or "pdf" in mime:
-        return _extract_text_from_pdf(stream)
-    if ext == ".docx" or "officedocument.wordprocessingml.document" in mime:
-        return _extract_text_from_docx(stream)
-    # Fallback: try decode as text
-    try:
-        return data.decode("utf-8", errors="ignore")
-    except Exception:
-        return ""
-
+        return reload_catalog(force=force)
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not load company catalog: {e}")
 
-def _infer_from_text(text: str) -> dict:
-    """Enhanced resume parsing using advanced ML engine"""
-    try:
-        # Use advanced ML engine for better parsing
-        features = ml_engine.extract_advanced_features(text)
-        skills_with_confidence = ml_engine.extract_skills_with_confidence(text)
-        
-        # Extract skills from confidence-based extraction
-        found_skills = [skill for skill, confidence in skills_with_confidence if confidence > 0.5]
-        
-        # Enhanced interest detection using ML
-        lowered = text.lower()
-        interest_keywords_map = {
-            "data science": ["data", "pandas", "numpy", "ml", "machine", "analytics", "statistics", "analysis"],
-            "ai-ml": ["ml", "machine", "deep", "neural", "ai", "pytorch", "tensorflow", "artificial intelligence"],
-            "web development": ["react", "node", "javascript", "typescript", "css", "html", "frontend", "backend"],
-            "cloud": ["aws", "azure", "gcp", "kubernetes", "docker", "cloud", "devops"],
-            "devops": ["docker", "kubernetes", "ci", "cd", "jenkins", "pipeline", "automation"],
-            "cybersecurity": ["security", "owasp", "vulnerability", "penetration", "threat", "cyber"],
-            "mobile": ["android", "ios", "flutter", "react native", "mobile development"],
-            "product design": ["product design", "ui/ux", "ux", "ui", "design", "wireframe", "prototype", "figma", "sketch", "invision", "framer", "adobe xd", "adobe"],
-            "video editing": ["video editing", "video", "editing", "premiere", "after effects", "final cut", "davinci", "resolve", "film", "cinematography", "motion graphics", "animation", "post production"],
-            "graphic design": ["graphic design", "photoshop", "illustrator", "indesign", "canva", "visual design", "branding", "logo", "typography", "layout"],
-            "content creation": ["content creation", "content", "social media", "youtube", "instagram", "tiktok", "blogging", "writing", "copywriting", "marketing"],
-            "photography": ["photography", "photo", "camera", "lightroom", "photoshop", "portrait", "landscape", "wedding", "fashion", "commercial"],
-            "music production": ["music production", "music", "audio", "sound", "mixing", "mastering", "recording", "studio", "pro tools", "ableton", "logic"],
-            "gaming": ["gaming", "game development", "unity", "unreal", "game design", "level design", "game art", "3d modeling", "animation", "game programming"]
-        }
-
-        inferred_interests = []
-        for label, kws in interest_keywords_map.items():
-            if any((kw in lowered) for kw in kws):
-                inferred_interests.append(label)
-
-        # Enhanced experience and project extraction
-        experience = []
-        projects = []
-        education = []
-
-        for line in lowered.splitlines():
-            line_stripped = line.strip()
-            if not line_stripped:
-                continue
-            if any(h in line_stripped for h in ["experience", "intern", "worked", "company", "employment", "position", "role"]):
-                experience.append(line.strip())
-            if any(h in line_stripped for h in ["project", "built", "developed", "created", "implemented", "designed"]):
-                projects.append(line.strip())
-            if any(h in line_stripped for h in ["b.tech", "btech", "bachelor", "master", "university", "college", "degree", "education", "graduated"]):
-                education.append(line.strip())
-
-        # Location is not parsed from resume - always set to None
-        location = None
 
-        # Ensure at least one interest to avoid downstream errors
-        if not inferred_interests and found_skills:
-            # Map some common skills to interests using ML confidence
-            if any(s in found_skills for s in ["pandas", "numpy", "scikit-learn", "tensorflow", "pytorch"]):
-                inferred_interests.append("ai-ml")
-            if any(s in found_skills for s in ["react", "javascript", "typescript", "html", "css", "node"]):
-                inferred_interests.append("web development")
-            if any(s in found_skills for s in ["aws", "azure", "gcp", "docker", "kubernetes"]):
-                inferred_interests.append("cloud")
-
-        return {
-            "skills": sorted(set(found_skills)),
-            "interests": sorted(set(inferred_interests)),
-            "experience": experience[:20],
-            "projects": projects[:20],
-            "education": education[:20],
-            "location": location,
-            "ml_features": features,  # Include ML-extracted features
-            "skills_confidence": skills_with_confidence
-        }
-    except Exception as e:
-        print(f"Error in advanced parsing: {e}")
-        # Fallback to basic parsing
-        return _basic_infer_from_text(text)
-
-def _basic_infer_from_text(text: str) -> dict:
-    """Basic fallback parsing method"""
-    lowered = text.lower()
-    tokens = re.findall(r"[a-zA-Z][a-zA-Z+.#-]+", lowered)
-    counts = Counter(tokens)
-
-    known_skills = [
-        "python", "java", "javascript", "typescript", "c++", "c#", "go", "rust",
-        "sql", "mongodb", "mysql", "postgres", "aws", "azure", "gcp",
-        "docker", "kubernetes", "linux", "react", "node", "django", "flask",
-        "tensorflow", "pytorch", "scikit-learn", "nlp", "ml", "machine learning",
-        "data science", "pandas", "numpy", "git", "html", "css"
-    ]
+@app.get("/health")
+def health():
+    return {"status": "healthy", "modelsReady": ml_engine.models_ready}
 
-    found_skills = []
-    for skill in known_skills:
-        if " " in skill:
-            if skill in lowered:
-                found_skills.append(skill)
-        else:
-            if counts.get(skill, 0) > 0:
-                found_skills.append(skill)
-
-    # Basic interest mapping
-    inferred_interests = []
-    if any(s in found_skills for s in ["pandas", "numpy", "scikit-learn", "tensorflow", "pytorch"]):
-        inferred_interests.append("ai-ml")
-    if any(s in found_skills for s in ["react", "javascript", "typescript", "html", "css", "node"]):
-        inferred_interests.append("web development")
-    if any(s in found_skills for s in ["aws", "azure", "gcp", "docker", "kubernetes"]):
-        inferred_interests.append("cloud")
 
+@app.get("/metrics/cache")
+def cache_metrics():
+    """Hit rates of the /recommend response cache and the query embedding cache, and embedding batch sizes"""
     return {
-        "skills": sorted(set(found_skills)),
-        "interests": sorted(set(inferred_interests)),
-        "experience": [],
-        "projects": [],
-        "education": [],
-        "location": None,
+        "responseCache": RESPONSE_CACHE.stats(),
+        "embeddingCache": ml_engine.embedding_cache.stats(),
+        "embeddingBatcher": ml_engine.embedding_batcher.stats(),
+        "rules": RULE_STORE.stats(),
     }
 
 
+@app.get("/metrics/pipeline")
+def pipeline_metrics():
+    """Recent per-stage latencies (retrieve, rerank, ...) of the recommendation pipelines"""
+    return STAGE_STATS.snapshot()
+
+
 @app.post("/parse_resume")
 async def parse_resume(file: UploadFile = File(...), file_type: Optional[str] = Form(None)):
     filename = file.filename or "resume"
-    content_bytes = await file.read()
-    await file.close()
-
-    text = _extract_text_generic(filename, content_bytes, file_type or file.content_type)
-    inferred = _infer_from_text(text)
-
-    size_kb = max(1, int(len(content_bytes) / 1024))
+    try:
+        # Streamed in chunks with a hard byte cap; large uploads go to a temp file
+        upload, size = await spool_upload(file)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=f"Resume upload too large: {e}")
+    finally:
+        await file.close()
+
+    # Extraction and NLP inference run in the parser pool so the event loop stays free
+    try:
+        inferred = await PARSER_POOL.run(parse_document, filename, upload, file_type or file.content_type)
+    except ParseTimeout as e:
+        raise HTTPException(status_code=504, detail=f"Resume parsing timed out: {e}")
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=413, detail=f"Resume document too large: {e}")
+    except ParserUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Resume parser unavailable: {e}")
+    finally:
+        discard_upload(upload)
+
+    await asyncio.to_thread(_record_resume, inferred)
+
+    size_kb = max(1, int(size / 1024))
     return {
         "filename": filename,
         "sizeKB": size_kb,
@@ -614,6 +557,146 @@ async def parse_resume(file: UploadFile = File(...), file_type: Optional[str] =
     }
 
 
+def _record_resume(inferred: dict):
+    # Every parsed resume is a transaction for incremental rule mining. It carries no
+    # sector: one inferred from its own interests would only re-learn INTEREST_TO_SECTORS.
+    # Sector/company labels come from feedback (add_feedback) and placements.
+    # Appends to the transaction log; called through asyncio.to_thread
+    try:
+        ml_engine.rule_miner.add(resume_transaction(inferred))
+    except Exception as e:
+        print(f"Warning: Could not record resume transaction: {e}")
+
+
+async def _parse_batch_item(index: int, filename: str, load, mime: Optional[str], archive: Optional[str]) -> dict:
+    """One NDJSON result of /parse_resume/batch: the parsed resume or an error field"""
+    result = {"index": index, "filename": filename}
+    if archive:
+        result["archive"] = archive
+    upload = None
+    try:
+        upload, size = await load()
+        inferred = await PARSER_POOL.run(parse_document, filename, upload, mime)
+        await asyncio.to_thread(_record_resume, inferred)
+        result.update({"sizeKB": max(1, int(size / 1024)), **inferred})
+    except UploadTooLarge as e:
+        result["error"] = f"Resume upload too large: {e}"
+    except DocumentTooLarge as e:
+        result["error"] = f"Resume document too large: {e}"
+    except ParseTimeout as e:
+        result["error"] = f"Resume parsing timed out: {e}"
+    except ParserUnavailable as e:
+        result["error"] = f"Resume parser unavailable: {e}"
+    except Exception as e:
+        print(f"Error parsing {filename} in /parse_resume/batch: {e}")
+        result["error"] = f"Could not parse resume: {e}"
+    finally:
+        if upload is not None:
+            discard_upload(upload)
+    return result
+
+
+async def _parse_batch_sources(files: List[UploadFile], file_type: Optional[str], archives: List[zipfile.ZipFile]):
+    """
+    (filename, loader, mime, archive) per resume: uploaded files and the members of ZIP
+    uploads. Opened archives are appended to archives; the caller closes them.
+    """
+    count = 0
+    for file in files:
+        filename = file.filename or "resume"
+        mime = file_type or file.content_type
+        if not is_archive(filename, mime):
+            count += 1
+            if count > PARSE_BATCH_MAX_FILES:
+                yield filename, None, mime, None
+                continue
+            yield filename, (lambda file=file: spool_upload(file)), mime, None
+            continue
+        try:
+            archive = await asyncio.to_thread(zipfile.ZipFile, file.file)
+            archives.append(archive)
+            members = await asyncio.to_thread(archive_members, archive)
+        except Exception as e:
+            yield filename, e, mime, None
+            continue
+        for info in members:
+            count += 1
+            if count > PARSE_BATCH_MAX_FILES:
+                yield info.filename, None, None, filename
+                continue
+            # Extracted one at a time, only when the item is about to be submitted
+            load = (lambda archive=archive, info=info: asyncio.to_thread(extract_member, archive, info))
+            yield info.filename, load, None, filename
+
+
+def _close_archives(archives: List[zipfile.ZipFile]):
+    # The uploads themselves are closed by the framework; ZipFile leaves a passed file open
+    for archive in archives:
+        try:
+            archive.close()
+        except Exception:
+            pass
+
+
+# In-flight parses of disconnected /parse_resume/batch requests, referenced until they finish
+_ORPHANED_PARSES: set = set()
+
+
+def _finish_orphaned(in_flight: set, archives: List[zipfile.ZipFile]):
+    """Let the parses of a disconnected batch finish with their results dropped, then close its archives"""
+    if not in_flight:
+        _close_archives(archives)
+        return
+
+    async def drain():
+        try:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        finally:
+            _close_archives(archives)
+
+    task = asyncio.ensure_future(drain())
+    _ORPHANED_PARSES.add(task)
+    task.add_done_callback(_ORPHANED_PARSES.discard)
+
+
+async def _parse_batch_results(files: List[UploadFile], file_type: Optional[str]):
+    """NDJSON lines in completion order, with at most PARSE_BATCH_CONCURRENCY resumes in flight"""
+    in_flight = set()
+    archives: List[zipfile.ZipFile] = []
+    index = 0
+    try:
+        async for filename, load, mime, archive in _parse_batch_sources(files, file_type, archives):
+            if load is None or isinstance(load, Exception):
+                error = (f"Batch is limited to {PARSE_BATCH_MAX_FILES} files" if load is None
+                         else f"Could not read ZIP archive: {load}")
+                result = {"index": index, "filename": filename, "error": error}
+                if archive:
+                    result["archive"] = archive
+                index += 1
+                yield json.dumps(result) + "\n"
+                continue
+            in_flight.add(asyncio.create_task(_parse_batch_item(index, filename, load, mime, archive)))
+            index += 1
+            if len(in_flight) >= PARSE_BATCH_CONCURRENCY:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield json.dumps(task.result()) + "\n"
+        while in_flight:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield json.dumps(task.result()) + "\n"
+    finally:
+        # in_flight is only non-empty when the client went away. Cancelling would kill
+        # the workers of running parses, so they finish and nothing new is started.
+        _finish_orphaned(in_flight, archives)
+
+
+@app.post("/parse_resume/batch")
+async def parse_resume_batch(files: List[UploadFile] = File(...), file_type: Optional[str] = Form(None)):
+    """Parse many resumes (files and/or ZIP archives); one NDJSON line per resume as it completes"""
+    return StreamingResponse(_parse_batch_results(files, file_type), media_type="application/x-ndjson")
+
+
 def _normalize_terms(values: List[str]) -> List[str]:
     normed = []
     for v in values or []:
@@ -625,31 +708,41 @@ def _normalize_terms(values: List[str]) -> List[str]:
     return normed
 
 
+# Heuristic interest groupings applied after the direct INTEREST_TO_SECTORS map
+INTEREST_HEURISTIC_SECTORS = [
+    ("IT / Software / Digital Services", ["python", "react", "developer", "engineering", "software", "coding"]),
+    ("Banking, Finance, Insurance", ["bank", "finance", "fintech", "credit"]),
+    ("Oil, Gas & Energy", ["energy", "oil", "gas", "power"]),
+    ("Travel & Hospitality", ["hotel", "tour", "travel", "hospitality"]),
+    ("Retail / FMCG / Consumer Goods", ["retail", "fmcg", "consumer", "sales"]),
+    ("Infrastructure & Construction", ["construction", "infrastructure", "civil"]),
+    ("Metals & Mining", ["mining", "steel", "metal"]),
+    ("Pharmaceuticals & Healthcare", ["pharma", "health", "hospital"]),
+]
+
+# Direct-map keys are labelled ("direct", position in INTEREST_TO_SECTORS) and
+# heuristic keywords ("heuristic", group index) so matches replay in the original order
+_INTEREST_KEYS = list(INTEREST_TO_SECTORS.keys())
+_INTEREST_AUTOMATON = KeywordAutomaton(
+    [(key, ("direct", i)) for i, key in enumerate(_INTEREST_KEYS)]
+    + [(kw, ("heuristic", i)) for i, (_, kws) in enumerate(INTEREST_HEURISTIC_SECTORS) for kw in kws]
+)
+
+
 def _infer_target_sectors(interests: List[str]) -> List[str]:
     targets: List[str] = []
     for term in interests:
-        t = term.lower()
+        labels = _INTEREST_AUTOMATON.find_labels(term.lower())
+        if not labels:
+            continue
         # direct map
-        for key, sectors in INTEREST_TO_SECTORS.items():
-            if key in t:
-                targets.extend(sectors)
+        for kind, i in sorted(labels):
+            if kind == "direct":
+                targets.extend(INTEREST_TO_SECTORS[_INTEREST_KEYS[i]])
         # heuristic groupings
-        if any(k in t for k in ["python", "react", "developer", "engineering", "software", "coding"]):
-            targets.append("IT / Software / Digital Services")
-        if any(k in t for k in ["bank", "finance", "fintech", "credit"]):
-            targets.append("Banking, Finance, Insurance")
-        if any(k in t for k in ["energy", "oil", "gas", "power"]):
-            targets.append("Oil, Gas & Energy")
-        if any(k in t for k in ["hotel", "tour", "travel", "hospitality"]):
-            targets.append("Travel & Hospitality")
-        if any(k in t for k in ["retail", "fmcg", "consumer", "sales"]):
-            targets.append("Retail / FMCG / Consumer Goods")
-        if any(k in t for k in ["construction", "infrastructure", "civil"]):
-            targets.append("Infrastructure & Construction")
-        if any(k in t for k in ["mining", "steel", "metal"]):
-            targets.append("Metals & Mining")
-        if any(k in t for k in ["pharma", "health", "hospital"]):
-            targets.append("Pharmaceuticals & Healthcare")
+        for kind, i in sorted(labels):
+            if kind == "heuristic":
+                targets.append(INTEREST_HEURISTIC_SECTORS[i][0])
     # unique preserve order
     seen = set()
     ordered = []
@@ -660,7 +753,8 @@ def _infer_target_sectors(interests: List[str]) -> List[str]:
     return ordered
 
 
-def _calculate_confidence_score(company: str, interests: List[str], resume_data: Dict = None) -> float:
+def _calculate_confidence_score(company: str, interests: List[str], resume_data: Dict = None,
+                                target_sectors: Optional[List[str]] = None) -> float:
     """
     Calculate confidence score (0.0 to 1.0) based on:
     1. Interest → Sector matching
@@ -668,30 +762,30 @@ def _calculate_confidence_score(company: str, interests: List[str], resume_data:
     3. Overall match quality
     
     Returns confidence as decimal (e.g., 0.88, 0.82, 0.78)
+    Scalar reference for CONFIDENCE_ENGINE, which scores the whole catalog at once.
     """
-    # Get company info from database
-    company_info = ml_engine.company_database.get('companies', {}).get(company, {})
-    if not company_info:
+    # Get company info from the catalog (normalized at load time)
+    record = ml_engine.catalog.get(company)
+    if record is None or not record.info:
         return 0.0  # No confidence if company not in database
     
     confidence_components = []
     
     # 1. Interest → Sector matching (40% weight)
-    company_sector = company_info.get('sector', '')
-    target_sectors = _infer_target_sectors(interests)
+    if target_sectors is None:
+        target_sectors = _infer_target_sectors(interests)
     
     interest_sector_confidence = 0.0
     if target_sectors:
         # Check if company sector matches any target sector
-        company_sector_lower = company_sector.lower()
+        company_sector_lower = record.sector_lower
         
         # Check specializations first (most specific match)
-        company_specializations = company_info.get('specializations', [])
+        company_specializations = record.specializations_lower
         specialization_matches = 0
         for interest in interests:
             interest_lower = interest.lower()
-            for spec in company_specializations:
-                spec_lower = spec.lower()
+            for spec_lower in company_specializations:
                 # Exact match in specialization
                 if interest_lower == spec_lower or (interest_lower in spec_lower and len(interest_lower) > 2):
                     specialization_matches += 1
@@ -721,14 +815,14 @@ def _calculate_confidence_score(company: str, interests: List[str], resume_data:
     
     # 2. Skills → Company required skills matching (50% weight)
     resume_skills = resume_data.get('skills', []) if resume_data else []
-    company_required_skills = company_info.get('required_skills', [])
+    company_required_skills = record.required_skills
     
     skills_confidence = 0.0
     if resume_skills and company_required_skills:
         matched_skills = 0
         exact_matches = 0
         resume_skills_lower = [s.lower().strip() for s in resume_skills]
-        company_skills_lower = [s.lower().strip() for s in company_required_skills]
+        company_skills_lower = record.skills_lower
         
         # Exact matches (higher weight)
         for skill in resume_skills_lower:
@@ -766,14 +860,13 @@ def _calculate_confidence_score(company: str, interests: List[str], resume_data:
     confidence_components.append(('skills_match', skills_confidence, 0.50))
     
     # 3. Interest → Company specializations matching (10% weight)
-    company_specializations = company_info.get('specializations', [])
+    company_specializations = record.specializations_lower
     specialization_confidence = 0.0
     if company_specializations:
         matched_specializations = 0
         for interest in interests:
             interest_lower = interest.lower()
-            for spec in company_specializations:
-                spec_lower = spec.lower()
+            for spec_lower in company_specializations:
                 if interest_lower in spec_lower or spec_lower in interest_lower:
                     matched_specializations += 1
                     break
@@ -808,9 +901,41 @@ def _score_company(company: str, interests: List[str], resume_data: Dict = None)
         # Fallback to basic scoring
         return _basic_company_score(company, interests)
 
+# Brand lists for _basic_company_score, matched in one pass over the company name
+_BASIC_SCORE_BRAND_AUTOMATON = KeywordAutomaton(
+    [(b, "established") for b in ["tcs", "infosys", "wipro", "hcl", "accenture", "cognizant"]]
+    + [(b, "startup") for b in ["freshworks", "zoho", "postman", "razorpay", "phonepe", "cred"]]
+    + [(b, "design") for b in ["figma", "canva", "adobe", "sketch", "invision", "framer", "notion", "miro"]]
+    + [(b, "video") for b in ["adobe", "apple", "netflix", "youtube", "spotify", "canva", "figma", "notion", "miro"]]
+    + [(b, "content") for b in ["netflix", "youtube", "spotify", "instagram", "tiktok", "facebook", "meta",
+                                "twitter", "linkedin", "snapchat"]]
+)
+
+# Interest phrases for _basic_company_score, matched in one pass over the joined interests
+_BASIC_SCORE_INTEREST_AUTOMATON = KeywordAutomaton(
+    [(d, "tech") for d in ["ai-ml", "data science", "web development", "cloud", "devops"]]
+    + [(d, "design") for d in ["product design", "ui/ux", "ux", "ui", "design"]]
+    + [(d, "video") for d in ["video editing", "video", "editing", "premiere", "after effects", "film",
+                              "cinematography", "animation"]]
+    + [(d, "content") for d in ["content creation", "content", "social media", "youtube", "instagram", "tiktok",
+                                "blogging", "marketing"]]
+    + [(d, "gaming") for d in ["gaming", "game development", "unity", "unreal", "game design", "game art",
+                               "3d modeling", "animation"]]
+)
+
+# Exact-name brands: the company name equals the brand or starts with "<brand> "
+_TECH_COMPANIES_EXACT = {"microsoft", "google", "amazon", "meta", "adobe", "oracle", "salesforce"}
+_PREMIUM_COMPANIES_EXACT = {"microsoft", "google", "amazon", "meta", "apple", "netflix", "uber", "spotify"}
+_GAMING_BRANDS_EXACT = {"unity", "unreal", "epic", "nvidia", "amd", "intel", "microsoft", "sony", "nintendo", "steam"}
+
+
 def _basic_company_score(company: str, interests: List[str]) -> int:
     """Basic company scoring fallback"""
-    text = company.lower()
+    record = ml_engine.catalog.get(company)
+    text = record.name_lower if record is not None else company.lower()
+    # "<brand>" and "<brand> ..." both have the brand as first space-separated token
+    first_word = record.first_word if record is not None else text.split(" ", 1)[0]
+    brands = _BASIC_SCORE_BRAND_AUTOMATON.find_labels(text)
     sector = _company_sector(company)
     target_sectors = _infer_target_sectors(interests)
     score = 0
@@ -832,44 +957,40 @@ def _basic_company_score(company: str, interests: List[str]) -> int:
         # Additional scoring for tech companies with tech interests
         # Note: Only check for exact company name matches, not substrings
         # This prevents false matches (e.g., "Google Ads" matching "Google")
-        tech_companies_exact = ["microsoft", "google", "amazon", "meta", "adobe", "oracle", "salesforce"]
-        if any(tech_interest in t for tech_interest in ["ai-ml", "data science", "web development", "cloud", "devops"]):
+        if "tech" in _BASIC_SCORE_INTEREST_AUTOMATON.find_labels(t):
             # Only match if the company name exactly equals or starts with the tech company name
-            if any(text == tc or text.startswith(tc + " ") for tc in tech_companies_exact):
+            if first_word in _TECH_COMPANIES_EXACT:
                 score += 15
     
     # 3. Company size and reputation bonus
     # Note: Only check for exact company name matches, not substrings
-    premium_companies_exact = ["microsoft", "google", "amazon", "meta", "apple", "netflix", "uber", "spotify"]
-    if any(text == pc or text.startswith(pc + " ") for pc in premium_companies_exact):
+    if first_word in _PREMIUM_COMPANIES_EXACT:
         score += 10
-    elif any(established_company in text for established_company in ["tcs", "infosys", "wipro", "hcl", "accenture", "cognizant"]):
+    elif "established" in brands:
         score += 8
     
     # 4. Startup/Innovation bonus for certain interests
-    if any(startup_interest in interests for startup_interest in ["ai-ml", "data science", "blockchain", "fintech"]) and any(startup_company in text for startup_company in ["freshworks", "zoho", "postman", "razorpay", "phonepe", "cred"]):
+    if any(startup_interest in interests for startup_interest in ["ai-ml", "data science", "blockchain", "fintech"]) and "startup" in brands:
         score += 12
     
+    interest_groups = _BASIC_SCORE_INTEREST_AUTOMATON.find_labels(" ".join(interests))
+    
     # 5. Creative interest boosts creative companies
-    if any(d in " ".join(interests) for d in ["product design", "ui/ux", "ux", "ui", "design"]):
-        if any(brand in text for brand in ["figma", "canva", "adobe", "sketch", "invision", "framer", "notion", "miro"]):
-            score += 18
+    if "design" in interest_groups and "design" in brands:
+        score += 18
     
     # 6. Video editing interest boosts video/creative companies
-    if any(d in " ".join(interests) for d in ["video editing", "video", "editing", "premiere", "after effects", "film", "cinematography", "animation"]):
-        if any(brand in text for brand in ["adobe", "apple", "netflix", "youtube", "spotify", "canva", "figma", "notion", "miro"]):
-            score += 20
+    if "video" in interest_groups and "video" in brands:
+        score += 20
     
     # 7. Content creation interest boosts content companies
-    if any(d in " ".join(interests) for d in ["content creation", "content", "social media", "youtube", "instagram", "tiktok", "blogging", "marketing"]):
-        if any(brand in text for brand in ["netflix", "youtube", "spotify", "instagram", "tiktok", "facebook", "meta", "twitter", "linkedin", "snapchat"]):
-            score += 20
+    if "content" in interest_groups and "content" in brands:
+        score += 20
     
     # 8. Gaming interest boosts gaming companies
-    if any(d in " ".join(interests) for d in ["gaming", "game development", "unity", "unreal", "game design", "game art", "3d modeling", "animation"]):
+    if "gaming" in interest_groups:
         # Only match exact company names, not substrings
-        gaming_brands = ["unity", "unreal", "epic", "nvidia", "amd", "intel", "microsoft", "sony", "nintendo", "steam"]
-        if any(text == gb or text.startswith(gb + " ") for gb in gaming_brands):
+        if first_word in _GAMING_BRANDS_EXACT:
             score += 20
 
     return max(0, min(100, score))
@@ -973,7 +1094,7 @@ def _make_recommendation(company: str, confidence_score: float, location_hint: O
     
     # Get company info from database
     company_info = ml_engine.company_database.get('companies', {}).get(company, {})
-    sector = company_info.get('sector', _company_sector(company))
+    sector = company_info['sector'] if 'sector' in company_info else _company_sector(company)
     
     # Select role based on company-specific information and interests
     role = _select_role_for_company(company, sector, interests)
@@ -1052,31 +1173,128 @@ def _make_recommendation(company: str, confidence_score: float, location_hint: O
     )
 
 
+def _recommend_inputs(payload: Union[InterestsPayload, ResumePayload]) -> Tuple[List[str], Optional[str], Dict]:
+    """(interests, location, resume_data) of a /recommend payload; HTTPException when unusable"""
+    # Determine interests list and optional location from payload
+    if payload.type == "interests":
+        interests = _normalize_terms(payload.interests)
+        location = None
+    elif payload.type == "resume":
+        interests = _normalize_terms(payload.interests)
+        location = payload.location
+    else:
+        raise HTTPException(status_code=400, detail="Invalid payload type")
+
+    if not interests:
+        raise HTTPException(status_code=400, detail="No interests provided")
+
+    # Create resume data structure for confidence calculation
+    resume_data = {
+        'skills': payload.skills if hasattr(payload, 'skills') else [],
+        'interests': interests,
+        'experience': payload.experience if hasattr(payload, 'experience') else [],
+        'projects': payload.projects if hasattr(payload, 'projects') else [],
+        'text': ' '.join(interests + (payload.skills if hasattr(payload, 'skills') else [])),
+        'location': payload.location if hasattr(payload, 'location') else None
+    }
+    return interests, location, resume_data
+
+
+def _select_top(scored: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
+    """Pick up to 3 of the (company, confidence) list sorted by confidence desc, then name"""
+    # Select top recommendations based on confidence thresholds
+    high_confidence = [s for s in scored if s[1] >= 0.75]  # High confidence (0.75+)
+    medium_confidence = [s for s in scored if 0.50 <= s[1] < 0.75]  # Medium confidence (0.50-0.74)
+    low_confidence = [s for s in scored if 0.25 <= s[1] < 0.50]  # Low confidence (0.25-0.49)
+    
+    selected = []
+    
+    # Prioritize high-confidence matches
+    if high_confidence:
+        selected.extend(high_confidence[:2])  # Take up to 2 high-confidence matches
+    
+    # Add medium-confidence matches if we need more
+    if len(selected) < 3 and medium_confidence:
+        remaining_slots = 3 - len(selected)
+        selected.extend(medium_confidence[:remaining_slots])
+    
+    # Add low-confidence matches if we still need more
+    if len(selected) < 3 and low_confidence:
+        remaining_slots = 3 - len(selected)
+        selected.extend(low_confidence[:remaining_slots])
+    
+    # Fallback to top companies by confidence if nothing scored well
+    if not selected and scored:
+        selected = scored[:3]
+    
+    # Ensure we have exactly 3 recommendations (or fewer if not enough companies)
+    if len(selected) < 3 and len(scored) > len(selected):
+        remaining_slots = 3 - len(selected)
+        fallback_companies = [s for s in scored if s[0] not in [sel[0] for sel in selected]]
+        selected.extend(fallback_companies[:remaining_slots])
+    return selected
+
+
+def _build_recommendations(selected: List[Tuple[str, float]], location: Optional[str],
+                           interests: List[str], resume_data: Dict,
+                           made: Optional[Dict[Tuple, Dict]] = None) -> List[Dict]:
+    """
+    Recommendation dicts for the selected companies. made memoizes them across a batch,
+    keyed on what _make_recommendation reads (company, confidence, location, interests).
+    """
+    # Create recommendations with confidence scores
+    recommendations = []
+    for company_name, confidence in selected:
+        key = (company_name, confidence, location, tuple(interests))
+        if made is not None and key in made:
+            recommendations.append(made[key])
+            continue
+        try:
+            rec = _make_recommendation(company_name, confidence, location, interests, resume_data).dict()
+            recommendations.append(rec)
+            if made is not None:
+                made[key] = rec
+        except Exception as e:
+            print(f"Error creating recommendation for {company_name}: {e}")
+            continue  # Skip this recommendation and continue with others
+
+    if not recommendations:
+        raise HTTPException(status_code=500, detail="Failed to generate any recommendations. Please try again.")
+    return recommendations
+
+
+def _response_cache_key(location: Optional[str], resume_data: Dict) -> Optional[str]:
+    """
+    Stable hash of a normalized /recommend request plus everything its response depends
+    on besides the request. The cache is cleared whenever that version changes. Rules
+    are identified by content, so a reload that serves the same rules keeps the cache.
+    """
+    global _response_cache_version
+    if RESPONSE_CACHE.maxsize == 0:
+        return None
+    version = (ml_engine.catalog_version, ml_engine.model_version, ml_engine.ann_ready, RULE_STORE.fingerprint)
+    with _response_cache_lock:
+        if version != _response_cache_version:
+            RESPONSE_CACHE.clear()
+            _response_cache_version = version
+    request = [location, resume_data['interests'], resume_data['skills'],
+               resume_data['experience'], resume_data['projects']]
+    digest = hashlib.blake2b(json.dumps([version, request]).encode("utf-8"), digest_size=16)
+    return digest.hexdigest()
+
+
 @app.post("/recommend")
 def recommend(payload: Union[InterestsPayload, ResumePayload]):
     try:
-        # Determine interests list and optional location from payload
-        if payload.type == "interests":
-            interests = _normalize_terms(payload.interests)
-            location = None
-        elif payload.type == "resume":
-            interests = _normalize_terms(payload.interests)
-            location = payload.location
-        else:
-            raise HTTPException(status_code=400, detail="Invalid payload type")
-
-        if not interests:
-            raise HTTPException(status_code=400, detail="No interests provided")
-
-        # Create resume data structure for confidence calculation
-        resume_data = {
-            'skills': payload.skills if hasattr(payload, 'skills') else [],
-            'interests': interests,
-            'experience': payload.experience if hasattr(payload, 'experience') else [],
-            'projects': payload.projects if hasattr(payload, 'projects') else [],
-            'text': ' '.join(interests + (payload.skills if hasattr(payload, 'skills') else [])),
-            'location': payload.location if hasattr(payload, 'location') else None
-        }
+        interests, location, resume_data = _recommend_inputs(payload)
+        RULE_STORE.maybe_reload()
+        cache_key = _response_cache_key(location, resume_data)
+        if cache_key is not None:
+            body = RESPONSE_CACHE.get(cache_key)
+            if body is not None:
+                return Response(content=body, media_type="application/json")
+        # One catalog for the whole request, even if a reload swaps it meanwhile
+        confidence_engine = CONFIDENCE_ENGINE
 
         # Get all companies from company_database.json only
         try:
@@ -1088,65 +1306,38 @@ def recommend(payload: Union[InterestsPayload, ResumePayload]):
         if not companies_in_db:
             raise HTTPException(status_code=500, detail="No companies found in database")
 
-        # Calculate confidence scores for all companies
-        scored = []
-        for company_name in companies_in_db:
-            try:
-                confidence = _calculate_confidence_score(company_name, interests, resume_data)
-                if confidence > 0:  # Only include companies with some confidence
-                    scored.append((company_name, confidence))
-            except Exception as e:
-                print(f"Error calculating confidence for {company_name}: {e}")
-                continue  # Skip this company and continue with others
-
-        # Sort by confidence desc, then name
-        scored.sort(key=lambda x: (-x[1], x[0]))
-
-        # Select top recommendations based on confidence thresholds
-        high_confidence = [s for s in scored if s[1] >= 0.75]  # High confidence (0.75+)
-        medium_confidence = [s for s in scored if 0.50 <= s[1] < 0.75]  # Medium confidence (0.50-0.74)
-        low_confidence = [s for s in scored if 0.25 <= s[1] < 0.50]  # Low confidence (0.25-0.49)
-        
-        selected = []
-        
-        # Prioritize high-confidence matches
-        if high_confidence:
-            selected.extend(high_confidence[:2])  # Take up to 2 high-confidence matches
-        
-        # Add medium-confidence matches if we need more
-        if len(selected) < 3 and medium_confidence:
-            remaining_slots = 3 - len(selected)
-            selected.extend(medium_confidence[:remaining_slots])
-        
-        # Add low-confidence matches if we still need more
-        if len(selected) < 3 and low_confidence:
-            remaining_slots = 3 - len(selected)
-            selected.extend(low_confidence[:remaining_slots])
-        
-        # Fallback to top companies by confidence if nothing scored well
-        if not selected and scored:
-            selected = scored[:3]
-        
-        # Ensure we have exactly 3 recommendations (or fewer if not enough companies)
-        if len(selected) < 3 and len(scored) > len(selected):
-            remaining_slots = 3 - len(selected)
-            fallback_companies = [s for s in scored if s[0] not in [sel[0] for sel in selected]]
-            selected.extend(fallback_companies[:remaining_slots])
-
-        # Create recommendations with confidence scores
-        recommendations = []
-        for company_name, confidence in selected:
-            try:
-                rec = _make_recommendation(company_name, confidence, location, interests, resume_data)
-                recommendations.append(rec)
-            except Exception as e:
-                print(f"Error creating recommendation for {company_name}: {e}")
-                continue  # Skip this recommendation and continue with others
-
-        if not recommendations:
-            raise HTTPException(status_code=500, detail="Failed to generate any recommendations. Please try again.")
-
-        return {"recommendations": [r.dict() for r in recommendations]}
+        timer = StageTimer("recommend")
+        # Stage one (retrieve): candidates from the inverted skill/specialization/sector
+        # postings, cut to the RECOMMEND_MAX_CANDIDATES with the most overlap; large
+        # catalogs use the ANN candidates nearest to interests + skills instead
+        # Matching association rules boost the sectors/companies they point to
+        with timer.stage("retrieve"):
+            target_sectors = _infer_target_sectors(interests)
+            rules = RULE_STORE.aggregate(resume_data['skills'], interests)
+            candidates = ml_engine.ann_candidates(resume_data['text'])
+            if candidates is not None:
+                rows = np.sort(confidence_engine.rows_for(candidates))
+            else:
+                rows = confidence_engine.candidate_rows(
+                    interests, target_sectors, resume_data['skills'], CANDIDATE_FALLBACK, rules,
+                    limit=RECOMMEND_MAX_CANDIDATES or None
+                )
+        timer.candidates = len(rows) if rows is not None else len(confidence_engine)
+
+        # Stage two (rerank): confidence scores for the candidates in one vectorized pass
+        # (only companies with some confidence are returned), sorted by confidence desc, then name
+        with timer.stage("rerank"):
+            scored = confidence_engine.confidences(interests, target_sectors, resume_data['skills'], rows, rules)
+            scored.sort(key=lambda x: (-x[1], x[0]))
+            selected = _select_top(scored)
+
+        with timer.stage("build"):
+            response = JSONResponse({"recommendations": _build_recommendations(selected, location, interests, resume_data)})
+        timer.finish()
+        if cache_key is not None:
+            RESPONSE_CACHE.put(cache_key, response.body)
+        response.headers["Server-Timing"] = timer.server_timing()
+        return response
     
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -1159,3 +1350,87 @@ def recommend(payload: Union[InterestsPayload, ResumePayload]):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+def _recommend_batch_results(items: List[Union[InterestsPayload, ResumePayload]]) -> Iterator[Dict]:
+    """
+    /recommend for many payloads: per chunk, one batched ANN encode (large catalogs)
+    and one (candidates × companies) score matrix. Yields {"index", "recommendations"}
+    or {"index", "error"} per item, in order. Each chunk is timed as one pipeline run.
+    """
+    RULE_STORE.maybe_reload()
+    confidence_engine = CONFIDENCE_ENGINE
+    made: Dict[Tuple, Dict] = {}
+    chunk_size = max(1, min(BATCH_CHUNK, BATCH_MATRIX_CELLS // max(len(confidence_engine), 1)))
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        prepared = []
+        errors: Dict[int, str] = {}
+        for offset, item in enumerate(chunk):
+            try:
+                prepared.append((offset, *_recommend_inputs(item)))
+            except HTTPException as e:
+                errors[offset] = str(e.detail)
+        if not confidence_engine.names:
+            errors.update({offset: "No companies found in database" for offset, *_ in prepared})
+            prepared = []
+
+        timer = StageTimer("recommend_batch")
+        with timer.stage("retrieve"):
+            profiles = []
+            for _, interests, _, resume_data in prepared:
+                rules = RULE_STORE.aggregate(resume_data['skills'], interests)
+                profiles.append((interests, _infer_target_sectors(interests), resume_data['skills'], rules))
+            candidates = ml_engine.ann_candidates_many([resume_data['text'] for *_, resume_data in prepared])
+            # Same company set as the single-request path: ANN candidates, or the postings
+            # candidates once the catalog is large enough for the stage-one cut to apply
+            candidate_rows: List[Optional[np.ndarray]] = []
+            cut = bool(RECOMMEND_MAX_CANDIDATES) and len(confidence_engine) > RECOMMEND_MAX_CANDIDATES
+            for names, (interests, target_sectors, skills, rules) in zip(candidates, profiles):
+                if names is not None:
+                    candidate_rows.append(confidence_engine.rows_for(names))
+                elif cut:
+                    candidate_rows.append(confidence_engine.candidate_rows(
+                        interests, target_sectors, skills, CANDIDATE_FALLBACK, rules, limit=RECOMMEND_MAX_CANDIDATES
+                    ))
+                else:
+                    candidate_rows.append(None)
+
+        with timer.stage("rerank"):
+            scores = confidence_engine.score_many(profiles) if profiles else None
+            for position, rows in enumerate(candidate_rows):
+                if rows is not None:
+                    keep = np.zeros(scores.shape[1], dtype=bool)
+                    keep[rows] = True
+                    scores[position, ~keep] = 0.0
+            heads = confidence_engine.top_confidences(scores) if profiles else []
+
+        results: Dict[int, Dict] = {}
+        with timer.stage("build"):
+            for position, (offset, interests, location, resume_data) in enumerate(prepared):
+                try:
+                    selected = _select_top(heads[position])
+                    results[offset] = {"recommendations": _build_recommendations(
+                        selected, location, interests, resume_data, made)}
+                except HTTPException as e:
+                    errors[offset] = str(e.detail)
+                except Exception as e:
+                    print(f"Error in /recommend/batch item {start + offset}: {e}")
+                    errors[offset] = f"Internal server error: {str(e)}"
+        if prepared:
+            timer.finish()
+
+        for offset in range(len(chunk)):
+            if offset in errors:
+                yield {"index": start + offset, "error": errors[offset]}
+            else:
+                yield {"index": start + offset, **results[offset]}
+
+
+@app.post("/recommend/batch")
+def recommend_batch(payload: BatchRecommendPayload, stream: bool = False):
+    """Recommendations for many candidates; ?stream=true returns one NDJSON line per candidate"""
+    if len(payload.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ITEMS} items per batch")
+    results = _recommend_batch_results(payload.items)
+    if stream:
+        return StreamingResponse((json.dumps(result) + "\n" for result in results), media_type="application/x-ndjson")
+    return {"results": list(results)}
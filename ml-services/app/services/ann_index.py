@@ -0,0 +1,225 @@
+"""
+Approximate nearest-neighbour indexes over L2-normalized embedding matrices
+- FlatIndex: exact inner-product search (baseline)
+- IVFIndex: inverted-file index in NumPy (spherical k-means coarse quantizer)
+- HNSWIndex: graph index through the optional hnswlib package
+Run `python -m app.services.ann_index --help` for the recall-vs-exact benchmark
+"""
+
+import argparse
+import math
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    # Optional dependency; the NumPy IVF index is used when it is missing
+    import hnswlib  # type: ignore
+except Exception:  # pragma: no cover - optional import
+    hnswlib = None  # type: ignore
+
+
+# Index selection and recall/latency knobs
+ANN_BACKEND = os.environ.get("ML_ANN_BACKEND", "ivf")  # ivf | hnsw | flat
+ANN_N_LISTS = int(os.environ.get("ML_ANN_N_LISTS", "0"))  # 0 = sqrt(catalog size)
+ANN_N_PROBE = int(os.environ.get("ML_ANN_N_PROBE", "8"))
+ANN_HNSW_M = int(os.environ.get("ML_ANN_HNSW_M", "16"))
+ANN_HNSW_EF_CONSTRUCTION = int(os.environ.get("ML_ANN_HNSW_EF_CONSTRUCTION", "200"))
+ANN_HNSW_EF_SEARCH = int(os.environ.get("ML_ANN_HNSW_EF_SEARCH", "64"))
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first"""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class FlatIndex:
+    """Exact search: one matrix-vector product over the whole matrix"""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.vectors @ query
+        ids = _top_k(scores, k)
+        return ids, scores[ids]
+
+
+class IVFIndex:
+    """
+    Inverted-file index: vectors are bucketed by their nearest k-means centroid and
+    a query scans only the n_probe closest buckets. Higher n_probe = higher recall.
+    """
+
+    def __init__(self, vectors: np.ndarray, n_lists: int = 0, n_probe: int = ANN_N_PROBE,
+                 n_iter: int = 10, sample_size: int = 50_000, seed: int = 0,
+                 centroids: Optional[np.ndarray] = None):
+        self.vectors = vectors
+        self.n_probe = n_probe
+        n = vectors.shape[0]
+        if centroids is None:
+            n_lists = n_lists or max(1, int(math.sqrt(n)))
+            centroids = self.train(vectors, min(n_lists, n), n_iter, sample_size, seed)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+
+        # Bucket every vector; lists are stored as one id array plus offsets
+        assignment = self._assign(vectors)
+        self.order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=self.centroids.shape[0])
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    @classmethod
+    def from_arrays(cls, vectors: np.ndarray, centroids: np.ndarray, order: np.ndarray, offsets: np.ndarray,
+                    n_probe: int = ANN_N_PROBE) -> "IVFIndex":
+        """Index over precomputed lists (e.g. from a compiled catalog); nothing is reassigned"""
+        index = cls.__new__(cls)
+        index.vectors = vectors
+        index.n_probe = n_probe
+        index.centroids = centroids
+        index.order = order
+        index.offsets = offsets
+        return index
+
+    @staticmethod
+    def train(vectors: np.ndarray, n_lists: int, n_iter: int = 10,
+              sample_size: int = 50_000, seed: int = 0) -> np.ndarray:
+        """Spherical k-means on a sample of the vectors (cosine geometry)"""
+        rng = np.random.default_rng(seed)
+        n = vectors.shape[0]
+        sample = vectors[rng.choice(n, size=min(n, sample_size), replace=False)]
+        centroids = sample[rng.choice(sample.shape[0], size=n_lists, replace=False)].astype(np.float32)
+        for _ in range(n_iter):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(assignment, minlength=n_lists)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            filled = counts > 0
+            sums = np.zeros_like(centroids)
+            sums[filled] = np.add.reduceat(sample[np.argsort(assignment, kind="stable")], starts[filled], axis=0)
+            empty = ~filled
+            # Re-seed empty lists from random sample points
+            sums[empty] = sample[rng.choice(sample.shape[0], size=int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = sums / norms
+        return centroids
+
+    def _assign(self, vectors: np.ndarray, batch: int = 65_536) -> np.ndarray:
+        parts = [np.argmax(vectors[i:i + batch] @ self.centroids.T, axis=1)
+                 for i in range(0, vectors.shape[0], batch)]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def search(self, query: np.ndarray, k: int, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        n_probe = min(n_probe or self.n_probe, self.centroids.shape[0])
+        probe = _top_k(self.centroids @ query, n_probe)
+        candidates = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+        scores = self.vectors[candidates] @ query
+        best = _top_k(scores, k)
+        return candidates[best], scores[best]
+
+
+class HNSWIndex:
+    """Hierarchical navigable small-world graph (requires hnswlib)"""
+
+    def __init__(self, vectors: np.ndarray, m: int = ANN_HNSW_M,
+                 ef_construction: int = ANN_HNSW_EF_CONSTRUCTION, ef_search: int = ANN_HNSW_EF_SEARCH):
+        if hnswlib is None:
+            raise RuntimeError("hnswlib is not installed")
+        n, dim = vectors.shape
+        self.index = hnswlib.Index(space="ip", dim=dim)
+        self.index.init_index(max_elements=max(n, 1), M=m, ef_construction=ef_construction)
+        self.index.add_items(np.asarray(vectors, dtype=np.float32), np.arange(n))
+        self.index.set_ef(ef_search)
+        self.size = n
+        self.vectors = vectors
+
+    def __len__(self) -> int:
+        return self.size
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(k, self.size)
+        labels, distances = self.index.knn_query(query.reshape(1, -1), k=k)
+        # hnswlib's "ip" distance is 1 - inner product
+        return labels[0].astype(np.int64), 1.0 - distances[0]
+
+
+def build_ann_index(vectors: np.ndarray, backend: str = ANN_BACKEND, **params):
+    """Index for the configured backend, falling back to IVF when hnswlib is unavailable"""
+    if backend == "flat":
+        return FlatIndex(vectors)
+    if backend == "hnsw" and hnswlib is not None:
+        return HNSWIndex(vectors, **params)
+    if backend == "hnsw":
+        print("Warning: hnswlib not installed, using the NumPy IVF index")
+    return IVFIndex(vectors, n_lists=params.get("n_lists", ANN_N_LISTS), n_probe=params.get("n_probe", ANN_N_PROBE),
+                    centroids=params.get("centroids"))
+
+
+def benchmark_recall(index, vectors: np.ndarray, queries: np.ndarray, k: int = 100) -> Dict[str, float]:
+    """recall@k of index against exact search, with mean per-query latencies"""
+    exact = FlatIndex(vectors)
+    hits = 0
+    exact_time = ann_time = 0.0
+    for query in queries:
+        start = time.perf_counter()
+        truth, _ = exact.search(query, k)
+        exact_time += time.perf_counter() - start
+        start = time.perf_counter()
+        found, _ = index.search(query, k)
+        ann_time += time.perf_counter() - start
+        hits += len(np.intersect1d(truth, found))
+    n_queries = max(len(queries), 1)
+    return {
+        "recall": hits / (n_queries * min(k, len(vectors))),
+        "exact_ms": 1000 * exact_time / n_queries,
+        "ann_ms": 1000 * ann_time / n_queries,
+    }
+
+
+def _synthetic_vectors(n: int, dim: int, n_clusters: int, seed: int) -> np.ndarray:
+    """Clustered unit vectors, closer to real embedding geometry than uniform noise"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, n_clusters, size=n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall-vs-exact benchmark for the ANN indexes")
+    parser.add_argument("--n", type=int, default=100_000, help="catalog size")
+    parser.add_argument("--dim", type=int, default=384, help="embedding dimension (MiniLM = 384)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--backend", default=ANN_BACKEND, choices=["ivf", "hnsw", "flat"])
+    parser.add_argument("--n-lists", type=int, default=ANN_N_LISTS)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = _synthetic_vectors(args.n + args.queries, args.dim, n_clusters=max(10, args.n // 500), seed=args.seed)
+    catalog, probes = data[:args.n], data[args.n:]
+
+    start = time.perf_counter()
+    index = build_ann_index(catalog, backend=args.backend, n_lists=args.n_lists)
+    print(f"{type(index).__name__}: built over {args.n}x{args.dim} in {time.perf_counter() - start:.2f}s")
+
+    settings = args.n_probe if isinstance(index, IVFIndex) else [None]
+    for n_probe in settings:
+        if n_probe is not None:
+            index.n_probe = n_probe
+        result = benchmark_recall(index, catalog, probes, k=args.k)
+        label = f"n_probe={n_probe:<3}" if n_probe is not None else "default    "
+        print(f"{label} recall@{args.k}={result['recall']:.3f}  "
+              f"exact={result['exact_ms']:.2f}ms  ann={result['ann_ms']:.2f}ms")
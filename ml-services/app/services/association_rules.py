@@ -0,0 +1,681 @@
+"""
+Association rule mining (bitset-vectorized Apriori/Eclat) for skill/interest → sector/company rules
+Mines the `association_rules` structure used by the recommender:
+- skill_company_rules: {skills} → sector or company
+- interest_sector_rules: {interests} → sector
+Transactions are parsed resumes (optionally labelled with the sector/company they
+were placed in or accepted) plus one transaction per catalog company. Sectors are
+split into their "/"-separated tags, so a consequent such as "Technology" matches
+every company whose sector contains it.
+Run `python -m app.services.association_rules --help` to mine rules offline
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: log appends and compaction are not locked across processes
+    fcntl = None
+
+# Thresholds from the project report
+ASSOCIATION_RULE_CONFIG = {
+    "min_support": 0.1,         # Minimum support threshold
+    "min_confidence": 0.7,      # Minimum confidence threshold
+    "min_lift": 1.2,            # Minimum lift threshold
+    "max_antecedent_length": 3, # Maximum items in antecedent
+    "max_consequent_length": 1, # Maximum items in consequent
+}
+
+RULES_PATH = os.environ.get(
+    "ML_ASSOCIATION_RULES_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "models", "association_rules.json")
+)
+# Live transactions (parsed resumes, accepted recommendations) are appended here for
+# offline mining; an empty value disables the log
+TRANSACTION_LOG = os.environ.get(
+    "ML_TRANSACTION_LOG",
+    os.path.join(os.path.dirname(__file__), "..", "..", "models", "transactions.jsonl")
+)
+# The log is compacted to one line per distinct transaction (with a "count") once it
+# holds this many times more lines than distinct transactions, and at least
+# LOG_COMPACT_MIN_LINES lines
+LOG_COMPACT_RATIO = float(os.environ.get("ML_TRANSACTION_LOG_COMPACT_RATIO", "2"))
+LOG_COMPACT_MIN_LINES = int(os.environ.get("ML_TRANSACTION_LOG_COMPACT_MIN_LINES", "1000"))
+# Fraction of new transactions (relative to the last full mine) that triggers a re-mine
+DRIFT_THRESHOLD = float(os.environ.get("ML_RULES_DRIFT_THRESHOLD", "0.2"))
+COMPANY_DATABASE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "company_database.json")
+
+# Item kinds; antecedents are skills or interests, consequents sectors or companies
+SKILL, INTEREST, SECTOR, COMPANY = "skill", "interest", "sector", "company"
+
+
+def normalize_item(value: str) -> str:
+    """Item form of a skill or interest: lowercased with collapsed whitespace"""
+    return ' '.join(str(value).lower().split())
+
+
+def resume_transaction(resume: Dict[str, Any], sector: Optional[Union[str, List[str]]] = None,
+                       company: Optional[str] = None) -> Dict[str, Any]:
+    """Transaction for a parsed resume, labelled with a sector/company when one is known"""
+    return {
+        "skills": resume.get("skills", []),
+        "interests": resume.get("interests", []),
+        "sector": sector or resume.get("sector") or resume.get("company_sector"),
+        "company": company or resume.get("company"),
+    }
+
+
+def catalog_transactions(companies: Dict[str, Dict]) -> Iterator[Dict[str, Any]]:
+    """One transaction per company: required skills and specializations → its sector"""
+    for name, info in companies.items():
+        info = info or {}
+        yield {
+            "skills": info.get("required_skills", []),
+            "interests": info.get("specializations", []),
+            "sector": info.get("sector"),
+            "company": name,
+        }
+
+
+class TransactionDatabase:
+    """
+    Transactions encoded as sorted item-id tuples, deduplicated with counts, for the
+    two rule families: skills + sector/company targets, and interests + sector targets
+    """
+
+    def __init__(self):
+        self.items: List[Tuple[str, str]] = []  # id -> (kind, value)
+        self._ids: Dict[Tuple[str, str], int] = {}
+        # kind -> raw value -> item ids, so each distinct string is normalized only once
+        self._raw: Dict[str, Dict[str, Tuple[int, ...]]] = {SKILL: {}, INTEREST: {}, SECTOR: {}, COMPANY: {}}
+        self.skill_paths: Counter = Counter()
+        self.interest_paths: Counter = Counter()
+        self.total = 0
+
+    def _encode(self, kind: str, raw: str) -> Tuple[int, ...]:
+        ids = self._raw[kind].get(raw)
+        if ids is None:
+            if kind == SECTOR:
+                # "Technology / Software / Consulting" → Technology, Software, Consulting
+                values = {tag.strip() for tag in raw.split("/") if tag.strip()}
+            elif kind == COMPANY:
+                values = {raw}
+            else:
+                values = {normalize_item(raw)} - {""}
+            encoded = []
+            for value in values:
+                item = (kind, value)
+                item_id = self._ids.get(item)
+                if item_id is None:
+                    item_id = self._ids[item] = len(self.items)
+                    self.items.append(item)
+                encoded.append(item_id)
+            ids = self._raw[kind][raw] = tuple(encoded)
+        return ids
+
+    def add(self, transaction: Dict[str, Any], count: int = 1) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """
+        Add a {skills, interests, sector, company} transaction (sector may also be a list
+        of sectors). Returns its encoded (skill family, interest family) paths.
+        """
+        encode = self._encode
+        sector = transaction.get("sector") or transaction.get("company_sector")
+        company = transaction.get("company")
+        if isinstance(sector, str):
+            sector = [sector]
+        sectors = tuple({item for value in sector or () if value for item in encode(SECTOR, value)})
+        targets = sectors + (encode(COMPANY, company) if company else ())
+
+        known_skills = self._raw[SKILL]
+        skills = set()
+        for skill in transaction.get("skills") or ():
+            if skill:
+                skills.update(known_skills.get(skill) or encode(SKILL, skill))
+        known_interests = self._raw[INTEREST]
+        interests = set()
+        for interest in transaction.get("interests") or ():
+            if interest:
+                interests.update(known_interests.get(interest) or encode(INTEREST, interest))
+        skill_path = tuple(sorted(skills.union(targets)))
+        interest_path = tuple(sorted(interests.union(sectors)))
+        for paths, path in ((self.skill_paths, skill_path), (self.interest_paths, interest_path)):
+            paths[path] += count
+            # A negative count retracts an earlier transaction
+            if paths[path] <= 0:
+                del paths[path]
+        self.total += count
+        return skill_path, interest_path
+
+    def targets(self) -> frozenset:
+        """Ids of the consequent (sector/company) items"""
+        return frozenset(item_id for item_id, item in enumerate(self.items) if item[0] in (SECTOR, COMPANY))
+
+    def update(self, transactions: Iterable[Dict[str, Any]]) -> "TransactionDatabase":
+        # Compacted logs store repeated transactions once, with a count
+        for transaction in transactions:
+            self.add(transaction, int(transaction.get("count", 1)))
+        return self
+
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(bits: np.ndarray) -> int:
+        return int(np.bitwise_count(bits).sum())
+else:  # NumPy < 2.0
+    _BYTE_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.int64)
+
+    def _popcount(bits: np.ndarray) -> int:
+        return int(_BYTE_POPCOUNT[bits.view(np.uint8)].sum())
+
+
+def item_bitmaps(paths: Counter):
+    """
+    Per-item transaction bitmaps for item-id tuples with multiplicities: returns
+    (item counts, bitmap(rows) packer, item_rows(item) lookup). Duplicates are
+    expanded to one row each, so support is a plain popcount of ANDed bitmaps.
+    """
+    lengths = np.fromiter((len(ids) for ids in paths), dtype=np.int64, count=len(paths))
+    weights = np.fromiter(paths.values(), dtype=np.int64, count=len(paths))
+    flat = np.fromiter((item for ids in paths for item in ids), dtype=np.int64, count=int(lengths.sum()))
+    row_lengths = np.repeat(lengths, weights)
+    row_starts = np.repeat(np.cumsum(lengths) - lengths, weights)
+    n_rows = len(row_lengths)
+    rows = np.repeat(np.arange(n_rows), row_lengths)
+    cols = flat[np.repeat(row_starts - np.cumsum(row_lengths) + row_lengths, row_lengths)
+                + np.arange(int(row_lengths.sum()))]
+
+    counts = np.bincount(cols)
+    order = np.argsort(cols, kind="stable")
+    sorted_cols, sorted_rows = cols[order], rows[order]
+    padded = n_rows + (-n_rows) % 64
+
+    def bitmap(item_rows: np.ndarray) -> np.ndarray:
+        mask = np.zeros(padded, dtype=bool)
+        mask[item_rows] = True
+        return np.packbits(mask).view(np.uint64)
+
+    def item_rows(item: int) -> np.ndarray:
+        start, end = np.searchsorted(sorted_cols, [item, item + 1])
+        return sorted_rows[start:end]
+
+    return counts, bitmap, item_rows
+
+
+def frequent_itemsets(paths: Counter, min_count: int, max_length: int,
+                      targets: frozenset = frozenset()) -> Dict[frozenset, int]:
+    """
+    Frequent itemsets (up to max_length items) with their counts, from item-id tuples
+    with multiplicities. Every item is a packed bitmap over the transactions, so the
+    support of an itemset is the popcount of its items' ANDed bitmaps. Itemsets are
+    extended depth first (Eclat order), and only frequent ones are extended further
+    (Apriori's downward closure). An itemset holds at most one of the `targets` items,
+    since rules only ever have one consequent.
+    """
+    counts, bitmap, item_rows = item_bitmaps(paths)
+    if not len(counts):
+        return {}
+
+    # Least frequent items first keeps the deep branches small
+    frequent_items = [int(item) for item in np.argsort(counts, kind="stable") if counts[item] >= min_count]
+    level = [(item, bitmap(item_rows(item)), int(counts[item])) for item in frequent_items]
+
+    frequent: Dict[frozenset, int] = {}
+
+    def extend(prefix: Tuple[int, ...], has_target: bool, candidates: List[Tuple[int, np.ndarray, int]]):
+        for index, (item, bits, count) in enumerate(candidates):
+            itemset = prefix + (item,)
+            frequent[frozenset(itemset)] = count
+            if len(itemset) >= max_length:
+                continue
+            with_target = has_target or item in targets
+            extensions = []
+            for other, other_bits, _ in candidates[index + 1:]:
+                if with_target and other in targets:
+                    continue
+                joined = bits & other_bits
+                support = _popcount(joined)
+                if support >= min_count:
+                    extensions.append((other, joined, support))
+            if extensions:
+                extend(itemset, with_target, extensions)
+
+    extend((), False, level)
+    return frequent
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", value.lower()).strip("_")
+
+
+def _max_length(config: Dict[str, Any]) -> int:
+    return config["max_antecedent_length"] + config["max_consequent_length"]
+
+
+def _min_count(config: Dict[str, Any], total: int) -> int:
+    return max(1, math.ceil(config["min_support"] * total))
+
+
+def _mine_family(item_lists: Counter, items: List[Tuple[str, str]], total: int,
+                 config: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, Any]], Dict[frozenset, int]]:
+    """Rules and frequent itemsets for one family of item-id tuples with counts"""
+    targets = frozenset(item_id for item_id, item in enumerate(items) if item[0] in (SECTOR, COMPANY))
+    frequent = frequent_itemsets(item_lists, _min_count(config, total), _max_length(config), targets)
+    return _rules_from_itemsets(frequent, items, targets, total, config), frequent
+
+
+def _rules_from_itemsets(frequent: Dict[frozenset, int], items: List[Tuple[str, str]], targets: frozenset,
+                         total: int, config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Rules (antecedent → one target) passing the thresholds, best first"""
+    min_count = _min_count(config, total)
+    rules = []
+    for itemset, count in frequent.items():
+        consequents = itemset & targets
+        if len(consequents) != 1 or len(itemset) < 2 or count < min_count:
+            continue
+        consequent = next(iter(consequents))
+        antecedent = itemset - consequents
+        confidence = count / frequent[antecedent]
+        lift = confidence / (frequent[frozenset((consequent,))] / total)
+        if confidence < config["min_confidence"] or lift < config["min_lift"]:
+            continue
+        rules.append((
+            sorted(items[item][1] for item in antecedent),
+            items[consequent],
+            confidence, count / total, lift,
+        ))
+
+    rules.sort(key=lambda rule: (-rule[2], -rule[4], -rule[3], rule[0], rule[1]))
+    mined: Dict[str, Dict[str, Any]] = {}
+    for antecedent, (kind, consequent), confidence, support, lift in rules:
+        name = "_".join(_slug(item) for item in antecedent) + "__" + _slug(consequent)
+        mined[name] = {
+            "antecedent": antecedent,
+            "consequent": consequent,
+            "consequent_type": kind,
+            "confidence": round(confidence, 4),
+            "support": round(support, 4),
+            "lift": round(lift, 4),
+        }
+    return mined
+
+
+def mine_association_rules(transactions: Union[TransactionDatabase, Iterable[Dict[str, Any]]],
+                           config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Mine skill → sector/company and interest → sector rules from transactions
+    ({skills, interests, sector, company} dicts, or a TransactionDatabase). Returns the
+    report's structure under "association_rules" with the config used and mining stats.
+    """
+    config = {**ASSOCIATION_RULE_CONFIG, **(config or {})}
+    start = time.perf_counter()
+    if isinstance(transactions, TransactionDatabase):
+        database = transactions
+    else:
+        database = TransactionDatabase().update(transactions)
+
+    total = database.total
+    skill_rules, skill_itemsets = _mine_family(database.skill_paths, database.items, total, config) if total else ({}, {})
+    interest_rules, interest_itemsets = _mine_family(database.interest_paths, database.items, total, config) if total else ({}, {})
+
+    return {
+        "association_rules": {
+            "skill_company_rules": skill_rules,
+            "interest_sector_rules": interest_rules,
+        },
+        "config": config,
+        "stats": {
+            "transactions": total,
+            "frequent_itemsets": len(skill_itemsets) + len(interest_itemsets),
+            "rules": len(skill_rules) + len(interest_rules),
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+        },
+    }
+
+
+def _read_transactions(path: str) -> Iterator[Dict[str, Any]]:
+    """Transactions from a JSON Lines file (one transaction object per line, optional "count")"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _transaction_key(transaction: Dict[str, Any]) -> str:
+    """Canonical JSON of a transaction without its count, for counting duplicates"""
+    return json.dumps({key: value for key, value in transaction.items() if key != "count"}, sort_keys=True)
+
+
+def _open_locked(path: str, mode: str):
+    """
+    path opened and exclusively locked against other writers. A handle opened just
+    before a compaction replaced the file is reopened, so nothing is written to the
+    replaced copy.
+    """
+    while True:
+        f = open(path, mode, encoding="utf-8")
+        if fcntl is None:
+            return f
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                return f
+        except FileNotFoundError:
+            pass
+        f.close()
+
+
+def compact_transaction_log(path: str) -> Tuple[int, int]:
+    """
+    Rewrite a transaction log with one line per distinct transaction and its count,
+    in first-seen order. Returns (lines before, lines after).
+    """
+    with _open_locked(path, "r") as f:
+        counts: Counter = Counter()
+        lines = 0
+        for line in f:
+            line = line.strip()
+            if line:
+                transaction = json.loads(line)
+                counts[_transaction_key(transaction)] += int(transaction.get("count", 1))
+                lines += 1
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".jsonl.tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as out:
+                for key, count in counts.items():
+                    if count <= 0:
+                        continue
+                    transaction = json.loads(key)
+                    if count > 1:
+                        transaction["count"] = count
+                    out.write(json.dumps(transaction) + "\n")
+            # Replaced while still locked: writers waiting on the old file reopen the new one
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    return lines, sum(1 for count in counts.values() if count > 0)
+
+
+def _synthetic_transactions(n: int, companies: Dict[str, Dict], seed: int) -> Iterator[Dict[str, Any]]:
+    """Resume-like transactions drawn around catalog companies, for benchmarking"""
+    rng = random.Random(seed)
+    profiles = [(name, info) for name, info in companies.items() if info]
+    noise = sorted({skill for _, info in profiles for skill in info.get("required_skills", [])})
+    for _ in range(n):
+        name, info = rng.choice(profiles)
+        required = info.get("required_skills", [])
+        specs = info.get("specializations", [])
+        skills = rng.sample(required, k=min(len(required), rng.randint(1, 4))) + rng.sample(noise, k=2)
+        interests = rng.sample(specs, k=min(len(specs), rng.randint(0, 2)))
+        yield {"skills": skills, "interests": interests, "sector": info.get("sector"),
+               "company": name if rng.random() < 0.3 else None}
+
+
+class _ItemsetCounts:
+    """
+    Support counts for a fixed, downward-closed set of itemsets, stored as a prefix
+    trie over sorted item ids (every node is a tracked itemset). Adding a transaction
+    only walks the prefixes made of its own items.
+    """
+
+    def __init__(self, frequent: Dict[frozenset, int]):
+        self.root: Dict[int, list] = {}
+        for itemset, count in sorted(frequent.items(), key=lambda entry: len(entry[0])):
+            children = self.root
+            *prefix, last = sorted(itemset)
+            for item in prefix:
+                children = children[item][1]
+            children[last] = [count, {}]
+
+    def __contains__(self, item: int) -> bool:
+        return item in self.root
+
+    def add(self, path: Tuple[int, ...], count: int = 1):
+        stack = [(self.root, 0)]
+        while stack:
+            children, start = stack.pop()
+            for position in range(start, len(path)):
+                node = children.get(path[position])
+                if node is not None:
+                    node[0] += count
+                    if node[1]:
+                        stack.append((node[1], position + 1))
+
+    def counts(self) -> Dict[frozenset, int]:
+        counts: Dict[frozenset, int] = {}
+        stack = [((), self.root)]
+        while stack:
+            prefix, children = stack.pop()
+            for item, (count, grandchildren) in children.items():
+                itemset = prefix + (item,)
+                counts[frozenset(itemset)] = count
+                stack.append((itemset, grandchildren))
+        return counts
+
+
+class IncrementalRuleMiner:
+    """
+    Keeps mined rules current as transactions arrive. Each add() updates the support
+    counts of the itemsets found by the last full mine, and rules() recomputes their
+    confidence/support/lift from those counts. A full re-mine runs in the background
+    once the data has drifted: threshold × (last mined size) new transactions, or an
+    item that was infrequent at the last mine becoming frequent.
+    """
+
+    def __init__(self, base_transactions: Iterable[Dict[str, Any]] = (), config: Optional[Dict[str, Any]] = None,
+                 drift_threshold: float = DRIFT_THRESHOLD, log_path: Optional[str] = TRANSACTION_LOG):
+        self.config = {**ASSOCIATION_RULE_CONFIG, **(config or {})}
+        self.drift_threshold = drift_threshold
+        self.log_path = log_path
+        self.database = TransactionDatabase().update(base_transactions)
+        # Lines in the log, and its distinct transactions as of the replay or last compaction
+        self._log_lines = 0
+        self._log_base = 0
+        if log_path and os.path.exists(log_path):
+            try:
+                keys = set()
+                for transaction in _read_transactions(log_path):
+                    self.database.add(transaction, int(transaction.get("count", 1)))
+                    self._log_lines += 1
+                    keys.add(_transaction_key(transaction))
+                self._log_base = len(keys)
+                self._maybe_compact_log()
+            except Exception as e:
+                print(f"Warning: Could not read transaction log {log_path}: {e}")
+        self.version = 0
+        self._lock = threading.RLock()
+        self._remine_thread: Optional[threading.Thread] = None
+        self._pending: List[Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], int]] = []
+        self._rules: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None
+        # Per-family single-item counts, for spotting newly frequent items
+        self._item_counts = (Counter(), Counter())
+        for item_counts, paths in zip(self._item_counts, (self.database.skill_paths, self.database.interest_paths)):
+            for ids, count in paths.items():
+                for item in ids:
+                    item_counts[item] += count
+        self._install(*self._mine(self.database.skill_paths, self.database.interest_paths, self.database.total))
+
+    def _mine(self, skill_paths: Counter, interest_paths: Counter, total: int):
+        min_count = _min_count(self.config, total)
+        targets = self.database.targets()
+        max_length = _max_length(self.config)
+        return (total, frequent_itemsets(skill_paths, min_count, max_length, targets) if total else {},
+                frequent_itemsets(interest_paths, min_count, max_length, targets) if total else {})
+
+    def _install(self, total: int, skill_frequent: Dict[frozenset, int], interest_frequent: Dict[frozenset, int]):
+        self.mined_total = total
+        self._counts = (_ItemsetCounts(skill_frequent), _ItemsetCounts(interest_frequent))
+        self._rules = None
+
+    def add(self, transaction: Dict[str, Any], count: int = 1, log: bool = True):
+        """
+        Record one transaction (see resume_transaction) and update the rule counts.
+        A negative count retracts it; log=False keeps it out of the transaction log
+        (catalog transactions, which are rebuilt from the catalog at startup).
+        """
+        with self._lock:
+            paths = self.database.add(transaction, count)
+            for counts, item_counts, path in zip(self._counts, self._item_counts, paths):
+                counts.add(path, count)
+                for item in path:
+                    item_counts[item] += count
+            if self._remine_thread is not None:
+                self._pending.append((paths, count))
+            self.version += 1
+            self._rules = None
+            if self._drifted(paths):
+                self._start_remine()
+        if log:
+            self._log(transaction, count)
+
+    def _grown(self) -> bool:
+        """Enough transactions since the last full mine for a re-mine (at least one)"""
+        added = self.database.total - self.mined_total
+        return added > 0 and added >= self.drift_threshold * max(self.mined_total, 1)
+
+    def _drifted(self, paths: Tuple[Tuple[int, ...], Tuple[int, ...]]) -> bool:
+        database = self.database
+        if self._grown():
+            return True
+        min_count = _min_count(self.config, database.total)
+        for counts, item_counts, path in zip(self._counts, self._item_counts, paths):
+            if any(item not in counts and item_counts[item] >= min_count for item in path):
+                return True
+        return False
+
+    def _start_remine(self):
+        if self._remine_thread is not None:
+            return
+        snapshot = (Counter(self.database.skill_paths), Counter(self.database.interest_paths), self.database.total)
+        self._pending = []
+
+        def remine():
+            try:
+                mined = self._mine(*snapshot)
+                with self._lock:
+                    self._install(*mined)
+                    # Transactions that arrived while mining
+                    for paths, count in self._pending:
+                        for counts, path in zip(self._counts, paths):
+                            counts.add(path, count)
+                    self.version += 1
+            except Exception as e:
+                print(f"Warning: Association rule re-mine failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending = []
+                    self._remine_thread = None
+                    # Transactions that arrived meanwhile may already be past the threshold
+                    if self._grown():
+                        self._start_remine()
+
+        self._remine_thread = threading.Thread(target=remine, name="rule-remine", daemon=True)
+        self._remine_thread.start()
+
+    def _log(self, transaction: Dict[str, Any], count: int):
+        if not self.log_path or count <= 0:
+            return
+        try:
+            entry = {**transaction, "count": count} if count > 1 else transaction
+            line = json.dumps(entry)
+            with self._lock:
+                with _open_locked(self.log_path, "a") as f:
+                    f.write(line + "\n")
+                self._log_lines += 1
+                self._maybe_compact_log()
+        except Exception as e:
+            print(f"Warning: Could not append to transaction log {self.log_path}: {e}")
+
+    def _maybe_compact_log(self):
+        # Amortized: after a compaction the log must grow by the ratio again
+        if self._log_lines < max(LOG_COMPACT_MIN_LINES, LOG_COMPACT_RATIO * self._log_base):
+            return
+        try:
+            before, after = compact_transaction_log(self.log_path)
+            self._log_lines = self._log_base = after
+            print(f"Compacted transaction log {self.log_path}: {before} -> {after} lines")
+        except Exception as e:
+            print(f"Warning: Could not compact transaction log {self.log_path}: {e}")
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until background re-mines have finished"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        thread = self._remine_thread
+        while thread is not None:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            thread = self._remine_thread
+
+    def rules(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """The `association_rules` structure at the current counts"""
+        with self._lock:
+            if self._rules is None:
+                database = self.database
+                targets = database.targets()
+                skill_counts, interest_counts = (counts.counts() for counts in self._counts)
+                self._rules = {
+                    "skill_company_rules": _rules_from_itemsets(
+                        skill_counts, database.items, targets, database.total, self.config),
+                    "interest_sector_rules": _rules_from_itemsets(
+                        interest_counts, database.items, targets, database.total, self.config),
+                }
+            return self._rules
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mine skill/interest → sector/company association rules")
+    parser.add_argument("--transactions", nargs="*", default=[], help="JSON Lines files of transactions")
+    parser.add_argument("--catalog", default=COMPANY_DATABASE_PATH, help="company database to add as transactions")
+    parser.add_argument("--no-catalog", action="store_true", help="mine the transaction files only")
+    parser.add_argument("--synthetic", type=int, default=0, help="add N synthetic resume transactions (benchmark)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-support", type=float, default=ASSOCIATION_RULE_CONFIG["min_support"])
+    parser.add_argument("--min-confidence", type=float, default=ASSOCIATION_RULE_CONFIG["min_confidence"])
+    parser.add_argument("--min-lift", type=float, default=ASSOCIATION_RULE_CONFIG["min_lift"])
+    parser.add_argument("--max-antecedent-length", type=int, default=ASSOCIATION_RULE_CONFIG["max_antecedent_length"])
+    parser.add_argument("--output", default=RULES_PATH, help="rules file to write ('-' for stdout)")
+    args = parser.parse_args()
+
+    with open(args.catalog, "r", encoding="utf-8") as f:
+        catalog = json.load(f).get("companies", {})
+
+    def all_transactions() -> Iterator[Dict[str, Any]]:
+        for path in args.transactions:
+            yield from _read_transactions(path)
+        if not args.no_catalog:
+            yield from catalog_transactions(catalog)
+        if args.synthetic:
+            yield from _synthetic_transactions(args.synthetic, catalog, args.seed)
+
+    result = mine_association_rules(all_transactions(), {
+        "min_support": args.min_support,
+        "min_confidence": args.min_confidence,
+        "min_lift": args.min_lift,
+        "max_antecedent_length": args.max_antecedent_length,
+    })
+
+    if args.output == "-":
+        print(json.dumps(result, indent=2))
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        temp_path = f"{args.output}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        os.replace(temp_path, args.output)
+        stats = result["stats"]
+        print(f"Mined {stats['rules']} rules from {stats['transactions']} transactions "
+              f"({stats['frequent_itemsets']} frequent itemsets) in {stats['elapsed_seconds']}s -> {args.output}")
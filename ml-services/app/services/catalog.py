@@ -0,0 +1,420 @@
+"""
+Company catalog shared by the API and the ML engine
+- Catalog: company_database.json parsed once into compact CompanyRecords holding
+  every normalized form the scorers need (lowercased names, sectors, skills,
+  specializations, role keywords, tier and reputation), computed at load time
+  with interned strings instead of per request
+- Hot reload: a new snapshot is diffed against the one being served. Derived
+  per-company state (embedding rows) is carried over for unchanged companies, and
+  only added or changed companies are recomputed. The engine then swaps the new
+  state in by reference, so requests never wait on a reload.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.embedding_store import catalog_fingerprint
+from app.services.keyword_automaton import KeywordAutomaton
+
+CATALOG_PATH = os.path.abspath(os.environ.get(
+    "ML_COMPANY_DATABASE_PATH", os.path.join(os.path.dirname(__file__), "..", "..", "data", "company_database.json")
+))
+
+# Seconds between checks of the catalog file for changes; 0 disables the watcher
+WATCH_INTERVAL = float(os.environ.get("ML_CATALOG_WATCH_INTERVAL", "10"))
+
+
+# Name-based company tiers and reputations (substring or "<brand>" / "<brand> ..." matches)
+_TIER_RULES = (
+    (1.0, ('microsoft', 'google', 'amazon', 'meta', 'apple', 'netflix', 'adobe')),
+    (0.8, ('tcs', 'infosys', 'wipro', 'hcl', 'accenture', 'cognizant', 'deloitte')),
+    (0.6, ('capgemini', 'ibm', 'kpmg', 'pwc', 'mckinsey')),
+)
+_REPUTATION_EXACT = ('microsoft', 'google', 'amazon', 'meta', 'apple', 'netflix')
+_REPUTATION_RULES = (
+    (8.0, ('tcs', 'infosys', 'wipro', 'accenture', 'deloitte', 'mckinsey')),
+    (6.0, ('hcl', 'cognizant', 'capgemini', 'ibm')),
+)
+_NAME_SKILLS_EXACT = ('microsoft', 'google', 'amazon', 'meta', 'apple')
+_NAME_SKILL_RULES = (
+    (('java', 'sql', 'testing', 'agile', 'project management'), ('tcs', 'infosys', 'wipro', 'hcl')),
+    (('financial analysis', 'risk management', 'compliance', 'data analysis'), ('hdfc', 'icici', 'axis', 'bank')),
+)
+
+# Legal suffixes dropped before keyword sector inference
+NAME_SUFFIXES = (" limited", " private limited", " corporation")
+
+# Company-name sector rules in priority order: the first rule with a keyword
+# contained in the (suffix-stripped) name decides the sector
+COMPANY_SECTOR_RULES = [
+    # Finance companies first (most specific)
+    ("Fintech / Banking / Finance", [
+        "hdfc bank", "icici bank", "axis bank", "kotak mahindra bank", "indusind bank",
+        "bajaj finance", "lic housing finance", "power finance corporation",
+        "rural electrification", "shriram finance", "muthoot finance"
+    ]),
+    # Banking/finance keywords
+    ("Fintech / Banking / Finance", [
+        "bank", "finance", "fintech", "payment", "credit", "lending", "investment", "wealth",
+        "insurance", "mutual fund", "trading", "housing finance"
+    ]),
+    # Technology companies (including social media and gaming)
+    ("Technology / Software / Digital Services", [
+        "microsoft", "google", "amazon", "meta", "adobe", "oracle", "salesforce", "netflix",
+        "uber", "flipkart", "paytm", "zomato", "swiggy", "oyo", "byju", "unacademy", "vedantu",
+        "upgrad", "cred", "razorpay", "phonepe", "bharatpe", "juspay", "payu", "cashfree",
+        "freshworks", "zoho", "postman", "hashicorp", "docker", "atlassian", "slack", "twilio",
+        "stripe", "shopify", "woocommerce", "magento", "wix", "squarespace", "webflow", "figma",
+        "canva", "notion", "asana", "trello", "miro", "invision", "sketch", "principle", "framer",
+        "spotify", "soundcloud", "bandcamp", "apple", "samsung", "oneplus", "xiaomi", "oppo",
+        "vivo", "realme", "intel", "amd", "nvidia", "qualcomm", "broadcom", "mediatek", "arm",
+        "tcs", "infosys", "wipro", "hcl", "tech mahindra", "accenture", "cognizant", "capgemini",
+        "ibm", "deloitte", "kpmg", "pwc", "ernst", "mckinsey", "bain", "boston consulting",
+        "oliver wyman", "at kearney", "strategy", "booz allen", "youtube", "instagram", "tiktok",
+        "twitter", "linkedin", "snapchat", "pinterest", "reddit", "discord", "twitch", "vimeo",
+        "dailymotion", "unity", "epic games", "unreal engine", "steam", "sony", "nintendo",
+        "valve", "blizzard", "electronic arts", "ubisoft", "rockstar", "activision", "bungie",
+        "riot games", "supercell", "mojang", "roblox", "fortnite", "minecraft",
+        "league of legends", "world of warcraft", "call of duty", "grand theft auto", "fifa",
+        "assassin's creed", "far cry", "watch dogs", "just dance"
+    ]),
+    # E-commerce/retail
+    ("E-commerce / Retail / Consumer", [
+        "retail", "ecommerce", "e-commerce", "consumer", "fmcg", "fashion", "lifestyle", "grocery",
+        "marketplace", "logistics", "supply chain", "merchandising"
+    ]),
+    # Automotive/manufacturing
+    ("Automotive / Manufacturing / Industrial", [
+        "auto", "maruti", "mahindra", "bajaj auto", "hero", "tvs", "eicher", "ashok leyland",
+        "hyundai", "kia", "volkswagen", "skoda", "audi", "bmw", "mercedes", "jaguar", "volvo",
+        "ford", "general motors", "chrysler", "jeep", "ram", "dodge", "fiat", "alfa romeo",
+        "maserati", "ferrari", "lamborghini", "bentley", "rolls-royce", "aston martin", "mclaren",
+        "porsche", "lotus", "morgan", "caterham", "tvr", "noble", "koenigsegg", "bugatti",
+        "pagani", "rimac", "l&t", "larsen", "ultratech", "suzuki", "manufactur", "industrial"
+    ]),
+    # Energy/oil & gas
+    ("Energy / Oil & Gas / Utilities", [
+        "oil", "ongc", "gail", "bharat petroleum", "hpcl", "bpcl", "indian oil", "oil india",
+        "adani", "reliance", "ntpc", "nhpc", "power grid", "nuclear", "energy", "gas", "power",
+        "utilities", "renewable", "solar", "wind", "hydro", "thermal", "coal", "petroleum"
+    ]),
+    # Healthcare/pharma
+    ("Healthcare / Pharmaceuticals / Biotech", [
+        "serum", "pharma", "pharmaceutical", "health", "hospital", "medical", "biotech",
+        "biotechnology", "clinical", "research", "drug", "medicine", "therapeutic", "diagnostic",
+        "vaccine", "biomedical", "life sciences", "healthcare", "wellness"
+    ]),
+    # Consulting
+    ("Consulting / Professional Services", [
+        "deloitte", "kpmg", "pwc", "ernst", "mckinsey", "bain", "boston consulting",
+        "oliver wyman", "at kearney", "strategy", "booz allen", "consulting", "advisory",
+        "professional services", "management consulting", "strategy consulting"
+    ]),
+]
+
+# Compiled once: every rule keyword in one automaton, labelled with its rule index
+_COMPANY_SECTOR_AUTOMATON = KeywordAutomaton.from_groups(keywords for _, keywords in COMPANY_SECTOR_RULES)
+
+
+def _is_brand(name_lower: str, brands: Tuple[str, ...]) -> bool:
+    return any(name_lower == brand or name_lower.startswith(brand + " ") for brand in brands)
+
+
+def company_tier(name_lower: str) -> float:
+    """Tier score (0-1) from the company name: FAANG 1.0, major IT/consulting 0.8, established 0.6"""
+    for tier, brands in _TIER_RULES:
+        if any(brand in name_lower for brand in brands):
+            return tier
+    return 0.4
+
+
+def company_reputation(name_lower: str) -> float:
+    """Reputation score (5-10) from the company name"""
+    if _is_brand(name_lower, _REPUTATION_EXACT):
+        return 10.0
+    for reputation, brands in _REPUTATION_RULES:
+        if any(brand in name_lower for brand in brands):
+            return reputation
+    return 5.0
+
+
+def name_skills(name_lower: str) -> List[str]:
+    """Typical skills for a company inferred from its name alone"""
+    if _is_brand(name_lower, _NAME_SKILLS_EXACT):
+        return ['python', 'javascript', 'machine learning', 'cloud computing', 'data structures']
+    for skills, brands in _NAME_SKILL_RULES:
+        if any(brand in name_lower for brand in brands):
+            return list(skills)
+    return ['communication', 'problem solving', 'teamwork']
+
+
+def clean_name(name_lower: str) -> str:
+    for suffix in NAME_SUFFIXES:
+        name_lower = name_lower.replace(suffix, "")
+    return name_lower
+
+
+def name_sector(name_clean: str) -> str:
+    """Sector inferred from a lowercased, suffix-stripped company name"""
+    # Single pass over the name; the lowest matching rule index wins (finance before technology)
+    rule_index = _COMPANY_SECTOR_AUTOMATON.first_label(name_clean)
+    if rule_index is not None:
+        return COMPANY_SECTOR_RULES[rule_index][0]
+    
+    # Default to technology sector
+    return "Technology / Software / Digital Services"
+
+
+def _lowered(values) -> Tuple[str, ...]:
+    return tuple(sys.intern(str(value).lower()) for value in values or ())
+
+
+class CompanyRecord:
+    """One company with its normalized forms; info is the raw database entry"""
+
+    __slots__ = ("name", "info", "name_lower", "name_clean", "first_word", "sector", "sector_lower",
+                 "specializations_lower", "required_skills", "skills_lower", "preferred_roles",
+                 "role_keywords", "culture_keywords", "tier", "reputation", "name_sector")
+
+    def __init__(self, name: str, info: Optional[Dict[str, Any]], tier: Optional[float] = None,
+                 reputation: Optional[float] = None, inferred_sector: Optional[str] = None):
+        info = info or {}
+        self.name = name
+        self.info = info
+        self.name_lower = sys.intern(name.lower())
+        self.name_clean = clean_name(self.name_lower)
+        self.first_word = self.name_lower.split(" ", 1)[0]
+        self.sector = info.get('sector', '')
+        self.sector_lower = sys.intern(self.sector.lower())
+        self.specializations_lower = _lowered(info.get('specializations', []))
+        self.required_skills = info.get('required_skills', [])
+        self.skills_lower = tuple(sys.intern(skill.lower().strip()) for skill in self.required_skills)
+        self.preferred_roles = info.get('preferred_roles', [])
+        self.role_keywords = tuple(tuple(role.split()) for role in _lowered(self.preferred_roles))
+        culture = info.get('company_culture', '')
+        self.culture_keywords = _lowered(culture.split(', ')) if culture else ()
+        # Precomputed values (from a compiled catalog) are used as given
+        self.tier = company_tier(self.name_lower) if tier is None else tier
+        self.reputation = company_reputation(self.name_lower) if reputation is None else reputation
+        # Sector inferred from the name alone (used when the database has no sector)
+        self.name_sector = name_sector(self.name_clean) if inferred_sector is None else inferred_sector
+
+
+class _ArtifactCompanies(Mapping):
+    """Read-only companies mapping over a compiled catalog: entries are decoded on first access"""
+
+    def __init__(self, names: List[str], row_of: Dict[str, int], artifact):
+        self._names = names
+        self._row_of = row_of
+        self._blob = artifact["company_json"]
+        self._offsets = artifact["company_json_offsets"]
+        self._decoded: Dict[str, Dict] = {}
+
+    def __getitem__(self, name: str) -> Dict:
+        info = self._decoded.get(name)
+        if info is None:
+            row = self._row_of[name]
+            info = json.loads(bytes(self._blob[self._offsets[row]:self._offsets[row + 1]]).decode("utf-8"))
+            self._decoded[name] = info
+        return info
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name) -> bool:
+        return name in self._row_of
+
+
+class Catalog:
+    """
+    Parsed company database plus one CompanyRecord per company, in database order.
+    Tiers and reputations are also kept as arrays aligned with names. A catalog
+    opened from a compiled artifact (see catalog_artifact.py) reads those columns
+    from memory-mapped arrays and builds records on first access instead.
+    """
+
+    def __init__(self, database: Dict[str, Any], version: Optional[str] = None):
+        self.database = database
+        self.version = version
+        self.artifact = None
+        companies = database.get('companies', {}) or {}
+        self.companies: Dict[str, Dict] = companies
+        self.names: List[str] = list(companies.keys())
+        self._row_of: Dict[str, int] = {name: row for row, name in enumerate(self.names)}
+        self._records: Dict[str, CompanyRecord] = {name: CompanyRecord(name, companies[name]) for name in self.names}
+        self.tiers = np.fromiter((record.tier for record in self._records.values()),
+                                 dtype=np.float32, count=len(self.names))
+        self.reputations = np.fromiter((record.reputation for record in self._records.values()),
+                                       dtype=np.float32, count=len(self.names))
+        self._name_sectors: Optional[Tuple[List[str], np.ndarray]] = None
+
+    @classmethod
+    def from_artifact(cls, artifact) -> "Catalog":
+        catalog = cls.__new__(cls)
+        catalog.artifact = artifact
+        catalog.version = artifact.version
+        catalog.names = artifact.strings("names")
+        catalog._row_of = {name: row for row, name in enumerate(catalog.names)}
+        catalog.companies = _ArtifactCompanies(catalog.names, catalog._row_of, artifact)
+        catalog.database = {**artifact.meta.get("database", {}), "companies": catalog.companies}
+        # Stored as float64 so records read back the exact scores; arrays are float32 as usual
+        catalog.tiers = artifact["tier"].astype(np.float32)
+        catalog.reputations = artifact["reputation"].astype(np.float32)
+        catalog._name_sectors = (artifact.strings("name_sector_terms"), artifact["name_sector"])
+        catalog._records = {}
+        return catalog
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._row_of
+
+    def get(self, name: str) -> Optional[CompanyRecord]:
+        record = self._records.get(name)
+        if record is None and self._name_sectors is not None:
+            row = self._row_of.get(name)
+            if row is None:
+                return None
+            terms, sector_ids = self._name_sectors
+            artifact = self.artifact
+            record = CompanyRecord(name, self.companies[name], float(artifact["tier"][row]),
+                                   float(artifact["reputation"][row]), terms[sector_ids[row]])
+            self._records[name] = record
+        return record
+
+    def embeddings(self, name: str, model_version: str) -> Optional[np.ndarray]:
+        """A compiled embedding matrix (rows follow names) when it was built with this model"""
+        artifact = self.artifact
+        if artifact is None or name not in artifact or artifact.meta.get("model_version") != model_version:
+            return None
+        return artifact[name]
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def skill_text(info: Optional[Dict[str, Any]]) -> str:
+    """Text embedded per company for skill similarity"""
+    return ' '.join((info or {}).get('required_skills', []))
+
+
+def profile_text(info: Optional[Dict[str, Any]]) -> str:
+    """Text embedded per company for ANN retrieval"""
+    info = info or {}
+    return ' '.join([info.get('sector', '')] + info.get('specializations', [])
+                    + info.get('preferred_roles', []) + info.get('required_skills', []))
+
+
+def document_text(info: Optional[Dict[str, Any]]) -> str:
+    """Text indexed per company for lexical (TF-IDF) similarity"""
+    info = info or {}
+    return ' '.join([info.get('description', ''), info.get('sector', '')] + info.get('required_skills', [])
+                    + info.get('specializations', [])
+                    + [info.get('company_culture', ''), info.get('internship_focus', '')])
+
+
+def load_catalog(path: str = CATALOG_PATH) -> Tuple[Dict[str, Any], str]:
+    """(parsed company database, content fingerprint); raises ValueError on a malformed file"""
+    with open(path, "rb") as f:
+        return parse_catalog(f.read(), path)
+
+
+def parse_catalog(raw: bytes, path: str = CATALOG_PATH) -> Tuple[Dict[str, Any], str]:
+    try:
+        database = json.loads(raw.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid JSON in {path}: {e}") from e
+    if not isinstance(database, dict) or not isinstance(database.get("companies", {}), dict):
+        raise ValueError(f"{path} has no 'companies' mapping")
+    return database, catalog_fingerprint(raw)
+
+
+class CatalogDiff:
+    """Company names added, changed and removed between two catalogs"""
+
+    def __init__(self, old: Dict[str, Dict], new: Dict[str, Dict]):
+        self.added = [name for name in new if name not in old]
+        self.changed = [name for name in new if name in old and new[name] != old[name]]
+        self.removed = [name for name in old if name not in new]
+        self.unchanged = len(new) - len(self.added) - len(self.changed)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def summary(self) -> Dict[str, int]:
+        return {"added": len(self.added), "changed": len(self.changed),
+                "removed": len(self.removed), "unchanged": self.unchanged}
+
+
+def carry_over(names: List[str], texts: Dict[str, str], previous: Dict[str, Tuple[str, np.ndarray]],
+               encode: Callable[[List[str]], np.ndarray]) -> Tuple[np.ndarray, int]:
+    """
+    (matrix with one row per name, rows encoded). A row is copied from previous
+    ({name: (text, row)}) when the company's text is unchanged; all other rows are
+    encoded in one call.
+    """
+    missing = [name for name in names if name not in previous or previous[name][0] != texts[name]]
+    fresh = encode([texts[name] for name in missing]) if missing else None
+    fresh_rows = {name: row for row, name in enumerate(missing)}
+    if fresh is not None:
+        dim = fresh.shape[1]
+    elif previous:
+        dim = next(iter(previous.values()))[1].shape[0]
+    else:
+        return np.zeros((0, 0), dtype=np.float32), 0
+    matrix = np.empty((len(names), dim), dtype=np.float32)
+    for row, name in enumerate(names):
+        matrix[row] = fresh[fresh_rows[name]] if name in fresh_rows else previous[name][1]
+    return matrix, len(missing)
+
+
+class CatalogWatcher:
+    """Daemon thread calling reload() whenever the catalog file's mtime or size changes"""
+
+    def __init__(self, reload: Callable[[], Any], path: str = CATALOG_PATH, interval: float = WATCH_INTERVAL):
+        self.reload = reload
+        self.path = path
+        self.interval = interval
+        self._stamp = file_stamp(path)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stamp = file_stamp(self.path)
+            if stamp is None or stamp == self._stamp:
+                continue
+            # Let a writer that is not using rename finish before reading
+            time.sleep(min(1.0, self.interval))
+            if file_stamp(self.path) != stamp:
+                continue
+            self._stamp = stamp
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Warning: Could not reload company catalog {self.path}: {e}")
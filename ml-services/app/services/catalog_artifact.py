@@ -0,0 +1,245 @@
+"""
+Compiled company catalog artifact
+`python -m app.services.catalog_artifact` compiles company_database.json into one
+versioned, uncompressed .npz file holding everything the server derives from the
+catalog at boot:
+- names and the raw JSON of every company, as packed UTF-8 string columns
+- tier, reputation and name-inferred sector columns
+- the ConfidenceEngine vocabularies, incidence arrays and postings
+- optionally the company_skills / company_profiles embedding matrices and the
+  IVF lists of the ANN index (tied to the model version that encoded them)
+The server memory-maps every member in place (zero-copy) and decodes a company's
+JSON only when it is first read. It falls back to parsing the JSON catalog when no
+artifact exists, or when the artifact was compiled from a different JSON file.
+"""
+
+import argparse
+import json
+import os
+import struct
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+from app.services.ann_index import IVFIndex
+from app.services.catalog import (
+    CATALOG_PATH,
+    Catalog,
+    file_stamp,
+    load_catalog,
+    parse_catalog,
+    profile_text,
+    skill_text,
+)
+from app.services.confidence_engine import ConfidenceEngine
+from app.services.embedding_store import catalog_fingerprint
+
+ARTIFACT_PATH = os.environ.get(
+    "ML_CATALOG_ARTIFACT", os.path.join(os.path.dirname(__file__), "..", "..", "models", "catalog.npz")
+)
+
+# Bumped whenever the layout changes; older artifacts are ignored
+FORMAT_VERSION = 1
+
+
+def pack_strings(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(UTF-8 bytes of all values, byte offsets with one extra end offset)"""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[start:end].decode("utf-8") for start, end in zip(bounds, bounds[1:])]
+
+
+def _mmap_npz(path: str) -> Dict[str, np.ndarray]:
+    """Every member of an uncompressed .npz as a read-only memory map of the file"""
+    arrays: Dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{info.filename} is compressed; compile the artifact with np.savez")
+            # Local file header: 30 fixed bytes, then the name and extra fields
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = npy_format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = npy_format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = npy_format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError(f"{info.filename} holds Python objects")
+            key = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if int(np.prod(shape)) == 0:
+                arrays[key] = np.zeros(shape, dtype=dtype)
+                continue
+            arrays[key] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                    order="F" if fortran_order else "C").view(np.ndarray)
+    return arrays
+
+
+class CatalogArtifact:
+    """A loaded artifact: metadata plus memory-mapped arrays by key"""
+
+    def __init__(self, path: str, arrays: Dict[str, np.ndarray]):
+        self.path = path
+        self.meta: Dict[str, Any] = json.loads(arrays.pop("meta").tobytes().decode("utf-8"))
+        self.version: str = self.meta["source_version"]
+        self._arrays = arrays
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._arrays
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self._arrays[key]
+
+    def strings(self, key: str) -> List[str]:
+        return unpack_strings(self._arrays[key], self._arrays[f"{key}_offsets"])
+
+
+def load_artifact(path: Optional[str] = ARTIFACT_PATH) -> Optional[CatalogArtifact]:
+    """The artifact at path, or None when there is none or it cannot be used"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        artifact = CatalogArtifact(path, _mmap_npz(path))
+    except Exception as e:
+        print(f"Warning: Could not load catalog artifact {path}: {e}")
+        return None
+    if artifact.meta.get("format") != FORMAT_VERSION:
+        print(f"Warning: Catalog artifact {path} has format {artifact.meta.get('format')}, "
+              f"expected {FORMAT_VERSION}; recompile it")
+        return None
+    return artifact
+
+
+def open_catalog(json_path: str = CATALOG_PATH, artifact_path: Optional[str] = ARTIFACT_PATH) -> Catalog:
+    """
+    The catalog to serve: the compiled artifact when it was built from json_path
+    (same mtime and size, or else same content hash), otherwise the parsed JSON
+    """
+    artifact = load_artifact(artifact_path)
+    if artifact is None:
+        return Catalog(*load_catalog(json_path))
+    stamp = file_stamp(json_path)
+    if stamp is None or list(stamp) == artifact.meta.get("source_stamp"):
+        return Catalog.from_artifact(artifact)
+    with open(json_path, "rb") as f:
+        raw = f.read()
+    if catalog_fingerprint(raw) == artifact.version:
+        return Catalog.from_artifact(artifact)
+    print(f"Warning: {artifact_path} was compiled from another version of {json_path}; "
+          f"loading the JSON catalog (recompile the artifact)")
+    return Catalog(*parse_catalog(raw, json_path))
+
+
+def compile_catalog(json_path: str = CATALOG_PATH, output: str = ARTIFACT_PATH, encode=None,
+                    model_version: Optional[str] = None, ivf_min_companies: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Write the artifact for json_path to output (atomically). encode(texts) -> normalized
+    float32 matrix adds the embedding matrices; catalogs of at least ivf_min_companies
+    also get the ANN index lists (None: never).
+    """
+    start = time.perf_counter()
+    stamp = file_stamp(json_path)
+    with open(json_path, "rb") as f:
+        raw = f.read()
+    database, version = parse_catalog(raw, json_path)
+    catalog = Catalog(database, version)
+    names = catalog.names
+    records = [catalog.get(name) for name in names]
+
+    strings: Dict[str, List[str]] = {
+        "names": names,
+        "company_json": [json.dumps(catalog.companies[name]) for name in names],
+    }
+    arrays: Dict[str, np.ndarray] = {
+        "tier": np.asarray([record.tier for record in records], dtype=np.float64),
+        "reputation": np.asarray([record.reputation for record in records], dtype=np.float64),
+    }
+    sector_terms = sorted({record.name_sector for record in records})
+    sector_ids = {term: term_id for term_id, term in enumerate(sector_terms)}
+    strings["name_sector_terms"] = sector_terms
+    arrays["name_sector"] = np.asarray([sector_ids[record.name_sector] for record in records], dtype=np.int32)
+
+    engine_arrays, engine_strings = ConfidenceEngine(catalog.companies).to_arrays()
+    arrays.update(engine_arrays)
+    strings.update(engine_strings)
+
+    if encode is not None and names:
+        arrays["company_skills"] = np.asarray(encode([skill_text(record.info) for record in records]), dtype=np.float32)
+        profiles = np.asarray(encode([profile_text(record.info) for record in records]), dtype=np.float32)
+        arrays["company_profiles"] = profiles
+        if ivf_min_companies is not None and len(names) >= ivf_min_companies:
+            index = IVFIndex(profiles)
+            arrays.update({"ivf_centroids": index.centroids, "ivf_order": index.order, "ivf_offsets": index.offsets})
+
+    for key, values in strings.items():
+        arrays[key], arrays[f"{key}_offsets"] = pack_strings(values)
+    meta = {
+        "format": FORMAT_VERSION,
+        "source_version": version,
+        "source_stamp": list(stamp) if stamp else None,
+        "model_version": model_version if "company_skills" in arrays else None,
+        "database": {key: value for key, value in database.items() if key != "companies"},
+        "companies": len(names),
+        "created": datetime.now().isoformat(),
+    }
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".npz.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, output)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return {
+        "companies": len(names),
+        "version": version,
+        "embeddings": "company_skills" in arrays,
+        "ivf": "ivf_order" in arrays,
+        "bytes": os.path.getsize(output),
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile company_database.json into a memory-mappable catalog artifact")
+    parser.add_argument("--catalog", default=CATALOG_PATH, help="company database JSON")
+    parser.add_argument("--output", default=ARTIFACT_PATH, help="artifact to write (.npz)")
+    parser.add_argument("--no-embeddings", action="store_true", help="skip the company embedding matrices")
+    parser.add_argument("--ann", choices=("auto", "on", "off"), default="auto",
+                        help="store IVF lists (auto: catalogs of at least ML_ANN_MIN_CATALOG companies)")
+    args = parser.parse_args()
+
+    encode = model_version = ivf_min_companies = None
+    if not args.no_embeddings:
+        from app.services.ml_engine import ANN_MIN_CATALOG, ml_engine
+        if ml_engine.sentence_model is None:
+            print("Warning: sentence model unavailable; compiling without embeddings")
+        else:
+            encode = lambda texts: ml_engine.encode_texts(texts, use_cache=False)
+            model_version = ml_engine.model_version
+            ivf_min_companies = {"on": 0, "off": None, "auto": ANN_MIN_CATALOG}[args.ann]
+
+    stats = compile_catalog(args.catalog, args.output, encode=encode, model_version=model_version,
+                            ivf_min_companies=ivf_min_companies)
+    print(f"Compiled {stats['companies']} companies (catalog {stats['version']}, embeddings: "
+          f"{stats['embeddings']}, IVF: {stats['ivf']}) into {args.output} "
+          f"({stats['bytes'] / (1024 * 1024):.1f} MB) in {stats['elapsed_seconds']}s")
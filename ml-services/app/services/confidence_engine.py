@@ -0,0 +1,609 @@
+"""
+Vectorized confidence engine for /recommend
+Compiles the company catalog into integer vocabularies once so that the
+interest→sector, skills and specialization components of the confidence
+score are computed for every company in a single NumPy pass
+"""
+
+from typing import List, Dict, Tuple, Optional
+
+import numpy as np
+from scipy import sparse
+
+from app.services.cache import LRUCache
+
+
+# Component weights (must match _calculate_confidence_score in app.main)
+INTEREST_SECTOR_WEIGHT = 0.40
+SKILLS_WEIGHT = 0.50
+SPECIALIZATION_WEIGHT = 0.10
+
+# Share of the remaining headroom (1 - confidence) closed by a matching association rule
+RULE_WEIGHT = 0.25
+
+# Above this share of the catalog, scoring every company beats gathering candidate rows
+CANDIDATE_MAX_FRACTION = 0.25
+
+
+def _ranges(indptr: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Entry positions covered by the indptr slices of ids, and the slice each one came from"""
+    starts = indptr[ids]
+    lengths = indptr[ids + 1] - starts
+    owner = np.repeat(np.arange(len(ids)), lengths)
+    entries = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    return entries, owner
+
+
+class _Vocabulary:
+    """
+    Interned term → id mapping with a company×term incidence matrix, stored both
+    by company (CSR, for scoring) and by term (inverted postings, for pruning)
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self._rows: List[int] = []
+        self._cols: List[int] = []
+        # query -> (terms containing it, terms contained in it)
+        self._matches = LRUCache(256)
+
+    def add(self, row: int, term: str):
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self.ids[term] = term_id
+            self.terms.append(term)
+        self._rows.append(row)
+        self._cols.append(term_id)
+
+    # Array attributes persisted by ConfidenceEngine.to_arrays()
+    ARRAYS = ("rows", "cols", "indptr", "postings", "postings_indptr")
+
+    @classmethod
+    def from_arrays(cls, terms: List[str], arrays: Dict[str, np.ndarray]) -> "_Vocabulary":
+        vocabulary = cls()
+        vocabulary.terms = terms
+        vocabulary.ids = {term: term_id for term_id, term in enumerate(terms)}
+        for name in cls.ARRAYS:
+            setattr(vocabulary, name, arrays[name])
+        del vocabulary._rows, vocabulary._cols
+        vocabulary._incidence = None
+        return vocabulary
+
+    def freeze(self, n_companies: int):
+        # Entries are added company by company, so they are already grouped by row (CSR)
+        self.rows = np.asarray(self._rows, dtype=np.int32)
+        self.cols = np.asarray(self._cols, dtype=np.int32)
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self.rows, minlength=n_companies))])
+        # Postings: company rows grouped by term id
+        self.postings = self.rows[np.argsort(self.cols, kind="stable")]
+        self.postings_indptr = np.concatenate([[0], np.cumsum(np.bincount(self.cols, minlength=len(self.terms)))])
+        del self._rows, self._cols
+        self._incidence = None
+
+    @property
+    def incidence(self) -> sparse.csr_matrix:
+        """Company × term incidence as a sparse matrix (built on first batch use)"""
+        if self._incidence is None:
+            n_companies = len(self.indptr) - 1
+            self._incidence = sparse.csr_matrix(
+                (np.ones(len(self.cols), dtype=np.float32), self.cols, self.indptr),
+                shape=(n_companies, len(self.terms)),
+            )
+        return self._incidence
+
+    def companies_with_any_many(self, term_masks: List[np.ndarray]) -> np.ndarray:
+        """companies_with_any() for many term masks at once: (masks × companies) boolean"""
+        n = len(self.indptr) - 1
+        if not term_masks:
+            return np.zeros((0, n), dtype=bool)
+        queries = sparse.csr_matrix(np.vstack(term_masks).astype(np.float32))
+        return (queries @ self.incidence.T).toarray() > 0
+
+    def companies_with_any(self, term_mask: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Boolean vector: which companies carry at least one term selected by term_mask.
+        With rows, only those companies are examined (result aligned with rows).
+        """
+        n = len(self.indptr) - 1 if rows is None else len(rows)
+        if not term_mask.any():
+            return np.zeros(n, dtype=bool)
+        if rows is None:
+            hits = term_mask[self.cols]
+            return np.bincount(self.rows[hits], minlength=n) > 0
+        entries, local_row = _ranges(self.indptr, rows)
+        hits = term_mask[self.cols[entries]]
+        return np.bincount(local_row[hits], minlength=n) > 0
+
+    def matches(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Term masks (query in term, term in query). The second is read from the id map,
+        one lookup per substring of the query, unless the query is long enough that
+        scanning the vocabulary is cheaper.
+        """
+        cached = self._matches.get(query)
+        if cached is not None:
+            return cached
+        contains = np.asarray([query in term for term in self.terms], dtype=bool)
+        size = len(query)
+        if size * (size + 1) // 2 < len(self.terms):
+            within = np.zeros(len(self.terms), dtype=bool)
+            ids = self.ids
+            for start in range(size):
+                for end in range(start, size + 1):
+                    term_id = ids.get(query[start:end])
+                    if term_id is not None:
+                        within[term_id] = True
+        else:
+            within = np.asarray([term in query for term in self.terms], dtype=bool)
+        contains.flags.writeable = within.flags.writeable = False
+        self._matches.put(query, (contains, within))
+        return contains, within
+
+    def related(self, query: str) -> np.ndarray:
+        """Terms containing or contained in query"""
+        contains, within = self.matches(query)
+        return contains | within
+
+    def posting_rows(self, term_mask: np.ndarray) -> np.ndarray:
+        """Union of the postings of every term selected by term_mask (unsorted, may repeat)"""
+        entries, _ = _ranges(self.postings_indptr, np.flatnonzero(term_mask))
+        return self.postings[entries]
+
+
+class ConfidenceEngine:
+    """
+    Catalog compiled for whole-catalog confidence scoring.
+    Produces the same values as calling _calculate_confidence_score per company.
+    """
+
+    def __init__(self, companies: Dict[str, Dict]):
+        self.names: List[str] = list(companies.keys())
+        self.row_of: Dict[str, int] = {name: row for row, name in enumerate(self.names)}
+        n = len(self.names)
+
+        self.specializations = _Vocabulary()
+        self.skills = _Vocabulary()
+        self.sectors = _Vocabulary()
+        self.sector_ids: Dict[str, int] = self.sectors.ids
+        self.sector_terms: List[str] = self.sectors.terms
+
+        has_info = np.zeros(n, dtype=bool)
+        spec_count = np.zeros(n, dtype=np.int32)
+        skill_count = np.zeros(n, dtype=np.int32)
+        sector_of = np.zeros(n, dtype=np.int32)
+
+        for row, name in enumerate(self.names):
+            info = companies[name] or {}
+            has_info[row] = bool(info)
+
+            sector = info.get('sector', '').lower()
+            self.sectors.add(row, sector)
+            sector_of[row] = self.sector_ids[sector]
+
+            specs = info.get('specializations', [])
+            spec_count[row] = len(specs)
+            for spec in specs:
+                self.specializations.add(row, spec.lower())
+
+            required = info.get('required_skills', [])
+            skill_count[row] = len(required)
+            for skill in required:
+                self.skills.add(row, skill.lower().strip())
+
+        self.specializations.freeze(n)
+        self.skills.freeze(n)
+        self.sectors.freeze(n)
+        self.has_info = has_info
+        self.spec_count = spec_count
+        self.skill_count = skill_count
+        self.sector_of = sector_of
+        # Companies without required skills score 0.25 against any resume: always candidates
+        self.baseline_rows = np.flatnonzero(has_info & (skill_count == 0))
+        # Remaining companies in name order, with and without specializations, for the
+        # fallback in candidate_rows()
+        self._by_name: Dict[bool, List[int]] = {True: [], False: []}
+        for row in sorted(range(n), key=self.names.__getitem__):
+            if has_info[row] and skill_count[row] > 0:
+                self._by_name[bool(spec_count[row])].append(row)
+        # Position of every company in name order (built on first batch use)
+        self._name_rank: Optional[np.ndarray] = None
+
+    # Vocabularies and per-company arrays persisted by to_arrays()
+    VOCABULARIES = ("specializations", "skills", "sectors")
+    COLUMNS = ("has_info", "spec_count", "skill_count", "sector_of", "baseline_rows")
+
+    def to_arrays(self) -> Tuple[Dict[str, np.ndarray], Dict[str, List[str]]]:
+        """(arrays, string lists) that from_arrays() turns back into this engine"""
+        arrays: Dict[str, np.ndarray] = {}
+        strings: Dict[str, List[str]] = {}
+        for vocabulary_name in self.VOCABULARIES:
+            vocabulary = getattr(self, vocabulary_name)
+            strings[f"engine_{vocabulary_name}_terms"] = vocabulary.terms
+            for name in _Vocabulary.ARRAYS:
+                arrays[f"engine_{vocabulary_name}_{name}"] = getattr(vocabulary, name)
+        for name in self.COLUMNS:
+            arrays[f"engine_{name}"] = getattr(self, name)
+        arrays["engine_by_name_specialized"] = np.asarray(self._by_name[True], dtype=np.int64)
+        arrays["engine_by_name_plain"] = np.asarray(self._by_name[False], dtype=np.int64)
+        return arrays, strings
+
+    @classmethod
+    def from_arrays(cls, names: List[str], artifact) -> "ConfidenceEngine":
+        """
+        Engine over arrays saved by to_arrays(); artifact maps keys to arrays and has
+        strings(key) for the term lists (see catalog_artifact.CatalogArtifact)
+        """
+        engine = cls.__new__(cls)
+        engine.names = names
+        engine.row_of = {name: row for row, name in enumerate(names)}
+        for vocabulary_name in cls.VOCABULARIES:
+            arrays = {name: artifact[f"engine_{vocabulary_name}_{name}"] for name in _Vocabulary.ARRAYS}
+            vocabulary = _Vocabulary.from_arrays(artifact.strings(f"engine_{vocabulary_name}_terms"), arrays)
+            setattr(engine, vocabulary_name, vocabulary)
+        engine.sector_ids = engine.sectors.ids
+        engine.sector_terms = engine.sectors.terms
+        for name in cls.COLUMNS:
+            setattr(engine, name, artifact[f"engine_{name}"])
+        engine._by_name = {True: artifact["engine_by_name_specialized"], False: artifact["engine_by_name_plain"]}
+        engine._name_rank = None
+        return engine
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _sector_scores(self, target_sectors: List[str]) -> np.ndarray:
+        """Per-sector-term score: 0.88 exact/containment match, 0.75 keyword match"""
+        scores = np.zeros(len(self.sector_terms), dtype=np.float64)
+        for sector_id, company_sector_lower in enumerate(self.sector_terms):
+            for target_sector in target_sectors:
+                target_sector_lower = target_sector.lower()
+                if target_sector_lower in company_sector_lower or company_sector_lower in target_sector_lower:
+                    scores[sector_id] = 0.88
+                    break
+                elif any(word in company_sector_lower for word in target_sector_lower.split() if len(word) > 3):
+                    scores[sector_id] = 0.75
+        return scores
+
+    def rows_for(self, company_names: List[str]) -> np.ndarray:
+        """Catalog rows of the given companies (unknown names are skipped)"""
+        return np.asarray([self.row_of[name] for name in company_names if name in self.row_of], dtype=np.int64)
+
+    def _interest_spec_hits(self, interests: List[str], strict: bool, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Number of interests matching at least one specialization, per company"""
+        n = len(self.names) if rows is None else len(rows)
+        hits = np.zeros(n, dtype=np.int64)
+        for interest in interests:
+            hits += self.specializations.companies_with_any(self._interest_mask(interest, strict), rows)
+        return hits
+
+    def _interest_mask(self, interest: str, strict: bool) -> np.ndarray:
+        """Specialization terms an interest matches"""
+        interest_lower = interest.lower()
+        if not strict:
+            return self.specializations.related(interest_lower)
+        # interest == spec, or interest in spec for interests longer than 2 characters
+        mask = self.specializations.matches(interest_lower)[0]
+        if len(interest_lower) <= 2:
+            mask = np.zeros_like(mask)
+            exact_id = self.specializations.ids.get(interest_lower)
+            if exact_id is not None:
+                mask[exact_id] = True
+        return mask
+
+    def _skills_confidence(self, resume_skills: List[str], rows: Optional[np.ndarray]) -> np.ndarray:
+        skill_count = self.skill_count if rows is None else self.skill_count[rows]
+        n = len(skill_count)
+        has_required = skill_count > 0
+        if not resume_skills:
+            return np.where(has_required, 0.25, 0.0)
+
+        matched = np.zeros(n, dtype=np.float64)
+        # Accumulate in resume order so float sums match the scalar implementation
+        for skill in (s.lower().strip() for s in resume_skills):
+            exact = self.skills.companies_with_any(self._exact_skill_mask(skill), rows)
+            partial = self.skills.companies_with_any(self.skills.related(skill), rows)
+            matched += np.where(exact, 1.0, np.where(partial, 0.6, 0.0))
+        return self._skills_from_matched(matched, skill_count)
+
+    def _exact_skill_mask(self, skill: str) -> np.ndarray:
+        mask = np.zeros(len(self.skills.terms), dtype=bool)
+        exact_id = self.skills.ids.get(skill)
+        if exact_id is not None:
+            mask[exact_id] = True
+        return mask
+
+    @staticmethod
+    def _skills_from_matched(matched: np.ndarray, skill_count: np.ndarray) -> np.ndarray:
+        has_required = skill_count > 0
+        match_ratio = matched / np.maximum(skill_count, 1)
+        confidence = np.where(
+            match_ratio >= 0.8, 0.78 + (match_ratio - 0.8) * 0.85,
+            np.where(match_ratio >= 0.5, 0.65 + (match_ratio - 0.5) * 0.43, match_ratio * 1.3)
+        )
+        confidence = np.minimum(confidence, 1.0)
+        return np.where(has_required, confidence, 0.50)
+
+    def _rule_sector_scores(self, sector_confidence: Dict[str, float]) -> np.ndarray:
+        """Per-sector-term best confidence of the rules whose sector tag it contains"""
+        scores = np.zeros(len(self.sector_terms), dtype=np.float64)
+        for tag, confidence in sector_confidence.items():
+            tag_lower = tag.lower()
+            for sector_id, company_sector_lower in enumerate(self.sector_terms):
+                if tag_lower in company_sector_lower:
+                    scores[sector_id] = max(scores[sector_id], confidence)
+        return scores
+
+    def rule_scores(self, rules: Tuple[Dict[str, float], Dict[str, float]],
+                    rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Best matching-rule confidence per company, from RuleIndex.aggregate() output"""
+        sector_confidence, company_confidence = rules
+        scores = self._rule_sector_scores(sector_confidence)[self.sector_of if rows is None else self.sector_of[rows]]
+        for company, confidence in company_confidence.items():
+            row = self.row_of.get(company)
+            if row is None:
+                continue
+            positions = [row] if rows is None else np.flatnonzero(rows == row)
+            scores[positions] = np.maximum(scores[positions], confidence)
+        return scores
+
+    def candidate_rows(self, interests: List[str], target_sectors: List[str],
+                       resume_skills: Optional[List[str]] = None, fallback: int = 3,
+                       rules: Optional[Tuple[Dict[str, float], Dict[str, float]]] = None,
+                       limit: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Sorted rows worth scoring for a request, read from the inverted postings: every
+        company sharing a sector, specialization or skill with the request, plus companies
+        without required skills and the consequents of matching association rules.
+
+        Every other company scores the same value as the rest of its class (with or without
+        specializations), so only the first `fallback` of each class by name can reach a
+        top-`fallback` selection; those are added as well. Returns None when the candidates
+        cover most of the catalog and everything should be scored.
+
+        With a limit, more matches than that are cut to the `limit` with the most weighted
+        overlap instead, so the scoring stage sees a bounded candidate set however large
+        the catalog is. Postings hits are weighted like the confidence components they
+        feed (sector score above the specialization floor, interests hit, exact or
+        partial skill per required skill), which ranks candidates close to score().
+        """
+        weighted = limit is not None
+        # (rows, weight of each row or None when only membership matters)
+        parts: List[Tuple[np.ndarray, Optional[np.ndarray]]] = [(self.baseline_rows, None)]
+        if target_sectors:
+            sector_scores = self._sector_scores(target_sectors)
+            rows = self.sectors.posting_rows(sector_scores > 0)
+            weight = None
+            if weighted:
+                # Companies with specializations already get 0.85 for any target sector
+                floor = np.where(self.spec_count[rows] > 0, 0.85, 0.0)
+                weight = INTEREST_SECTOR_WEIGHT * np.maximum(sector_scores[self.sector_of[rows]] - floor, 0.0)
+            parts.append((rows, weight))
+        for interest in interests:
+            rows = self.specializations.posting_rows(self.specializations.related(interest.lower()))
+            parts.append((rows, np.full(len(rows), SPECIALIZATION_WEIGHT / len(interests)) if weighted else None))
+        for skill in (s.lower().strip() for s in resume_skills or []):
+            rows = self.skills.posting_rows(self.skills.related(skill))
+            parts.append((rows, 0.6 * SKILLS_WEIGHT / np.maximum(self.skill_count[rows], 1) if weighted else None))
+            if weighted:
+                rows = self.skills.posting_rows(self._exact_skill_mask(skill))
+                parts.append((rows, 0.4 * SKILLS_WEIGHT / np.maximum(self.skill_count[rows], 1)))
+        if rules:
+            parts.append((self.sectors.posting_rows(self._rule_sector_scores(rules[0]) > 0), None))
+            parts.append((np.asarray([self.row_of[c] for c in rules[1] if c in self.row_of], dtype=np.int64), None))
+        hits = np.concatenate([rows for rows, _ in parts])
+        matched = np.unique(hits)
+        if weighted and len(matched) > limit:
+            # Companies without required skills start from their 0.5 skills confidence;
+            # rule consequents and their sectors are boosted like in score()
+            weights = np.concatenate([
+                weight if weight is not None else np.full(len(rows), SKILLS_WEIGHT * 0.5 if position == 0 else RULE_WEIGHT)
+                for position, (rows, weight) in enumerate(parts)
+            ])
+            overlap = np.bincount(hits, weights=weights, minlength=len(self.names))[matched]
+            if target_sectors:
+                overlap += np.where(self.spec_count[matched] > 0, 0.85 * INTEREST_SECTOR_WEIGHT, 0.0)
+            matched = np.sort(matched[np.argsort(-overlap, kind="stable")[:limit]])
+        elif len(matched) > CANDIDATE_MAX_FRACTION * len(self.names) and (limit is None or len(self.names) <= limit):
+            return None
+
+        extra: List[int] = []
+        for class_rows in self._by_name.values():
+            found = 0
+            for row in class_rows:
+                if found == fallback:
+                    break
+                position = np.searchsorted(matched, row)
+                if position == len(matched) or matched[position] != row:
+                    extra.append(row)
+                    found += 1
+
+        rows = np.union1d(matched, np.asarray(extra, dtype=np.int64))
+        return rows[self.has_info[rows]]
+
+    def score(self, interests: List[str], target_sectors: List[str],
+              resume_skills: Optional[List[str]] = None, rows: Optional[np.ndarray] = None,
+              rules: Optional[Tuple[Dict[str, float], Dict[str, float]]] = None) -> np.ndarray:
+        """
+        Unrounded confidence for every company in catalog order, or only for the given rows.
+        rules (per-sector and per-company rule confidences) boost the companies they name.
+        """
+        spec_count = self.spec_count if rows is None else self.spec_count[rows]
+        sector_of = self.sector_of if rows is None else self.sector_of[rows]
+        has_info = self.has_info if rows is None else self.has_info[rows]
+        n = len(spec_count)
+        has_specs = spec_count > 0
+
+        # 1. Interest → Sector matching
+        interest_sector = np.zeros(n, dtype=np.float64)
+        if target_sectors:
+            specialization_matches = self._interest_spec_hits(interests, True, rows)
+            if interests:
+                specialization_ratio = specialization_matches / len(interests)
+                interest_sector = np.where(
+                    has_specs, np.minimum(0.85 + (specialization_ratio * 0.15), 1.0), 0.0
+                )
+            interest_sector = np.maximum(interest_sector, self._sector_scores(target_sectors)[sector_of])
+            interest_sector = np.where(
+                (interest_sector == 0.0) & (specialization_matches > 0), 0.80, interest_sector
+            )
+
+        # 2. Skills → Company required skills matching
+        skills = self._skills_confidence(resume_skills or [], rows)
+
+        # 3. Interest → Company specializations matching
+        specialization = np.zeros(n, dtype=np.float64)
+        if interests:
+            matched_specializations = self._interest_spec_hits(interests, False, rows)
+            specialization = np.where(
+                has_specs, np.minimum(matched_specializations / len(interests), 1.0), 0.0
+            )
+
+        total_confidence = (
+            interest_sector * INTEREST_SECTOR_WEIGHT
+            + skills * SKILLS_WEIGHT
+            + specialization * SPECIALIZATION_WEIGHT
+        )
+        total_weight = INTEREST_SECTOR_WEIGHT + SKILLS_WEIGHT + SPECIALIZATION_WEIGHT
+        confidence = total_confidence / total_weight
+        if rules and (rules[0] or rules[1]):
+            confidence = confidence + RULE_WEIGHT * self.rule_scores(rules, rows) * (1.0 - confidence)
+        return np.where(has_info, confidence, 0.0)
+
+    def score_many(self, profiles: List[Tuple[List[str], List[str], List[str],
+                                              Optional[Tuple[Dict[str, float], Dict[str, float]]]]]) -> np.ndarray:
+        """
+        score() for many (interests, target_sectors, resume_skills, rules) profiles at once:
+        a (profiles × companies) matrix. Term matches of every interest and skill in the
+        batch become one sparse product each; skills are still accumulated in resume order,
+        so every row equals score() for that profile.
+        """
+        n_profiles, n = len(profiles), len(self.names)
+        has_specs = self.spec_count > 0
+
+        # Interest → specialization hits per profile (strict ones only where sectors were inferred)
+        related_masks, related_owner, strict_masks, strict_owner = [], [], [], []
+        for i, (interests, target_sectors, _, _) in enumerate(profiles):
+            for interest in interests:
+                related_masks.append(self._interest_mask(interest, False))
+                related_owner.append(i)
+                if target_sectors:
+                    strict_masks.append(self._interest_mask(interest, True))
+                    strict_owner.append(i)
+        related_hits = self._grouped_hits(self.specializations, related_masks, related_owner, n_profiles)
+        strict_hits = self._grouped_hits(self.specializations, strict_masks, strict_owner, n_profiles)
+        n_interests = np.asarray([len(profile[0]) for profile in profiles], dtype=np.int64)[:, None]
+        has_interests = n_interests > 0
+
+        # 1. Interest → Sector matching
+        interest_sector = np.zeros((n_profiles, n), dtype=np.float64)
+        sector_scores: Dict[Tuple[str, ...], np.ndarray] = {}
+        for i, (_, target_sectors, _, _) in enumerate(profiles):
+            if not target_sectors:
+                continue
+            key = tuple(target_sectors)
+            if key not in sector_scores:
+                sector_scores[key] = self._sector_scores(target_sectors)[self.sector_of]
+            row = np.zeros(n, dtype=np.float64)
+            if n_interests[i, 0]:
+                specialization_ratio = strict_hits[i] / n_interests[i, 0]
+                row = np.where(has_specs, np.minimum(0.85 + (specialization_ratio * 0.15), 1.0), 0.0)
+            row = np.maximum(row, sector_scores[key])
+            interest_sector[i] = np.where((row == 0.0) & (strict_hits[i] > 0), 0.80, row)
+
+        # 2. Skills → Company required skills matching, one resume position at a time
+        skill_lists = [[s.lower().strip() for s in profile[2] or []] for profile in profiles]
+        matched = np.zeros((n_profiles, n), dtype=np.float64)
+        for position in range(max((len(skills) for skills in skill_lists), default=0)):
+            owners = [i for i, skills in enumerate(skill_lists) if len(skills) > position]
+            exact = self.skills.companies_with_any_many(
+                [self._exact_skill_mask(skill_lists[i][position]) for i in owners])
+            partial = self.skills.companies_with_any_many(
+                [self.skills.related(skill_lists[i][position]) for i in owners])
+            matched[owners] += np.where(exact, 1.0, np.where(partial, 0.6, 0.0))
+        has_skills = np.asarray([bool(skills) for skills in skill_lists])[:, None]
+        skills = np.where(has_skills, self._skills_from_matched(matched, self.skill_count),
+                          np.where(self.skill_count > 0, 0.25, 0.0))
+
+        # 3. Interest → Company specializations matching
+        specialization = np.where(
+            has_interests & has_specs,
+            np.minimum(related_hits / np.maximum(n_interests, 1), 1.0), 0.0
+        )
+
+        total_confidence = (
+            interest_sector * INTEREST_SECTOR_WEIGHT
+            + skills * SKILLS_WEIGHT
+            + specialization * SPECIALIZATION_WEIGHT
+        )
+        total_weight = INTEREST_SECTOR_WEIGHT + SKILLS_WEIGHT + SPECIALIZATION_WEIGHT
+        confidence = total_confidence / total_weight
+        for i, (_, _, _, rules) in enumerate(profiles):
+            if rules and (rules[0] or rules[1]):
+                confidence[i] = confidence[i] + RULE_WEIGHT * self.rule_scores(rules) * (1.0 - confidence[i])
+        return np.where(self.has_info, confidence, 0.0)
+
+    @staticmethod
+    def _grouped_hits(vocabulary: _Vocabulary, masks: List[np.ndarray], owners: List[int],
+                      n_profiles: int) -> np.ndarray:
+        """Per profile and company: how many of the profile's masks hit the company"""
+        n = len(vocabulary.indptr) - 1
+        if not masks:
+            return np.zeros((n_profiles, n), dtype=np.int64)
+        hits = vocabulary.companies_with_any_many(masks).astype(np.int64)
+        grouping = sparse.csr_matrix(
+            (np.ones(len(owners), dtype=np.int64), (owners, np.arange(len(owners)))),
+            shape=(n_profiles, len(owners)),
+        )
+        return np.asarray(grouping @ hits)
+
+    def top_confidences(self, scores: np.ndarray, per_tier: int = 3) -> List[List[Tuple[str, float]]]:
+        """
+        The head of confidences() for every row of score_many(), sorted by (-confidence,
+        name): the best per_tier companies of each confidence tier (0.75+, 0.50+, 0.25+)
+        and the best 2 * per_tier overall, which is everything the /recommend selection
+        can pick.
+        """
+        n = len(self.names)
+        if self._name_rank is None:
+            names = np.asarray(self.names, dtype=object)
+            self._name_rank = np.argsort(np.argsort(names, kind="stable"), kind="stable")
+        rounded = np.round(scores, 2)
+        # np.round can differ from Python's round() right at a half; recheck those
+        scaled = scores * 100
+        for i, j in zip(*np.nonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)):
+            rounded[i, j] = round(float(scores[i, j]), 2)
+        cents = np.rint(rounded * 100).astype(np.int64)
+
+        # One integer per company: higher confidence first, then name order
+        missing = np.iinfo(np.int64).max
+        keys = np.where((scores > 0) & (cents > 0), -cents * n + self._name_rank, missing)
+        tiers = [cents >= 75, (cents >= 50) & (cents < 75), (cents >= 25) & (cents < 50), None]
+        picks = []
+        for tier in tiers:
+            k = min(per_tier if tier is not None else 2 * per_tier, n)
+            tier_keys = keys if tier is None else np.where(tier, keys, missing)
+            picks.append(np.argpartition(tier_keys, k - 1, axis=1)[:, :k] if k < n else
+                         np.broadcast_to(np.arange(n), keys.shape))
+        picks = np.concatenate(picks, axis=1)
+
+        heads = []
+        for i in range(len(scores)):
+            columns = np.unique(picks[i])
+            columns = columns[keys[i, columns] != missing]
+            columns = columns[np.argsort(keys[i, columns])]
+            heads.append([(self.names[j], float(rounded[i, j])) for j in columns.tolist()])
+        return heads
+
+    def confidences(self, interests: List[str], target_sectors: List[str],
+                    resume_skills: Optional[List[str]] = None,
+                    rows: Optional[np.ndarray] = None,
+                    rules: Optional[Tuple[Dict[str, float], Dict[str, float]]] = None) -> List[Tuple[str, float]]:
+        """(company, confidence) for every company (or candidate row) with confidence > 0, rounded to 2 places"""
+        scores = self.score(interests, target_sectors, resume_skills, rows, rules)
+        nonzero = np.flatnonzero(scores > 0)
+        names = self.names if rows is None else [self.names[row] for row in rows.tolist()]
+        # Python's round() (not np.round) keeps ties identical to the scalar path
+        scored = [(names[i], round(float(scores[i]), 2)) for i in nonzero.tolist()]
+        return [item for item in scored if item[1] > 0]
@@ -0,0 +1,262 @@
+"""
+Sentence embedding backends for AdvancedMLEngine (ML_EMBEDDING_BACKEND)
+- torch: SentenceTransformer in full-precision PyTorch (default)
+- onnx: the same transformer exported to ONNX, run with ONNX Runtime
+- onnx-int8: the ONNX export with int8 dynamic quantization (smallest and fastest on CPU)
+The ONNX backends need only onnxruntime and tokenizers at runtime, not torch.
+Exporting needs torch, sentence-transformers and onnx; run it once at build time
+and check it against the torch embeddings:
+    python -m app.services.embedding_backend export
+    python -m app.services.embedding_backend parity --backend onnx-int8
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Threads per ONNX Runtime session (0 = one per physical core)
+ONNX_THREADS = int(os.environ.get("ML_ONNX_THREADS", "0"))
+# Texts per inference call; texts are length-sorted first, so batches pad little
+ONNX_BATCH_SIZE = int(os.environ.get("ML_ONNX_BATCH_SIZE", "32"))
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+CONFIG_FILE = "embedding_config.json"
+# Bumped whenever the export layout changes
+EXPORT_FORMAT_VERSION = 1
+
+
+class TorchBackend:
+    """SentenceTransformer in PyTorch"""
+
+    name = "torch"
+
+    def __init__(self, model_path: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_path, device="cpu")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(texts, show_progress_bar=False), dtype=np.float32)
+
+
+class OnnxBackend:
+    """Exported transformer in ONNX Runtime, with the model's mean pooling in NumPy"""
+
+    def __init__(self, model_dir: str, quantized: bool = False, threads: int = ONNX_THREADS,
+                 batch_size: int = ONNX_BATCH_SIZE):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, CONFIG_FILE)) as f:
+            self.config: Dict[str, Any] = json.load(f)
+        if self.config.get("format") != EXPORT_FORMAT_VERSION:
+            raise ValueError(f"{model_dir} has export format {self.config.get('format')}, "
+                             f"expected {EXPORT_FORMAT_VERSION}; export the model again")
+        self.name = "onnx-int8" if quantized else "onnx"
+        self.batch_size = max(1, batch_size)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        path = os.path.join(model_dir, QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [entry.name for entry in self.session.get_inputs()]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(self.config["max_seq_length"])
+        self.pad_id = self.config.get("pad_token_id", 0)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.config["dimension"]), dtype=np.float32)
+        if not texts:
+            return embeddings
+        encodings = self.tokenizer.encode_batch(list(texts))
+        order = np.argsort([len(encoding.ids) for encoding in encodings], kind="stable")
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            embeddings[batch] = self._encode_batch([encodings[i] for i in batch.tolist()])
+        return embeddings
+
+    def _encode_batch(self, encodings) -> np.ndarray:
+        width = max(len(encoding.ids) for encoding in encodings)
+        input_ids = np.full((len(encodings), width), self.pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), width), dtype=np.int64)
+        token_type_ids = np.zeros((len(encodings), width), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            length = len(encoding.ids)
+            input_ids[row, :length] = encoding.ids
+            attention_mask[row, :length] = 1
+            token_type_ids[row, :length] = encoding.type_ids
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask, "token_type_ids": token_type_ids}
+        hidden = self.session.run(None, {name: feeds[name] for name in self.input_names})[0]
+        # Mean over real tokens (sentence-transformers' mean pooling)
+        weights = attention_mask[:, :, None].astype(np.float32)
+        return (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+
+
+def load_backend(name: str, model_path: str, onnx_dir: str):
+    """The named backend; raises when its runtime or exported files are missing"""
+    if name == "torch":
+        return TorchBackend(model_path)
+    if name in ("onnx", "onnx-int8"):
+        return OnnxBackend(onnx_dir, quantized=name == "onnx-int8")
+    raise ValueError(f"Unknown embedding backend {name!r} (expected one of {', '.join(BACKENDS)})")
+
+
+def export_onnx(model_path: str, output_dir: str, quantize: bool = True, opset: int = 17) -> Dict[str, Any]:
+    """
+    Export the sentence model's transformer to output_dir/model.onnx (and an int8
+    dynamic-quantized model_int8.onnx) with its tokenizer and pooling settings
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_path, device="cpu")
+    pooling = model[1].get_config_dict()
+    # sentence-transformers < 6 flags each mode; 6+ names one
+    if not (pooling.get("pooling_mode_mean_tokens") or pooling.get("pooling_mode") == "mean"):
+        raise ValueError("Only sentence models with mean pooling can be exported")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    sample = tokenizer(["export sample text", "a second, longer export sample text"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class HiddenStates(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *inputs):
+            return self.inner(**dict(zip(input_names, inputs))).last_hidden_state
+
+    os.makedirs(output_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=output_dir, prefix=".export-")
+    try:
+        model_file = os.path.join(staging, MODEL_FILE)
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        export_args = dict(input_names=input_names, output_names=["last_hidden_state"],
+                           dynamic_axes=dynamic_axes, opset_version=opset, do_constant_folding=True)
+        with torch.no_grad():
+            try:
+                torch.onnx.export(HiddenStates(transformer), tuple(sample[name] for name in input_names),
+                                  model_file, dynamo=False, **export_args)
+            except TypeError:
+                # torch < 2.5 has no dynamo switch (and only the TorchScript exporter)
+                torch.onnx.export(HiddenStates(transformer), tuple(sample[name] for name in input_names),
+                                  model_file, **export_args)
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(model_file, os.path.join(staging, QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+
+        tokenizer.save_pretrained(staging)
+        config = {
+            "format": EXPORT_FORMAT_VERSION,
+            "source_model": model_path,
+            "max_seq_length": model.max_seq_length,
+            "dimension": model.get_sentence_embedding_dimension(),
+            "pooling": "mean",
+            "pad_token_id": tokenizer.pad_token_id or 0,
+            "opset": opset,
+        }
+        with open(os.path.join(staging, CONFIG_FILE), "w") as f:
+            json.dump(config, f, indent=2)
+        for entry in os.listdir(staging):
+            os.replace(os.path.join(staging, entry), os.path.join(output_dir, entry))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    sizes = {entry: os.path.getsize(os.path.join(output_dir, entry))
+             for entry in (MODEL_FILE, QUANTIZED_MODEL_FILE) if os.path.exists(os.path.join(output_dir, entry))}
+    return {"output": output_dir, "inputs": input_names, "bytes": sizes, **config}
+
+
+def _timed_encode(backend, texts: List[str], batch: int, repeat: int) -> float:
+    """Mean seconds per text over repeat passes of encode() calls of batch texts"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for offset in range(0, len(texts), batch):
+            backend.encode(texts[offset:offset + batch])
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def parity(reference, candidate, texts: List[str], repeat: int = 3) -> Dict[str, Any]:
+    """
+    Compare candidate embeddings with the reference (torch) embeddings of texts:
+    cosine per text, top-10 neighbour agreement, and single/batched encode speed
+    """
+    def normalized(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    expected = normalized(reference.encode(texts))
+    actual = normalized(candidate.encode(texts))
+    cosines = (expected * actual).sum(axis=1)
+
+    k = min(10, len(texts))
+    overlap = []
+    for row in range(len(texts)):
+        top_expected = set(np.argsort(-(expected @ expected[row]))[:k].tolist())
+        top_actual = set(np.argsort(-(actual @ actual[row]))[:k].tolist())
+        overlap.append(len(top_expected & top_actual) / k)
+
+    speed: Dict[str, Dict[str, float]] = {}
+    for label, batch in (("single", 1), ("batch32", 32)):
+        sample = texts[:64] if batch == 1 else texts
+        reference_seconds = _timed_encode(reference, sample, batch, repeat)
+        candidate_seconds = _timed_encode(candidate, sample, batch, repeat)
+        speed[label] = {
+            "reference_ms_per_text": round(reference_seconds * 1000, 3),
+            "candidate_ms_per_text": round(candidate_seconds * 1000, 3),
+            "speedup": round(reference_seconds / candidate_seconds, 2) if candidate_seconds else None,
+        }
+    return {
+        "texts": len(texts),
+        "cosine_min": round(float(cosines.min()), 5),
+        "cosine_mean": round(float(cosines.mean()), 5),
+        "top10_agreement": round(float(np.mean(overlap)), 4),
+        "speed": speed,
+    }
+
+
+if __name__ == "__main__":
+    from app.services.catalog import CATALOG_PATH, load_catalog, profile_text, skill_text
+    from app.services.ml_engine import ONNX_MODEL_DIR, SENTENCE_MODEL_NAME, _bundled_model_path
+
+    parser = argparse.ArgumentParser(description="Export the sentence model to ONNX, or check an export against torch")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="write model.onnx, model_int8.onnx and the tokenizer")
+    export_parser.add_argument("--model", default=_bundled_model_path(SENTENCE_MODEL_NAME))
+    export_parser.add_argument("--output", default=ONNX_MODEL_DIR)
+    export_parser.add_argument("--no-quantize", action="store_true", help="skip the int8 model")
+    export_parser.add_argument("--opset", type=int, default=17)
+    parity_parser = commands.add_parser("parity", help="compare an ONNX backend with the torch embeddings")
+    parity_parser.add_argument("--backend", choices=("onnx", "onnx-int8"), default="onnx-int8")
+    parity_parser.add_argument("--model", default=_bundled_model_path(SENTENCE_MODEL_NAME))
+    parity_parser.add_argument("--onnx-dir", default=ONNX_MODEL_DIR)
+    parity_parser.add_argument("--catalog", default=CATALOG_PATH, help="company texts to embed")
+    parity_parser.add_argument("--min-cosine", type=float, default=0.98,
+                               help="exit with status 1 when any text's cosine to torch is lower")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(json.dumps(export_onnx(args.model, args.output, quantize=not args.no_quantize, opset=args.opset), indent=2))
+    else:
+        companies = load_catalog(args.catalog)[0].get("companies", {})
+        texts = [text for info in companies.values() for text in (skill_text(info), profile_text(info))]
+        texts += ["python machine learning", "fintech", "web development react", "data analyst sql excel", ""]
+        report = parity(TorchBackend(args.model), load_backend(args.backend, args.model, args.onnx_dir), texts)
+        report["backend"] = args.backend
+        print(json.dumps(report, indent=2))
+        if report["cosine_min"] < args.min_cosine:
+            print(f"FAIL: cosine {report['cosine_min']} below {args.min_cosine}")
+            raise SystemExit(1)
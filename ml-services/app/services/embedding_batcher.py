@@ -0,0 +1,136 @@
+"""
+Dynamic micro-batching of query embeddings across concurrent callers
+Requests each encode one or two short strings, which leaves most of the model's
+batch throughput unused. EmbeddingBatcher queues every caller's texts; a worker
+thread takes the first waiting request, collects whatever else arrives within
+max_wait_ms (or until max_texts texts), encodes the distinct texts in one model
+call and hands each caller its rows. Collection stops early once every caller
+currently inside encode() is in the batch, so a lone caller is not delayed. A
+caller waits at most max_wait_ms longer than the encode itself, plus any batch
+already running.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Collection window per batch (0 encodes each caller directly, without batching)
+EMBED_BATCH_WAIT_MS = float(os.environ.get("ML_EMBED_BATCH_WAIT_MS", "2"))
+# A batch is encoded as soon as it holds this many texts
+EMBED_BATCH_MAX_TEXTS = int(os.environ.get("ML_EMBED_BATCH_MAX_TEXTS", "64"))
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent encode(texts) calls into batched calls of the wrapped encoder"""
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_wait_ms: float = EMBED_BATCH_WAIT_MS,
+                 max_texts: int = EMBED_BATCH_MAX_TEXTS):
+        self._encode = encode
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_texts = max(1, max_texts)
+        self._queue: "queue.SimpleQueue[Tuple[List[str], Future]]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        # Callers inside encode(); nobody else can join a batch that holds them all
+        self._in_flight = 0
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+        self.encoded = 0
+        self.largest_batch = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_wait > 0
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Rows for texts, encoded together with other callers' texts when batching is on"""
+        texts = list(texts)
+        if not self.enabled or not texts:
+            return self._encode(texts)
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self.submit(texts).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts; the future resolves to their rows (or the encoder's exception)"""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((list(texts), future))
+        return future
+
+    def _ensure_worker(self):
+        # Forked workers (uvicorn/gunicorn) inherit the object but not the thread
+        if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or self._worker_pid != os.getpid() or not self._worker.is_alive():
+                if self._worker_pid != os.getpid():
+                    self._queue = queue.SimpleQueue()
+                self._worker_pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        pending = self._queue
+        while True:
+            batch = [pending.get()]
+            count = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while count < self.max_texts and len(batch) < self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                count += len(item[0])
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch: List[Tuple[List[str], Future]]):
+        batch = [(texts, future) for texts, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        # Concurrent callers often miss the cache on the same text: encode it once
+        unique = list(dict.fromkeys(text for texts, _ in batch for text in texts))
+        try:
+            rows = self._encode(unique)
+        except BaseException as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        row_of = {text: row for row, text in enumerate(unique)}
+        with self._lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.texts += sum(len(texts) for texts, _ in batch)
+            self.encoded += len(unique)
+            self.largest_batch = max(self.largest_batch, len(unique))
+        for texts, future in batch:
+            future.set_result(rows[[row_of[text] for text in texts]])
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'max_wait_ms': self.max_wait * 1000,
+                'max_texts': self.max_texts,
+                'batches': self.batches,
+                'requests': self.requests,
+                'texts': self.texts,
+                'encoded': self.encoded,
+                'largest_batch': self.largest_batch,
+                'mean_requests_per_batch': round(self.requests / self.batches, 2) if self.batches else None,
+            }
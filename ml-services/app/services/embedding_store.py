@@ -0,0 +1,140 @@
+"""
+Versioned on-disk store for catalog-derived arrays (company embeddings, ...)
+Arrays are saved as .npy files keyed by a fingerprint of company_database.json
+and the model name, and opened with numpy memory mapping so that every uvicorn
+worker on a node shares one physical copy through the OS page cache
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+# Empty ML_EMBEDDING_STORE_DIR disables persistence (arrays stay in process memory)
+STORE_DIR = os.environ.get(
+    "ML_EMBEDDING_STORE_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "models", "embeddings"))
+)
+
+# Bump when the layout or meaning of stored arrays changes
+STORE_FORMAT_VERSION = 1
+
+
+def catalog_fingerprint(raw_catalog: bytes) -> str:
+    """Content hash of the raw company_database.json bytes"""
+    return hashlib.sha256(raw_catalog).hexdigest()[:16]
+
+
+def store_key(catalog_version: str, model_version: str) -> str:
+    """Key for arrays derived from one catalog with one model"""
+    digest = hashlib.sha256(f"{STORE_FORMAT_VERSION}:{catalog_version}:{model_version}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class EmbeddingStore:
+    """Directory of `<name>-<key>.npy` arrays with a JSON manifest of row labels"""
+
+    def __init__(self, directory: Optional[str] = STORE_DIR):
+        self.directory = directory or None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _paths(self, name: str, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, f"{name}-{key}")
+        return base + ".npy", base + ".json"
+
+    def load(self, name: str, key: str) -> Optional[Tuple[List[str], np.ndarray]]:
+        """(row labels, read-only memory-mapped array) or None when not stored"""
+        if not self.enabled:
+            return None
+        array_path, manifest_path = self._paths(name, key)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            array = np.load(array_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        rows = manifest.get("rows", [])
+        if len(rows) != array.shape[0]:
+            return None
+        return rows, array
+
+    def save(self, name: str, key: str, rows: List[str], array: np.ndarray, **metadata):
+        """Write array and manifest atomically (temp file + rename) so readers never see partial files"""
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        array_path, manifest_path = self._paths(name, key)
+
+        fd, tmp_array = tempfile.mkstemp(dir=self.directory, suffix=".npy.tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp_array, array_path)
+
+        manifest = {
+            "name": name,
+            "key": key,
+            "rows": list(rows),
+            "shape": list(array.shape),
+            "dtype": str(array.dtype),
+            "created": datetime.now().isoformat(),
+            **metadata,
+        }
+        fd, tmp_manifest = tempfile.mkstemp(dir=self.directory, suffix=".json.tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest, manifest_path)
+
+    def get_or_compute(self, name: str, key: str, rows: List[str],
+                       compute: Callable[[], np.ndarray], **metadata) -> np.ndarray:
+        """
+        Memory-mapped array for (name, key), computing and persisting it on a miss.
+        Stored rows must match the requested rows; otherwise the array is recomputed.
+        """
+        stored = self.load(name, key)
+        if stored is not None and stored[0] == list(rows):
+            return stored[1]
+        array = compute()
+        try:
+            self.save(name, key, rows, array, **metadata)
+        except OSError as e:
+            print(f"Warning: Could not persist {name} embeddings: {e}")
+            return array
+        stored = self.load(name, key)
+        # Reopen as a memory map so this worker shares pages with the others
+        return stored[1] if stored is not None else array
+
+    def prune(self, name: str, keep_key: str, model: str):
+        """
+        Remove older versions of an array built with the same model once a new catalog
+        is in use. Arrays of other models or backends are left alone: workers sharing
+        the directory with different settings may still have them mapped.
+        """
+        if not self.enabled or not os.path.isdir(self.directory):
+            return
+        prefix = f"{name}-"
+        for filename in os.listdir(self.directory):
+            if not filename.startswith(prefix) or not filename.endswith(".json"):
+                continue
+            key = filename[len(prefix):-len(".json")]
+            if key == keep_key:
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), "r", encoding="utf-8") as f:
+                    if json.load(f).get("model") != model:
+                        continue
+            except (OSError, ValueError):
+                continue
+            # Array first: a manifest without its array is never loaded
+            for path in self._paths(name, key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,107 @@
+"""
+Aho-Corasick keyword automaton
+Finds every keyword that occurs as a substring of a text in a single pass,
+so growing a taxonomy does not add per-keyword scans to the request path
+"""
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class KeywordAutomaton:
+    """
+    Multi-pattern substring matcher compiled into a deterministic automaton.
+    Each keyword carries one or more labels (e.g. a sector or a priority index);
+    matching returns the keywords or labels found, with `in`-style semantics.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, Hashable]] = ()):
+        self._labels: Dict[str, List[Hashable]] = {}
+        for keyword, label in keywords:
+            self.add(keyword, label)
+        self._compiled = False
+
+    def add(self, keyword: str, label: Hashable = None):
+        """Register a keyword (labelled with itself when no label is given)"""
+        labels = self._labels.setdefault(keyword, [])
+        labels.append(keyword if label is None else label)
+        self._compiled = False
+
+    @classmethod
+    def from_groups(cls, groups: Iterable[Iterable[str]]) -> "KeywordAutomaton":
+        """Label every keyword with the index of its group (lower index = higher priority)"""
+        return cls((keyword, index) for index, group in enumerate(groups) for keyword in group)
+
+    def _compile(self):
+        # Trie of keywords
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[str]] = [[]]
+        for keyword in self._labels:
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].append(keyword)
+
+        # Failure links (breadth first), folded into a full transition table
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(edges) for edges in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] = output[state] + output[fail[state]]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+                queue.append(nxt)
+            # Inherit transitions the trie lacks from the failure state
+            for ch, nxt in delta[fail[state]].items():
+                delta[state].setdefault(ch, nxt)
+
+        self._delta = delta
+        self._output = [tuple(keywords) for keywords in output]
+        self._compiled = True
+
+    def iter_matches(self, text: str, whole_words: bool = False) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (end_index, keyword) for every occurrence, overlapping ones included.
+        With whole_words, occurrences touching a letter or digit on either side are
+        skipped (so "go" does not match inside "good").
+        """
+        if not self._compiled:
+            self._compile()
+        delta = self._delta
+        output = self._output
+        size = len(text)
+        state = 0
+        for index, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if output[state]:
+                end = index + 1
+                for keyword in output[state]:
+                    if whole_words:
+                        start = end - len(keyword)
+                        if (start > 0 and text[start - 1].isalnum()) or (end < size and text[end].isalnum()):
+                            continue
+                    yield end, keyword
+
+    def find_keywords(self, text: str, whole_words: bool = False) -> Set[str]:
+        """All keywords contained in text (equivalent to {k for k in keywords if k in text})"""
+        return {keyword for _, keyword in self.iter_matches(text, whole_words)}
+
+    def find_labels(self, text: str, whole_words: bool = False) -> Set[Hashable]:
+        """Union of the labels of every keyword contained in text"""
+        labels = self._labels
+        found: Set[Hashable] = set()
+        for keyword in self.find_keywords(text, whole_words):
+            found.update(labels[keyword])
+        return found
+
+    def first_label(self, text: str) -> Optional[int]:
+        """Lowest (highest-priority) integer label matched in text, or None"""
+        found = self.find_labels(text)
+        return min(found) if found else None
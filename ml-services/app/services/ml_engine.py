@@ -3,49 +3,125 @@ Advanced ML Engine for Resume Analysis and Company Matching
 Uses state-of-the-art NLP and ML techniques for perfect recommendations
 """
 
+import importlib
 import os
 import pickle
+import threading
 import numpy as np
-import pandas as pd
 from typing import List, Dict, Tuple, Optional, Any
 from collections import Counter
 import re
 from datetime import datetime
 import json
 
-# ML Libraries
-from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, accuracy_score
+# ML Libraries: scikit-learn, torch, spaCy, TextBlob and NLTK are imported on
+# first use so that importing this module (and booting the API) stays fast
+from fuzzywuzzy import fuzz
 
-# NLP Libraries
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
-from nltk.tag import pos_tag
-import spacy
-from textblob import TextBlob
-from fuzzywuzzy import fuzz, process
+from app.services.ann_index import ANN_BACKEND, IVFIndex, build_ann_index
+from app.services.association_rules import IncrementalRuleMiner, resume_transaction
+from app.services.cache import LRUCache
+from app.services.catalog import (
+    CATALOG_PATH,
+    Catalog,
+    CatalogDiff,
+    carry_over,
+    company_reputation,
+    company_tier,
+    document_text,
+    name_skills,
+    profile_text,
+    skill_text,
+)
+from app.services.catalog_artifact import open_catalog
+from app.services.embedding_backend import load_backend as load_embedding_backend
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_store import EmbeddingStore, store_key
+from app.services.skill_lexicon import SKILL_LEXICON
+from app.services.stage_timing import StageTimer
+from app.services.tfidf_index import TfidfIndex
 
-# Advanced NLP
-from sentence_transformers import SentenceTransformer
-from transformers import pipeline, AutoTokenizer, AutoModel
-import torch
+# Local resource bundle populated at build time by fetch_resources.py.
+# Nothing in this module downloads at runtime.
+RESOURCE_DIR = os.path.abspath(os.environ.get(
+    "ML_RESOURCE_DIR", os.path.join(os.path.dirname(__file__), "..", "..", "resources")
+))
+NLTK_DATA_DIR = os.environ.get("NLTK_DATA", os.path.join(RESOURCE_DIR, "nltk_data"))
+SPACY_MODEL = os.environ.get("SPACY_MODEL", "en_core_web_sm")
+SENTENCE_MODEL_NAME = os.environ.get("SENTENCE_MODEL", "all-MiniLM-L6-v2")
+# torch | onnx | onnx-int8 (see embedding_backend); ONNX backends fall back to torch
+EMBEDDING_BACKEND = os.environ.get("ML_EMBEDDING_BACKEND", "torch")
+ONNX_MODEL_DIR = os.environ.get(
+    "ML_ONNX_MODEL_DIR", os.path.join(RESOURCE_DIR, "models", f"{SENTENCE_MODEL_NAME}-onnx")
+)
+
+# ML_LAZY_LOAD=0 restores eager loading of every backend in the constructor
+LAZY_LOAD = os.environ.get("ML_LAZY_LOAD", "1") != "0"
+
+# Query-side embedding cache (interest lists, skill strings, resume snippets); 0 disables
+EMBEDDING_CACHE_SIZE = int(os.environ.get("ML_EMBEDDING_CACHE_SIZE", "4096"))
+
+# Candidate retrieval through an ANN index, only for catalogs at least this large
+ANN_MIN_CATALOG = int(os.environ.get("ML_ANN_MIN_CATALOG", "10000"))
+ANN_CANDIDATES = int(os.environ.get("ML_ANN_CANDIDATES", "500"))
+
+# Companies get_perfect_recommendations fully scores (sector prediction + match score),
+# shortlisted from the whole list by cheap retrieval first; 0 scores every company
+RERANK_CANDIDATES = int(os.environ.get("ML_RERANK_CANDIDATES", "200"))
+
+if os.path.isdir(os.path.join(RESOURCE_DIR, "models")):
+    # Bundled models present: keep transformers/huggingface from calling home
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+
+def _bundled_model_path(name: str) -> str:
+    """Return the bundled copy of a model if one exists, else the model name"""
+    local_path = os.path.join(RESOURCE_DIR, "models", name)
+    return local_path if os.path.isdir(local_path) else name
+
+
+_nltk = None
+
+
+class CatalogUpdate:
+    """A loaded catalog with its derived state, built by prepare_catalog() for install_catalog()"""
+
+    def __init__(self, catalog: Catalog, diff: CatalogDiff):
+        self.catalog = catalog
+        self.database = catalog.database
+        self.version = catalog.version
+        self.diff = diff
+        # None: not built for the served catalog either, so it is built lazily as usual
+        self.embedding_state = None
+        self.ann_state = None
+        self.tfidf_index = None
+        self.encoded = 0
+
+
+def _get_nltk():
+    """Import NLTK on first use, resolving corpora from the local bundle only"""
+    global _nltk
+    if _nltk is None:
+        import nltk
+        if NLTK_DATA_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, NLTK_DATA_DIR)
+        _nltk = nltk
+    return _nltk
+
+
+def _normalize_text(text: str) -> str:
+    """Cache key form of a text: lowercased with collapsed whitespace (the model is uncased)"""
+    return ' '.join(str(text).lower().split())
+
+
+def _tokenize(text: str) -> List[str]:
+    """Word tokenization with a regex fallback when punkt is not bundled"""
+    try:
+        return _get_nltk().word_tokenize(text)
+    except LookupError:
+        return re.findall(r"\w+|[^\w\s]", text)
 
-# Download required NLTK data
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    nltk.download('wordnet', quiet=True)
-    nltk.download('averaged_perceptron_tagger', quiet=True)
-except:
-    pass
 
 class AdvancedMLEngine:
     """
@@ -53,21 +129,31 @@ class AdvancedMLEngine:
     """
     
     def __init__(self):
-        self.vectorizer = TfidfVectorizer(
-            max_features=5000,
-            stop_words='english',
-            ngram_range=(1, 3),
-            min_df=2,
-            max_df=0.95
-        )
-        
-        self.sentence_model = None
-        self.nlp = None
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english'))
-        
-        # Initialize models
-        self._initialize_models()
+        # (catalog, TF-IDF index over it): the lexical fallback when no sentence model is available
+        self._tfidf_state = None
+        
+        # Heavy backends are loaded on first access (or by warmup())
+        self._sentence_model = None
+        self._nlp = None
+        self._lemmatizer = None
+        self._stop_words = None
+        self._company_classifier = None
+        self.similarity_model = None
+        # (company name -> row, normalized float32 matrix) over required_skills
+        self._company_embedding_state = None
+        # (company names, ANN index) over company profiles, for large catalogs only
+        self._ann_state = None
+        self._ann_thread = None
+        # (model version, normalized text) -> normalized embedding row
+        self.embedding_cache = LRUCache(EMBEDDING_CACHE_SIZE)
+        # Cache misses of concurrent requests are encoded together
+        self.embedding_batcher = EmbeddingBatcher(self._encode)
+        # Persisted, memory-mapped catalog arrays shared by all workers
+        self.embedding_store = EmbeddingStore()
+        self.catalog_version = None
+        self.catalog = Catalog({"companies": {}})
+        self._loaded = set()
+        self._load_lock = threading.RLock()
         
         # Training data storage
         self.training_data = {
@@ -77,37 +163,172 @@ class AdvancedMLEngine:
             'feedback': []
         }
         
-        # Load company database
-        self.company_database = self._load_company_database()
+        # Load company database (shared with the API through self.catalog)
+        self.catalog = self._load_catalog()
+        # Association rules kept current as resumes and feedback arrive (built on first use)
+        self._rule_miner = None
         
         # Load or create models
         self._load_or_create_models()
+        
+        # Initialize models
+        if not LAZY_LOAD:
+            self._initialize_models()
     
     def _initialize_models(self):
         """Initialize NLP models"""
+        self._ensure_loaded('sentence_model')
+        self._ensure_loaded('nlp')
+        self._ensure_loaded('nltk')
+        self._ensure_loaded('classifier')
+    
+    def _ensure_loaded(self, backend: str):
+        """Load a backend once; concurrent first callers wait for the same load"""
+        if backend in self._loaded:
+            return
+        with self._load_lock:
+            if backend in self._loaded:
+                return
+            if backend == 'sentence_model':
+                self._sentence_model = None
+                # Configured embedding backend first, then plain torch
+                for name in dict.fromkeys([EMBEDDING_BACKEND, 'torch']):
+                    try:
+                        self._sentence_model = load_embedding_backend(
+                            name, _bundled_model_path(SENTENCE_MODEL_NAME), ONNX_MODEL_DIR
+                        )
+                        break
+                    except Exception as e:
+                        print(f"Warning: Could not load {name} sentence embedding backend: {e}")
+            elif backend == 'nlp':
+                try:
+                    # Initialize spaCy model
+                    import spacy
+                    self._nlp = spacy.load(_bundled_model_path(SPACY_MODEL))
+                except Exception as e:
+                    print(f"Warning: Could not load spaCy model: {e}")
+                    self._nlp = None
+            elif backend == 'nltk':
+                try:
+                    self._stop_words = set(_get_nltk().corpus.stopwords.words('english'))
+                except Exception as e:
+                    print(f"Warning: NLTK stopwords not bundled, using sklearn list ({type(e).__name__})")
+                    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+                    self._stop_words = set(ENGLISH_STOP_WORDS)
+                try:
+                    lemmatizer = _get_nltk().stem.WordNetLemmatizer()
+                    lemmatizer.lemmatize('warmup')
+                    self._lemmatizer = lemmatizer
+                except Exception as e:
+                    print(f"Warning: WordNet not bundled, lemmatization disabled ({type(e).__name__})")
+                    self._lemmatizer = None
+            elif backend == 'classifier':
+                self._load_classifiers()
+            self._loaded.add(backend)
+    
+    @property
+    def sentence_model(self):
+        self._ensure_loaded('sentence_model')
+        return self._sentence_model
+    
+    @property
+    def nlp(self):
+        self._ensure_loaded('nlp')
+        return self._nlp
+    
+    @property
+    def stop_words(self) -> set:
+        self._ensure_loaded('nltk')
+        return self._stop_words
+    
+    @property
+    def lemmatizer(self):
+        self._ensure_loaded('nltk')
+        return self._lemmatizer
+    
+    @property
+    def rule_miner(self) -> IncrementalRuleMiner:
+        if self._rule_miner is None:
+            with self._load_lock:
+                if self._rule_miner is None:
+                    # Recorded resumes and feedback only: rules mined from the catalog's own
+                    # records would just re-learn each company's skill → sector mapping
+                    self._rule_miner = IncrementalRuleMiner()
+        return self._rule_miner
+    
+    @property
+    def company_classifier(self):
+        self._ensure_loaded('classifier')
+        return self._company_classifier
+    
+    @property
+    def tfidf_index(self) -> Optional[TfidfIndex]:
+        """TF-IDF index over the catalog, fitted once per catalog on first use"""
+        catalog = self.catalog
+        state = self._tfidf_state
+        if state is None or state[0] is not catalog:
+            with self._load_lock:
+                state = self._tfidf_state
+                if state is None or state[0] is not catalog:
+                    state = (catalog, self._build_tfidf_index(catalog))
+                    self._tfidf_state = state
+        return state[1] or None
+    
+    @staticmethod
+    def _build_tfidf_index(catalog: Catalog):
+        """A TfidfIndex for catalog, or False when it has no indexable text"""
         try:
-            # Initialize sentence transformer for semantic similarity
-            self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
+            companies = catalog.companies
+            return TfidfIndex(catalog.names, [document_text(companies[name]) for name in catalog.names])
         except Exception as e:
-            print(f"Warning: Could not load sentence transformer: {e}")
-            self.sentence_model = None
-        
+            print(f"Warning: Could not build TF-IDF index: {e}")
+            return False
+    
+    @property
+    def models_ready(self) -> bool:
+        """True once every backend has been loaded (or found unavailable)"""
+        return {'sentence_model', 'nlp', 'nltk', 'classifier'} <= self._loaded
+    
+    def warmup(self):
+        """Load every heavy backend now instead of on the first request"""
+        self._initialize_models()
+        if self._ensure_company_embeddings() is None:
+            self.tfidf_index
+        self._ensure_ann_index()
+        self.warmup_parsing()
+    
+    def warmup_parsing(self):
+        """Preload only what resume parsing needs (TextBlob, NLTK), e.g. in parser workers"""
+        self._ensure_loaded('nltk')
         try:
-            # Initialize spaCy model
-            self.nlp = spacy.load("en_core_web_sm")
+            importlib.import_module("textblob")
+            _tokenize("warmup")
         except Exception as e:
-            print(f"Warning: Could not load spaCy model: {e}")
-            self.nlp = None
+            print(f"Warning: Warmup could not preload parsing helpers: {e}")
     
-    def _load_company_database(self) -> Dict[str, Any]:
-        """Load company database with descriptions and role mappings"""
+    def start_background_warmup(self) -> threading.Thread:
+        """Run warmup() in a daemon thread so the server can accept connections"""
+        thread = threading.Thread(target=self.warmup, name="ml-engine-warmup", daemon=True)
+        thread.start()
+        return thread
+    
+    @property
+    def company_database(self) -> Dict[str, Any]:
+        return self.catalog.database
+    
+    @company_database.setter
+    def company_database(self, database: Dict[str, Any]):
+        self.catalog = Catalog(database, self.catalog_version)
+    
+    def _load_catalog(self) -> Catalog:
+        """Load company database with descriptions and role mappings (compiled artifact if present)"""
         try:
-            db_path = os.path.join(os.path.dirname(__file__), "..", "..", "data", "company_database.json")
-            with open(db_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            catalog = open_catalog(CATALOG_PATH)
         except Exception as e:
             print(f"Warning: Could not load company database: {e}")
-            return {"companies": {}}
+            catalog = Catalog({"companies": {}})
+        self.catalog_version = catalog.version
+        return catalog
     
     def _load_or_create_models(self):
         """Load existing models or create new ones"""
@@ -117,12 +338,15 @@ class AdvancedMLEngine:
         # Load or create company classifier
         self.company_classifier_path = os.path.join(model_path, "company_classifier.pkl")
         self.similarity_model_path = os.path.join(model_path, "similarity_model.pkl")
-        
+    
+    def _load_classifiers(self):
+        """Unpickle saved models (this imports scikit-learn)"""
         if os.path.exists(self.company_classifier_path):
             with open(self.company_classifier_path, 'rb') as f:
-                self.company_classifier = pickle.load(f)
+                self._company_classifier = pickle.load(f)
         else:
-            self.company_classifier = RandomForestClassifier(n_estimators=100, random_state=42)
+            from sklearn.ensemble import RandomForestClassifier
+            self._company_classifier = RandomForestClassifier(n_estimators=100, random_state=42)
         
         if os.path.exists(self.similarity_model_path):
             with open(self.similarity_model_path, 'rb') as f:
@@ -151,21 +375,27 @@ class AdvancedMLEngine:
         text = re.sub(r'[^\w\s@#]', ' ', text)
         
         # Tokenize
-        tokens = word_tokenize(text)
+        tokens = _tokenize(text)
         
         # Remove stopwords
-        tokens = [token for token in tokens if token not in self.stop_words]
+        stop_words = self.stop_words
+        tokens = [token for token in tokens if token not in stop_words]
         
         # Lemmatization
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens]
+        lemmatizer = self.lemmatizer
+        if lemmatizer is not None:
+            tokens = [lemmatizer.lemmatize(token) for token in tokens]
         
         # Remove short tokens
         tokens = [token for token in tokens if len(token) > 2]
         
         return ' '.join(tokens)
     
-    def extract_advanced_features(self, text: str) -> Dict[str, Any]:
-        """Extract advanced features from text using multiple NLP techniques"""
+    def extract_advanced_features(self, text: str, skill_matches: Optional[set] = None) -> Dict[str, Any]:
+        """
+        Extract advanced features from text using multiple NLP techniques.
+        skill_matches is SKILL_LEXICON.match(text) when the caller already has it.
+        """
         features = {}
         
         # Basic text features
@@ -175,6 +405,7 @@ class AdvancedMLEngine:
         
         # Sentiment analysis
         try:
+            from textblob import TextBlob
             blob = TextBlob(text)
             features['sentiment_polarity'] = blob.sentiment.polarity
             features['sentiment_subjectivity'] = blob.sentiment.subjectivity
@@ -184,8 +415,8 @@ class AdvancedMLEngine:
         
         # POS tagging features
         try:
-            tokens = word_tokenize(text)
-            pos_tags = pos_tag(tokens)
+            tokens = _tokenize(text)
+            pos_tags = _get_nltk().pos_tag(tokens)
             pos_counts = Counter(tag for word, tag in pos_tags)
             features['noun_ratio'] = pos_counts.get('NN', 0) / max(len(tokens), 1)
             features['verb_ratio'] = pos_counts.get('VB', 0) / max(len(tokens), 1)
@@ -195,17 +426,10 @@ class AdvancedMLEngine:
             features['verb_ratio'] = 0
             features['adj_ratio'] = 0
         
-        # Technical skills detection
-        tech_skills = [
-            'python', 'java', 'javascript', 'typescript', 'react', 'node', 'angular', 'vue',
-            'sql', 'mongodb', 'mysql', 'postgresql', 'redis', 'elasticsearch',
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git',
-            'machine learning', 'ai', 'data science', 'analytics', 'statistics',
-            'html', 'css', 'bootstrap', 'jquery', 'django', 'flask', 'spring',
-            'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy', 'matplotlib'
-        ]
-        
-        features['tech_skill_count'] = sum(1 for skill in tech_skills if skill in text.lower())
+        # Technical skills detection (shared lexicon, one pass over the text)
+        if skill_matches is None:
+            skill_matches = SKILL_LEXICON.match(text)
+        features['tech_skill_count'] = len(SKILL_LEXICON.technical(skill_matches))
         features['tech_skill_ratio'] = features['tech_skill_count'] / max(features['word_count'], 1)
         
         # Experience indicators
@@ -225,95 +449,354 @@ class AdvancedMLEngine:
             return self._tfidf_similarity(text1, text2)
         
         try:
-            embeddings = self.sentence_model.encode([text1, text2])
-            similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
-            return float(similarity)
+            embeddings = self.encode_texts([text1, text2])
+            return float(np.dot(embeddings[0], embeddings[1]))
         except Exception as e:
             print(f"Error in semantic similarity: {e}")
             return self._tfidf_similarity(text1, text2)
     
+    @property
+    def model_version(self) -> str:
+        """Identifies the embedding space (model and backend); part of every embedding cache key"""
+        backend = getattr(self._sentence_model, 'name', EMBEDDING_BACKEND)
+        # Quantized or exported models embed slightly differently: never mix their vectors with torch's
+        return SENTENCE_MODEL_NAME if backend == 'torch' else f"{SENTENCE_MODEL_NAME}+{backend}"
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.asarray(self.sentence_model.encode(texts), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
+    
+    def encode_texts(self, texts: List[str], use_cache: bool = True) -> Optional[np.ndarray]:
+        """
+        Encode texts into L2-normalized float32 rows (None without a sentence model).
+        Query-side texts go through the LRU embedding cache; only misses reach the model,
+        batched with other callers' misses.
+        """
+        if self.sentence_model is None:
+            return None
+        texts = list(texts)
+        if not use_cache:
+            return self._encode(texts)
+        
+        version = self.model_version
+        keys = [_normalize_text(text) for text in texts]
+        rows = [self.embedding_cache.get((version, key)) for key in keys]
+        missing = list(dict.fromkeys(key for key, row in zip(keys, rows) if row is None))
+        if missing:
+            fresh = {}
+            for key, row in zip(missing, self.embedding_batcher.encode(missing)):
+                row = row.copy()
+                row.flags.writeable = False
+                self.embedding_cache.put((version, key), row)
+                fresh[key] = row
+            rows = [row if row is not None else fresh[key] for key, row in zip(keys, rows)]
+        return np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+    
+    def _ensure_company_embeddings(self) -> Optional[Tuple[Dict[str, int], np.ndarray]]:
+        """Encode every company's required skills once into a normalized matrix"""
+        if self._company_embedding_state is not None or self.sentence_model is None:
+            return self._company_embedding_state
+        with self._load_lock:
+            if self._company_embedding_state is None:
+                catalog = self.catalog
+                companies = catalog.companies
+                names = list(catalog.names)
+                
+                def encode_catalog() -> np.ndarray:
+                    texts = [skill_text(companies[name]) for name in names]
+                    return self.encode_texts(texts, use_cache=False) if texts else np.zeros((0, 0), dtype=np.float32)
+                
+                try:
+                    compiled = catalog.embeddings('company_skills', self.model_version)
+                    if compiled is not None:
+                        matrix = compiled
+                    elif self.catalog_version and names:
+                        # Reuse (or publish) the memory-mapped matrix for this catalog + model
+                        key = store_key(self.catalog_version, self.model_version)
+                        matrix = self.embedding_store.get_or_compute(
+                            'company_skills', key, names, encode_catalog, model=self.model_version
+                        )
+                        self.embedding_store.prune('company_skills', key, self.model_version)
+                    else:
+                        matrix = encode_catalog()
+                except Exception as e:
+                    print(f"Error encoding company database: {e}")
+                    return None
+                self._company_embedding_state = ({name: i for i, name in enumerate(names)}, matrix)
+        return self._company_embedding_state
+    
+    @property
+    def ann_active(self) -> bool:
+        """True when the catalog is large enough for candidate retrieval"""
+        return len(self.company_database.get('companies', {})) >= ANN_MIN_CATALOG
+    
+    @property
+    def ann_ready(self) -> bool:
+        """True when /recommend shortlists through the ANN index (large catalog, index built)"""
+        return self.ann_active and self._ann_state is not None
+    
+    def _ensure_ann_index(self):
+        """Embed every company profile (sector, specializations, roles, skills) and index it"""
+        if self._ann_state is not None or not self.ann_active or self.sentence_model is None:
+            return self._ann_state
+        with self._load_lock:
+            if self._ann_state is None:
+                catalog = self.catalog
+                companies = catalog.companies
+                names = list(catalog.names)
+                
+                def encode_profiles() -> np.ndarray:
+                    texts = [profile_text(companies[name]) for name in names]
+                    return self.encode_texts(texts, use_cache=False)
+                
+                try:
+                    matrix = catalog.embeddings('company_profiles', self.model_version)
+                    if matrix is None:
+                        key = store_key(self.catalog_version, self.model_version)
+                        matrix = self.embedding_store.get_or_compute(
+                            'company_profiles', key, names, encode_profiles, model=self.model_version
+                        )
+                        self.embedding_store.prune('company_profiles', key, self.model_version)
+                        index = build_ann_index(matrix)
+                    elif ANN_BACKEND == 'ivf' and 'ivf_order' in catalog.artifact:
+                        # IVF lists compiled with the matrix: no k-means at boot
+                        artifact = catalog.artifact
+                        index = IVFIndex.from_arrays(matrix, artifact['ivf_centroids'], artifact['ivf_order'],
+                                                     artifact['ivf_offsets'])
+                    else:
+                        index = build_ann_index(matrix)
+                    self._ann_state = (names, index)
+                except Exception as e:
+                    print(f"Error building ANN index: {e}")
+                    return None
+        return self._ann_state
+    
+    def _carry_over_matrix(self, name: str, version: str, companies: Dict[str, Dict],
+                           previous_companies: Dict[str, Dict], previous: Tuple[List[str], np.ndarray],
+                           text_of) -> Tuple[List[str], np.ndarray, int]:
+        """(names, matrix, rows encoded) for a new catalog, reusing rows of companies whose text is unchanged"""
+        names = list(companies.keys())
+        previous_names, previous_matrix = previous
+        reusable = {
+            company: (text_of(previous_companies.get(company)), previous_matrix[row])
+            for row, company in enumerate(previous_names) if company in companies
+        }
+        texts = {company: text_of(companies[company]) for company in names}
+        matrix, encoded = carry_over(names, texts, reusable, lambda batch: self.encode_texts(batch, use_cache=False))
+        if names:
+            key = store_key(version, self.model_version)
+            matrix = self.embedding_store.get_or_compute(name, key, names, lambda: matrix, model=self.model_version)
+        return names, matrix, encoded
+    
+    def prepare_catalog(self, path: str = CATALOG_PATH, force: bool = False) -> Optional[CatalogUpdate]:
+        """
+        Load the catalog file and build its derived state alongside the catalog being
+        served; None when its content is unchanged. Embedding rows are carried over for
+        unchanged companies, so only added/changed companies reach the model. Nothing
+        served changes until install_catalog().
+        """
+        catalog = open_catalog(path)
+        version = catalog.version
+        if version == self.catalog_version and not force:
+            return None
+        previous_companies = self.company_database.get('companies', {})
+        companies = catalog.companies
+        update = CatalogUpdate(catalog, CatalogDiff(previous_companies, companies))
+        
+        # A compiled artifact for this model already holds the new matrices (and IVF
+        # lists); they are mapped lazily after install instead of being carried over
+        skill_state = self._company_embedding_state
+        if skill_state is not None and catalog.embeddings('company_skills', self.model_version) is None:
+            row_of, matrix = skill_state
+            names, matrix, encoded = self._carry_over_matrix(
+                'company_skills', version, companies, previous_companies, (list(row_of), matrix), skill_text
+            )
+            update.embedding_state = ({company: i for i, company in enumerate(names)}, matrix)
+            update.encoded += encoded
+        
+        ann_state = self._ann_state
+        if (ann_state is not None and len(companies) >= ANN_MIN_CATALOG
+                and catalog.embeddings('company_profiles', self.model_version) is None):
+            previous_names, index = ann_state
+            names, matrix, encoded = self._carry_over_matrix(
+                'company_profiles', version, companies, previous_companies, (previous_names, index.vectors),
+                profile_text
+            )
+            # Small edits keep the trained IVF centroids; only list assignment is redone
+            diff = update.diff
+            params = {}
+            if hasattr(index, 'centroids') and len(diff.added) + len(diff.changed) <= 0.25 * len(names):
+                params['centroids'] = index.centroids
+            update.ann_state = (names, build_ann_index(matrix, **params))
+            update.encoded += encoded
+        
+        if self._tfidf_state is not None:
+            update.tfidf_index = self._build_tfidf_index(catalog)
+        return update
+    
+    def install_catalog(self, update: CatalogUpdate):
+        """
+        Serve a prepared catalog. Each piece of state is replaced by one reference
+        assignment, so requests in flight keep using the objects they already read.
+        """
+        with self._load_lock:
+            self.catalog = update.catalog
+            self.catalog_version = update.version
+            self._company_embedding_state = update.embedding_state
+            self._ann_state = update.ann_state
+            self._tfidf_state = (update.catalog, update.tfidf_index) if update.tfidf_index is not None else None
+            self._ann_thread = None
+        
+        key = store_key(update.version, self.model_version)
+        if update.embedding_state is not None:
+            self.embedding_store.prune('company_skills', key, self.model_version)
+        if update.ann_state is not None:
+            self.embedding_store.prune('company_profiles', key, self.model_version)
+    
+    def ann_candidates(self, query_text: str, k: int = ANN_CANDIDATES) -> Optional[List[str]]:
+        """
+        Names of the k companies whose profiles are closest to query_text, or None when
+        every company should be scored (small catalog, or index not built yet). A missing
+        index is built in the background so requests never wait on it.
+        """
+        return self.ann_candidates_many([query_text], k)[0]
+    
+    def ann_candidates_many(self, query_texts: List[str], k: int = ANN_CANDIDATES) -> List[Optional[List[str]]]:
+        """ann_candidates() for many queries, encoded in one model call"""
+        results: List[Optional[List[str]]] = [None] * len(query_texts)
+        if not self.ann_active:
+            return results
+        if self._ann_state is None:
+            with self._load_lock:
+                if self._ann_thread is None:
+                    self._ann_thread = threading.Thread(
+                        target=self._ensure_ann_index, name="ml-engine-ann-index", daemon=True
+                    )
+                    self._ann_thread.start()
+            return results
+        names, index = self._ann_state
+        positions = [i for i, text in enumerate(query_texts) if text.strip()]
+        if not positions:
+            return results
+        try:
+            queries = self.encode_texts([query_texts[i] for i in positions])
+            for i, query in zip(positions, queries):
+                ids, _ = index.search(query, k)
+                results[i] = [names[j] for j in ids.tolist()]
+        except Exception as e:
+            print(f"Error in ANN search: {e}")
+            return [None] * len(query_texts)
+        return results
+    
+    def company_skill_similarities(self, resume_skills: List[str]) -> Optional[np.ndarray]:
+        """
+        Cosine similarity of the resume skills to every company's required skills:
+        one encode plus one matrix-vector product. Rows follow the embedding matrix.
+        Without a sentence model, the TF-IDF similarity to every company document
+        (rows follow the TF-IDF index).
+        """
+        if not resume_skills:
+            return None
+        state = self._ensure_company_embeddings()
+        if state is None:
+            index = self.tfidf_index
+            return index.similarities(' '.join(resume_skills)) if index is not None else None
+        try:
+            query = self.encode_texts([' '.join(resume_skills)])[0]
+        except Exception as e:
+            print(f"Error in semantic similarity: {e}")
+            return None
+        return state[1] @ query
+    
     def _tfidf_similarity(self, text1: str, text2: str) -> float:
-        """Calculate TF-IDF similarity as fallback"""
+        """Calculate TF-IDF similarity as fallback (catalog vocabulary and IDF weights)"""
+        index = self.tfidf_index
+        if index is None:
+            return 0.0
         try:
-            tfidf_matrix = self.vectorizer.fit_transform([text1, text2])
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            return float(similarity)
-        except:
+            return index.similarity(text1, text2)
+        except Exception as e:
+            print(f"Error in TF-IDF similarity: {e}")
             return 0.0
     
     def fuzzy_string_matching(self, text1: str, text2: str) -> float:
         """Fuzzy string matching for better text comparison"""
         return fuzz.ratio(text1.lower(), text2.lower()) / 100.0
     
-    def extract_skills_with_confidence(self, text: str) -> List[Tuple[str, float]]:
-        """Extract skills with confidence scores"""
-        skills_with_confidence = []
-        
-        # Define skill categories with confidence weights
-        skill_categories = {
-            'programming': {
-                'python': 0.9, 'java': 0.9, 'javascript': 0.9, 'typescript': 0.9,
-                'c++': 0.9, 'c#': 0.9, 'go': 0.9, 'rust': 0.9, 'php': 0.9, 'ruby': 0.9
-            },
-            'web_development': {
-                'react': 0.8, 'angular': 0.8, 'vue': 0.8, 'node': 0.8, 'express': 0.8,
-                'django': 0.8, 'flask': 0.8, 'spring': 0.8, 'laravel': 0.8
-            },
-            'databases': {
-                'sql': 0.8, 'mysql': 0.8, 'postgresql': 0.8, 'mongodb': 0.8,
-                'redis': 0.7, 'elasticsearch': 0.7, 'cassandra': 0.7
-            },
-            'cloud_tech': {
-                'aws': 0.8, 'azure': 0.8, 'gcp': 0.8, 'docker': 0.8, 'kubernetes': 0.8,
-                'terraform': 0.7, 'ansible': 0.7
-            },
-            'ai_ml': {
-                'machine learning': 0.9, 'deep learning': 0.9, 'tensorflow': 0.8,
-                'pytorch': 0.8, 'scikit-learn': 0.8, 'pandas': 0.7, 'numpy': 0.7
-            },
-            'design': {
-                'ui/ux': 0.8, 'figma': 0.8, 'sketch': 0.8, 'adobe': 0.7, 'photoshop': 0.7,
-                'illustrator': 0.7, 'invision': 0.7
-            }
+    def extract_skills_with_confidence(self, text: str, skill_matches: Optional[set] = None) -> List[Tuple[str, float]]:
+        """Extract skills with confidence scores from the shared skill lexicon"""
+        if skill_matches is None:
+            skill_matches = SKILL_LEXICON.match(text)
+        return SKILL_LEXICON.with_confidence(skill_matches)
+    
+    def calculate_advanced_match_scores(self, resume_data: Dict, company_names: List[str],
+                                        interests: List[str]) -> Dict[str, float]:
+        """Score many companies, encoding the resume skills only once"""
+        skill_similarities = self.company_skill_similarities(resume_data.get('skills', []))
+        return {
+            company_name: self.calculate_advanced_match_score(
+                resume_data, company_name, interests, skill_similarities
+            )
+            for company_name in company_names
         }
-        
-        text_lower = text.lower()
-        
-        for category, skills in skill_categories.items():
-            for skill, confidence in skills.items():
-                if skill in text_lower:
-                    skills_with_confidence.append((skill, confidence))
-        
-        return skills_with_confidence
     
-    def calculate_advanced_match_score(self, resume_data: Dict, company_name: str, interests: List[str]) -> float:
-        """Calculate advanced match score using company database and ML techniques"""
+    def _company_skill_similarity(self, resume_skills: List[str], company_name: str,
+                                  company_required_skills: List[str],
+                                  skill_similarities: Optional[np.ndarray] = None) -> float:
+        """Skill similarity for one company, read from the precomputed company matrix"""
+        state = self._ensure_company_embeddings()
+        if state is None:
+            # Lexical fallback: the company's row of the TF-IDF index
+            index = self.tfidf_index
+            row = index.row_of.get(company_name) if index is not None else None
+            if row is not None:
+                if skill_similarities is not None and row < len(skill_similarities):
+                    return float(skill_similarities[row])
+                return float(index.similarities(' '.join(resume_skills))[row])
+        row = state[0].get(company_name) if state is not None else None
+        if row is not None:
+            if skill_similarities is not None and row < len(skill_similarities):
+                return float(skill_similarities[row])
+            try:
+                query = self.encode_texts([' '.join(resume_skills)])[0]
+                return float(state[1][row] @ query)
+            except Exception as e:
+                print(f"Error in semantic similarity: {e}")
+        return self.semantic_similarity(' '.join(resume_skills), ' '.join(company_required_skills))
+    
+    def calculate_advanced_match_score(self, resume_data: Dict, company_name: str, interests: List[str],
+                                       skill_similarities: Optional[np.ndarray] = None) -> float:
+        """
+        Calculate advanced match score using company database and ML techniques.
+        skill_similarities is the output of company_skill_similarities() when scoring
+        many companies for the same resume.
+        """
         score = 0.0
         
-        # Get company information from database
-        company_info = self.company_database.get('companies', {}).get(company_name, {})
-        if not company_info:
+        # Get company information from the catalog (normalized at load time)
+        record = self.catalog.get(company_name)
+        if record is None or not record.info:
             # Fallback to basic matching if company not in database
             return self._basic_company_score(resume_data, company_name, interests)
         
         resume_skills = resume_data.get('skills', [])
-        resume_interests = resume_data.get('interests', [])
         
         # 1. Skills matching with company required skills (35% weight)
-        company_required_skills = company_info.get('required_skills', [])
-        if resume_skills and company_required_skills:
-            skill_similarity = self.semantic_similarity(
-                ' '.join(resume_skills), 
-                ' '.join(company_required_skills)
+        if resume_skills and record.required_skills:
+            skill_similarity = self._company_skill_similarity(
+                resume_skills, company_name, record.required_skills, skill_similarities
             )
             score += skill_similarity * 35
         
         # 2. Interest matching with company specializations (25% weight)
-        company_specializations = company_info.get('specializations', [])
+        company_specializations = record.specializations_lower
         interest_match_score = 0
         for interest in interests:
+            interest_lower = interest.lower()
             for spec in company_specializations:
-                if interest.lower() in spec.lower() or spec.lower() in interest.lower():
+                if interest_lower in spec or spec in interest_lower:
                     interest_match_score += 1
                     break
         
@@ -322,29 +805,21 @@ class AdvancedMLEngine:
         score += interest_match_score * 25
         
         # 3. Role preference matching (20% weight)
-        company_preferred_roles = company_info.get('preferred_roles', [])
-        resume_experience = resume_data.get('experience', [])
-        resume_projects = resume_data.get('projects', [])
-        
+        role_keywords = record.role_keywords
         role_match_score = 0
-        for role in company_preferred_roles:
-            role_lower = role.lower()
-            # Check if resume content matches role requirements
-            if any(keyword in ' '.join(resume_experience + resume_projects).lower() 
-                   for keyword in role_lower.split()):
-                role_match_score += 1
-        
-        if company_preferred_roles:
-            role_match_score = min(role_match_score / len(company_preferred_roles), 1.0)
+        if role_keywords:
+            resume_content = ' '.join(resume_data.get('experience', []) + resume_data.get('projects', [])).lower()
+            for keywords in role_keywords:
+                # Check if resume content matches role requirements
+                if any(keyword in resume_content for keyword in keywords):
+                    role_match_score += 1
+            role_match_score = min(role_match_score / len(role_keywords), 1.0)
         score += role_match_score * 20
         
         # 4. Company culture and focus matching (10% weight)
-        company_culture = company_info.get('company_culture', '')
-        internship_focus = company_info.get('internship_focus', '')
-        
+        culture_keywords = record.culture_keywords
         culture_match = 0
-        if company_culture:
-            culture_keywords = company_culture.lower().split(', ')
+        if culture_keywords:
             resume_text = ' '.join(resume_data.get('text', '').lower().split())
             culture_match = sum(1 for keyword in culture_keywords if keyword in resume_text)
             culture_match = min(culture_match / len(culture_keywords), 1.0)
@@ -352,8 +827,7 @@ class AdvancedMLEngine:
         score += culture_match * 10
         
         # 5. Company reputation and tier bonus (10% weight)
-        company_tier = self._get_company_tier(company_name)
-        score += company_tier * 10
+        score += record.tier * 10
         
         return min(100, max(0, score))
     
@@ -382,20 +856,8 @@ class AdvancedMLEngine:
     
     def _get_company_tier(self, company_name: str) -> float:
         """Get company tier score (0-1) based on reputation and size"""
-        company_lower = company_name.lower()
-        
-        # Tier 1: FAANG and top tech companies
-        if any(tier1 in company_lower for tier1 in ['microsoft', 'google', 'amazon', 'meta', 'apple', 'netflix', 'adobe']):
-            return 1.0
-        # Tier 2: Major Indian tech and consulting
-        elif any(tier2 in company_lower for tier2 in ['tcs', 'infosys', 'wipro', 'hcl', 'accenture', 'cognizant', 'deloitte']):
-            return 0.8
-        # Tier 3: Established companies
-        elif any(tier3 in company_lower for tier3 in ['capgemini', 'ibm', 'kpmg', 'pwc', 'mckinsey']):
-            return 0.6
-        # Tier 4: Other companies
-        else:
-            return 0.4
+        record = self.catalog.get(company_name)
+        return record.tier if record is not None else company_tier(company_name.lower())
     
     def train_company_classifier(self, training_data: List[Dict]):
         """Train company classification model"""
@@ -432,77 +894,81 @@ class AdvancedMLEngine:
     
     def get_perfect_recommendations(self, resume_data: Dict, interests: List[str], 
                                   companies: List[str], top_n: int = 5) -> List[Dict]:
-        """Get perfect recommendations using advanced ML techniques"""
-        
-        # Extract features from resume
-        resume_features = self.extract_advanced_features(resume_data.get('text', ''))
-        resume_skills = self.extract_skills_with_confidence(resume_data.get('text', ''))
-        
-        # Calculate scores for all companies
-        company_scores = []
-        
-        for company in companies:
-            # Create company data structure
-            company_data = {
-                'name': company,
-                'sector': self.predict_company_sector(company),
-                'required_skills': self._get_company_skills(company),
-                'experience_required': 'entry',  # Default for internships
-                'location': 'Remote',
-                'reputation_score': self._get_company_reputation(company)
-            }
+        """
+        Get perfect recommendations using advanced ML techniques: cheap retrieval of
+        RERANK_CANDIDATES companies, then full scoring of only those
+        """
+        timer = StageTimer("perfect_recommendations")
+        
+        # Stage one (retrieve): shortlist by ANN or lexical similarity
+        with timer.stage("retrieve"):
+            companies = self.retrieve_candidates(' '.join(interests + resume_data.get('skills', [])), companies)
+        timer.candidates = len(companies)
+        
+        # Stage two (rerank): sector prediction and advanced match score per candidate
+        with timer.stage("rerank"):
+            # Calculate scores for all candidates (resume skills are encoded once)
+            match_scores = self.calculate_advanced_match_scores(resume_data, companies, interests)
+            company_scores = []
             
-            # Calculate match score
-            match_score = self.calculate_advanced_match_score(
-                resume_data, company_data, interests
-            )
+            for company in companies:
+                # Create company data structure
+                company_data = {
+                    'name': company,
+                    'sector': self.predict_company_sector(company),
+                    'required_skills': self._get_company_skills(company),
+                    'experience_required': 'entry',  # Default for internships
+                    'location': 'Remote',
+                    'reputation_score': self._get_company_reputation(company)
+                }
+                
+                company_scores.append({
+                    'company': company,
+                    'score': match_scores[company],
+                    'sector': company_data['sector'],
+                    'data': company_data
+                })
             
-            company_scores.append({
-                'company': company,
-                'score': match_score,
-                'sector': company_data['sector'],
-                'data': company_data
-            })
-        
-        # Sort by score and return top N
-        company_scores.sort(key=lambda x: x['score'], reverse=True)
+            # Sort by score and return top N
+            company_scores.sort(key=lambda x: x['score'], reverse=True)
+        timer.finish()
         
         return company_scores[:top_n]
     
+    def retrieve_candidates(self, query_text: str, companies: List[str],
+                            limit: int = RERANK_CANDIDATES) -> List[str]:
+        """
+        The `limit` companies most similar to query_text by cheap signals only (in their
+        original order): the ANN index for large catalogs, otherwise the TF-IDF similarity
+        to each company's document (description, sector, skills, specializations, ...)
+        """
+        if limit <= 0 or len(companies) <= limit:
+            return companies
+        candidates = self.ann_candidates(query_text, k=limit)
+        if candidates is not None:
+            shortlist = set(candidates)
+            return [company for company in companies if company in shortlist]
+        index = self.tfidf_index
+        if index is None:
+            return companies
+        similarities = index.similarities(query_text)
+        rows = np.fromiter((index.row_of.get(company, -1) for company in companies), dtype=np.int64, count=len(companies))
+        scores = np.where(rows >= 0, similarities[np.maximum(rows, 0)], 0.0)
+        keep = np.sort(np.argsort(-scores, kind="stable")[:limit])
+        return [companies[i] for i in keep.tolist()]
+    
     def _get_company_skills(self, company: str) -> List[str]:
-        """Get relevant skills for a company based on its name and sector"""
-        company_lower = company.lower()
-        
-        # Tech companies - only match exact company names, not substrings
-        tech_companies = ['microsoft', 'google', 'amazon', 'meta', 'apple']
-        if any(company_lower == tc or company_lower.startswith(tc + " ") for tc in tech_companies):
-            return ['python', 'javascript', 'machine learning', 'cloud computing', 'data structures']
-        elif any(tech in company_lower for tech in ['tcs', 'infosys', 'wipro', 'hcl']):
-            return ['java', 'sql', 'testing', 'agile', 'project management']
-        elif any(fin in company_lower for fin in ['hdfc', 'icici', 'axis', 'bank']):
-            return ['financial analysis', 'risk management', 'compliance', 'data analysis']
-        
-        return ['communication', 'problem solving', 'teamwork']
+        """Get relevant skills for a company based on its name (exact brands, not substrings)"""
+        record = self.catalog.get(company)
+        return name_skills(record.name_lower if record is not None else company.lower())
     
     def _get_company_reputation(self, company: str) -> float:
         """Get company reputation score"""
-        company_lower = company.lower()
-        
-        # Tier 1 companies (FAANG, etc.) - only match exact company names, not substrings
-        tier1_companies = ['microsoft', 'google', 'amazon', 'meta', 'apple', 'netflix']
-        if any(company_lower == t1 or company_lower.startswith(t1 + " ") for t1 in tier1_companies):
-            return 10.0
-        # Tier 2 companies (Major tech, consulting)
-        elif any(tier2 in company_lower for tier2 in ['tcs', 'infosys', 'wipro', 'accenture', 'deloitte', 'mckinsey']):
-            return 8.0
-        # Tier 3 companies (Established companies)
-        elif any(tier3 in company_lower for tier3 in ['hcl', 'cognizant', 'capgemini', 'ibm']):
-            return 6.0
-        # Default
-        else:
-            return 5.0
+        record = self.catalog.get(company)
+        return record.reputation if record is not None else company_reputation(company.lower())
     
-    def add_feedback(self, recommendation_id: str, feedback_score: int, feedback_text: str = ""):
+    def add_feedback(self, recommendation_id: str, feedback_score: int, feedback_text: str = "",
+                     company: Optional[str] = None, profile: Optional[Dict[str, Any]] = None):
         """Add feedback to improve the model"""
         feedback_data = {
             'recommendation_id': recommendation_id,
@@ -513,6 +979,14 @@ class AdvancedMLEngine:
         
         self.training_data['feedback'].append(feedback_data)
         
+        # Positive feedback on a company labels the candidate's profile with it
+        if company and profile and feedback_score > 3:
+            try:
+                sector = self.company_database.get('companies', {}).get(company, {}).get('sector')
+                self.rule_miner.add(resume_transaction(profile, sector=sector, company=company))
+            except Exception as e:
+                print(f"Warning: Could not record feedback transaction: {e}")
+        
         # Retrain model if enough feedback is available
         if len(self.training_data['feedback']) >= 10:
             self._retrain_with_feedback()
@@ -531,6 +1005,8 @@ class AdvancedMLEngine:
             'total_feedback': len(self.training_data['feedback']),
             'average_feedback_score': np.mean([f['score'] for f in self.training_data['feedback']]) if self.training_data['feedback'] else 0,
             'model_accuracy': 'N/A',  # Would be calculated from test data
+            'embedding_cache': self.embedding_cache.stats(),
+            'embedding_batcher': self.embedding_batcher.stats(),
             'last_updated': datetime.now().isoformat()
         }
 
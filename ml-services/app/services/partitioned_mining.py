@@ -0,0 +1,239 @@
+"""
+Out-of-core, multi-process association rule mining (SON algorithm) over JSON Lines
+transaction logs
+- Pass 1: every partition (a byte range of a log file) is mined independently in a
+  worker process at the same relative support. Any globally frequent itemset is
+  frequent in at least one partition, so the union of local results is a complete
+  candidate set.
+- Pass 2: workers count the global support of the candidates over the same
+  partitions; only itemsets reaching the global minimum count are kept.
+A worker holds one partition and the candidate set at a time, so memory per worker
+is bounded by the chunk size, not the log size. Rules have the same structure as
+mine_association_rules().
+Run `python -m app.services.partitioned_mining --help`
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.association_rules import (
+    ASSOCIATION_RULE_CONFIG,
+    COMPANY,
+    COMPANY_DATABASE_PATH,
+    RULES_PATH,
+    SECTOR,
+    TransactionDatabase,
+    _ItemsetCounts,
+    _max_length,
+    _min_count,
+    _popcount,
+    _rules_from_itemsets,
+    catalog_transactions,
+    frequent_itemsets,
+    item_bitmaps,
+)
+
+# Partition size in bytes of JSON Lines
+CHUNK_BYTES = 64 * 1024 * 1024
+
+# A partition: ("file", path, start, end) byte range, or ("rows", [transactions])
+Partition = Tuple[Any, ...]
+# An itemset over (kind, value) items, independent of any worker's item ids
+Itemset = frozenset
+
+
+def file_partitions(path: str, chunk_bytes: int = CHUNK_BYTES) -> List[Partition]:
+    """Line-aligned byte ranges of roughly chunk_bytes covering the file"""
+    size = os.path.getsize(path)
+    partitions = []
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            if start + chunk_bytes >= size:
+                end = size
+            else:
+                f.seek(start + chunk_bytes)
+                f.readline()
+                end = f.tell()
+            partitions.append(("file", path, start, end))
+            start = end
+    return partitions
+
+
+def _partition_transactions(partition: Partition) -> Iterator[Dict[str, Any]]:
+    if partition[0] == "rows":
+        yield from partition[1]
+        return
+    _, path, start, end = partition
+    with open(path, "rb") as f:
+        f.seek(start)
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _partition_database(partition: Partition) -> TransactionDatabase:
+    return TransactionDatabase().update(_partition_transactions(partition))
+
+
+def _decode(database: TransactionDatabase, ids: Iterable[int]) -> Itemset:
+    return frozenset(database.items[item] for item in ids)
+
+
+def _local_candidates(partition: Partition, config: Dict[str, Any]) -> Tuple[int, Tuple[set, set]]:
+    """Pass 1 worker: (transactions, (skill family, interest family) locally frequent itemsets)"""
+    database = _partition_database(partition)
+    if not database.total:
+        return 0, (set(), set())
+    min_count = _min_count(config, database.total)
+    targets = database.targets()
+    families = []
+    for paths in (database.skill_paths, database.interest_paths):
+        frequent = frequent_itemsets(paths, min_count, _max_length(config), targets)
+        families.append({_decode(database, itemset) for itemset in frequent})
+    return database.total, tuple(families)
+
+
+# Pass 2 worker state: the candidate itemsets per family, sent once per process
+_candidates: Tuple[set, set] = (set(), set())
+
+
+def _init_counter(candidates: Tuple[set, set]):
+    global _candidates
+    _candidates = candidates
+
+
+def _count_candidates(partition: Partition) -> Tuple[Dict[Itemset, int], Dict[Itemset, int]]:
+    """Pass 2 worker: support of every candidate itemset within the partition"""
+    database = _partition_database(partition)
+    ids = database._ids
+    supports = []
+    for family, paths in zip(_candidates, (database.skill_paths, database.interest_paths)):
+        counts: Dict[Itemset, int] = {}
+        supports.append(counts)
+        if not paths:
+            continue
+        _, bitmap, item_rows = item_bitmaps(paths)
+        item_bits: Dict[int, np.ndarray] = {}
+        # Depth first over the candidate trie, ANDing one item bitmap per level;
+        # subtrees under an absent item or a zero count are skipped
+        stack = [((), _ItemsetCounts(dict.fromkeys(family, 0)).root, None)]
+        while stack:
+            prefix, children, bits = stack.pop()
+            for item, (_, grandchildren) in children.items():
+                item_id = ids.get(item)
+                if item_id is None:
+                    continue
+                if item_id not in item_bits:
+                    item_bits[item_id] = bitmap(item_rows(item_id))
+                joined = item_bits[item_id] if bits is None else bits & item_bits[item_id]
+                count = _popcount(joined)
+                if count:
+                    itemset = prefix + (item,)
+                    counts[frozenset(itemset)] = count
+                    if grandchildren:
+                        stack.append((itemset, grandchildren, joined))
+    return tuple(supports)
+
+
+def mine_partitioned(partitions: List[Partition], config: Optional[Dict[str, Any]] = None,
+                     workers: Optional[int] = None) -> Dict[str, Any]:
+    """Two-pass SON mining over partitions; same output as mine_association_rules()"""
+    config = {**ASSOCIATION_RULE_CONFIG, **(config or {})}
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        local = list(executor.map(_local_candidates, partitions, [config] * len(partitions)))
+    total = sum(count for count, _ in local)
+    candidates = (set().union(*(families[0] for _, families in local)),
+                  set().union(*(families[1] for _, families in local)))
+    pass_one = time.perf_counter() - start
+
+    supports = (Counter(), Counter())
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_counter, initargs=(candidates,)) as executor:
+        for partial in executor.map(_count_candidates, partitions):
+            for family, counts in zip(supports, partial):
+                family.update(counts)
+
+    # Globally frequent itemsets, re-encoded over one shared item vocabulary
+    min_count = _min_count(config, total) if total else 1
+    items = sorted({item for family in supports for itemset in family for item in itemset})
+    ids = {item: item_id for item_id, item in enumerate(items)}
+    targets = frozenset(ids[item] for item in items if item[0] in (SECTOR, COMPANY))
+    families = []
+    for family in supports:
+        frequent = {frozenset(ids[item] for item in itemset): count
+                    for itemset, count in family.items() if count >= min_count}
+        families.append(frequent)
+    skill_rules, interest_rules = (_rules_from_itemsets(frequent, items, targets, total, config) if total else {}
+                                   for frequent in families)
+
+    return {
+        "association_rules": {
+            "skill_company_rules": skill_rules,
+            "interest_sector_rules": interest_rules,
+        },
+        "config": config,
+        "stats": {
+            "transactions": total,
+            "partitions": len(partitions),
+            "candidate_itemsets": len(candidates[0]) + len(candidates[1]),
+            "frequent_itemsets": len(families[0]) + len(families[1]),
+            "rules": len(skill_rules) + len(interest_rules),
+            "pass_one_seconds": round(pass_one, 3),
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partitioned (SON) association rule mining over JSON Lines logs")
+    parser.add_argument("transactions", nargs="+", help="JSON Lines files of transactions")
+    parser.add_argument("--catalog", default=COMPANY_DATABASE_PATH, help="company database to add as transactions")
+    parser.add_argument("--no-catalog", action="store_true", help="mine the transaction files only")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=float, default=CHUNK_BYTES / (1024 * 1024), help="partition size")
+    parser.add_argument("--min-support", type=float, default=ASSOCIATION_RULE_CONFIG["min_support"])
+    parser.add_argument("--min-confidence", type=float, default=ASSOCIATION_RULE_CONFIG["min_confidence"])
+    parser.add_argument("--min-lift", type=float, default=ASSOCIATION_RULE_CONFIG["min_lift"])
+    parser.add_argument("--max-antecedent-length", type=int, default=ASSOCIATION_RULE_CONFIG["max_antecedent_length"])
+    parser.add_argument("--output", default=RULES_PATH, help="rules file to write ('-' for stdout)")
+    args = parser.parse_args()
+
+    chunk_bytes = max(1, int(math.ceil(args.chunk_mb * 1024 * 1024)))
+    partitions = [partition for path in args.transactions for partition in file_partitions(path, chunk_bytes)]
+    if not args.no_catalog:
+        with open(args.catalog, "r", encoding="utf-8") as f:
+            partitions.append(("rows", list(catalog_transactions(json.load(f).get("companies", {})))))
+
+    result = mine_partitioned(partitions, {
+        "min_support": args.min_support,
+        "min_confidence": args.min_confidence,
+        "min_lift": args.min_lift,
+        "max_antecedent_length": args.max_antecedent_length,
+    }, workers=args.workers)
+
+    if args.output == "-":
+        print(json.dumps(result, indent=2))
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        temp_path = f"{args.output}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        os.replace(temp_path, args.output)
+        stats = result["stats"]
+        print(f"Mined {stats['rules']} rules from {stats['transactions']} transactions in "
+              f"{stats['partitions']} partitions ({stats['candidate_itemsets']} candidates, "
+              f"{stats['frequent_itemsets']} frequent itemsets) in {stats['elapsed_seconds']}s -> {args.output}")
@@ -0,0 +1,536 @@
+"""
+Resume text extraction and inference, run off the event loop
+PDF/DOCX extraction and the NLP inference (TextBlob, NLTK POS tagging) are CPU
+bound, so /parse_resume dispatches them to a process pool whose workers preload
+the parsing libraries once. Every job has a timeout; a job that overruns is
+cancelled, or its own worker process is replaced when it is already running.
+"""
+
+import asyncio
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, BinaryIO, Callable, List, Optional, Tuple, Union
+
+from app.services.skill_lexicon import SKILL_LEXICON
+
+try:
+    # Optional dependencies; declared in requirements.txt
+    import PyPDF2  # type: ignore
+except Exception:  # pragma: no cover - optional import
+    PyPDF2 = None  # type: ignore
+
+try:
+    import docx  # python-docx  # type: ignore
+except Exception:  # pragma: no cover - optional import
+    docx = None  # type: ignore
+
+
+# Parser worker processes (0 = parse in a thread of the server process) and per-job timeout
+PARSE_WORKERS = int(os.environ.get("ML_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARSE_TIMEOUT = float(os.environ.get("ML_PARSE_TIMEOUT", "30"))
+# "spawn" keeps workers independent of the server's threads and loaded models
+PARSE_START_METHOD = os.environ.get("ML_PARSE_START_METHOD", "spawn")
+
+# Upload and document budgets: hard byte cap on the upload, uploads above the spool
+# size go to a temp file, and extraction stops at the page / character / DOCX
+# uncompressed-size budget
+UPLOAD_MAX_BYTES = int(os.environ.get("ML_UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_BYTES = int(os.environ.get("ML_UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+PARSE_MAX_PAGES = int(os.environ.get("ML_PARSE_MAX_PAGES", "50"))
+PARSE_MAX_CHARS = int(os.environ.get("ML_PARSE_MAX_CHARS", "200000"))
+DOCX_MAX_UNCOMPRESSED_BYTES = int(os.environ.get("ML_DOCX_MAX_UNCOMPRESSED_BYTES", str(50 * 1024 * 1024)))
+
+# An upload is either its bytes or the path of the temp file it was spooled to
+Upload = Union[bytes, str]
+
+
+class UploadTooLarge(ValueError):
+    """The upload exceeded UPLOAD_MAX_BYTES"""
+
+
+class DocumentTooLarge(ValueError):
+    """The document exceeded the page, character or uncompressed-size budget"""
+
+
+class _Spool:
+    """Chunks of one upload: kept in memory up to spool_bytes, then in a temp file"""
+
+    def __init__(self, max_bytes: int, spool_bytes: int, suffix: str = ""):
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self.suffix = suffix
+        self.size = 0
+        self._buffer = bytearray()
+        self._file = None
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadTooLarge(f"upload exceeds the {self.max_bytes} byte limit")
+        if self._file is None and len(self._buffer) + len(chunk) <= self.spool_bytes:
+            self._buffer += chunk
+            return
+        if self._file is None:
+            self._file = tempfile.NamedTemporaryFile(prefix="resume-", suffix=self.suffix, delete=False)
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        self._file.write(chunk)
+
+    def finish(self) -> Tuple[Upload, int]:
+        if self._file is not None:
+            self._file.close()
+            return self._file.name, self.size
+        return bytes(self._buffer), self.size
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+            discard_upload(self._file.name)
+
+
+async def spool_upload(file, max_bytes: int = UPLOAD_MAX_BYTES,
+                       spool_bytes: int = UPLOAD_SPOOL_BYTES) -> Tuple[Upload, int]:
+    """
+    Read an UploadFile in chunks: (bytes, size) for small uploads, (temp file path,
+    size) once it outgrows spool_bytes. Raises UploadTooLarge as soon as max_bytes is
+    passed. The caller removes a returned path with discard_upload().
+    """
+    size = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        raise UploadTooLarge(f"upload is {size} bytes, the limit is {max_bytes}")
+
+    spool = _Spool(max_bytes, spool_bytes, os.path.splitext(getattr(file, "filename", "") or "")[1])
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            spool.write(chunk)
+    except BaseException:
+        spool.discard()
+        raise
+    return spool.finish()
+
+
+def extract_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, max_bytes: int = UPLOAD_MAX_BYTES,
+                   spool_bytes: int = UPLOAD_SPOOL_BYTES) -> Tuple[Upload, int]:
+    """spool_upload() for one member of a ZIP archive (blocking; run it in a thread)"""
+    if info.file_size > max_bytes:
+        raise UploadTooLarge(f"file is {info.file_size} bytes, the limit is {max_bytes}")
+    spool = _Spool(max_bytes, spool_bytes, os.path.splitext(info.filename)[1])
+    try:
+        with archive.open(info) as member:
+            while True:
+                chunk = member.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                spool.write(chunk)
+    except BaseException:
+        spool.discard()
+        raise
+    return spool.finish()
+
+
+def archive_members(archive: zipfile.ZipFile) -> list:
+    """Resume entries of a ZIP archive: regular files, without macOS/hidden metadata"""
+    members = []
+    for info in archive.infolist():
+        name = info.filename
+        base = os.path.basename(name)
+        if info.is_dir() or not base or base.startswith(".") or name.startswith("__MACOSX/"):
+            continue
+        members.append(info)
+    return members
+
+
+def is_archive(filename: str, mime: Optional[str]) -> bool:
+    """ZIP uploads are told apart by name/type only, since a DOCX is a ZIP as well"""
+    mime = (mime or "").lower()
+    return (os.path.splitext(filename or "")[1].lower() == ".zip"
+            or mime in ("application/zip", "application/x-zip-compressed"))
+
+
+def discard_upload(upload: Upload):
+    """Remove the temp file of a spooled upload (no-op for in-memory uploads)"""
+    if isinstance(upload, str):
+        try:
+            os.unlink(upload)
+        except OSError:
+            pass
+
+
+def _open_upload(upload: Upload) -> BinaryIO:
+    return open(upload, "rb") if isinstance(upload, str) else io.BytesIO(upload)
+
+
+def _check_chars(total: int, max_chars: int):
+    if total > max_chars:
+        raise DocumentTooLarge(f"document has more than {max_chars} characters of text")
+
+
+def _extract_text_from_pdf(content_stream: BinaryIO, max_pages: int = PARSE_MAX_PAGES,
+                           max_chars: int = PARSE_MAX_CHARS) -> str:
+    if PyPDF2 is None:
+        return ""
+    try:
+        reader = PyPDF2.PdfReader(content_stream)
+        pages = getattr(reader, "pages", [])
+        if len(pages) > max_pages:
+            raise DocumentTooLarge(f"PDF has {len(pages)} pages, the limit is {max_pages}")
+        texts = []
+        total = 0
+        for page in pages:
+            try:
+                text = page.extract_text() or ""
+            except Exception:
+                continue
+            texts.append(text)
+            total += len(text)
+            _check_chars(total, max_chars)
+        return "\n".join(texts)
+    except DocumentTooLarge:
+        raise
+    except Exception:
+        return ""
+
+
+def _extract_text_from_docx(content_stream: BinaryIO, max_chars: int = PARSE_MAX_CHARS,
+                            max_uncompressed: int = DOCX_MAX_UNCOMPRESSED_BYTES) -> str:
+    if docx is None:
+        return ""
+    try:
+        # A DOCX is a ZIP; refuse highly compressed archives before inflating anything
+        with zipfile.ZipFile(content_stream) as archive:
+            uncompressed = sum(info.file_size for info in archive.infolist())
+        if uncompressed > max_uncompressed:
+            raise DocumentTooLarge(f"DOCX inflates to {uncompressed} bytes, the limit is {max_uncompressed}")
+        content_stream.seek(0)
+        document = docx.Document(content_stream)
+        texts = []
+        total = 0
+        for p in document.paragraphs:
+            if p.text:
+                texts.append(p.text)
+                total += len(p.text)
+                _check_chars(total, max_chars)
+        return "\n".join(texts)
+    except DocumentTooLarge:
+        raise
+    except Exception:
+        return ""
+
+
+def extract_text_generic(filename: str, data: Upload, mime: Optional[str]) -> str:
+    """Text of an upload (bytes or spooled temp file path), within the page/character budget"""
+    ext = (os.path.splitext(filename or "")[1] or "").lower()
+    mime = (mime or "").lower()
+
+    with _open_upload(data) as stream:
+        if ext == ".pdf" or "pdf" in mime:
+            return _extract_text_from_pdf(stream)
+        if ext == ".docx" or "officedocument.wordprocessingml.document" in mime:
+            return _extract_text_from_docx(stream)
+        # Fallback: try decode as text
+        try:
+            text = stream.read(PARSE_MAX_CHARS * 4 + 1).decode("utf-8", errors="ignore")
+        except Exception:
+            return ""
+    _check_chars(len(text), PARSE_MAX_CHARS)
+    return text
+
+
+def infer_from_text(text: str) -> dict:
+    """Enhanced resume parsing using advanced ML engine"""
+    try:
+        from app.services.ml_engine import ml_engine
+
+        # Use advanced ML engine for better parsing (the skill lexicon scans the text once)
+        skill_matches = SKILL_LEXICON.match(text)
+        features = ml_engine.extract_advanced_features(text, skill_matches)
+        skills_with_confidence = ml_engine.extract_skills_with_confidence(text, skill_matches)
+
+        # Extract skills from confidence-based extraction
+        found_skills = [skill for skill, confidence in skills_with_confidence if confidence > 0.5]
+
+        # Enhanced interest detection using ML
+        lowered = text.lower()
+        interest_keywords_map = {
+            "data science": ["data", "pandas", "numpy", "ml", "machine", "analytics", "statistics", "analysis"],
+            "ai-ml": ["ml", "machine", "deep", "neural", "ai", "pytorch", "tensorflow", "artificial intelligence"],
+            "web development": ["react", "node", "javascript", "typescript", "css", "html", "frontend", "backend"],
+            "cloud": ["aws", "azure", "gcp", "kubernetes", "docker", "cloud", "devops"],
+            "devops": ["docker", "kubernetes", "ci", "cd", "jenkins", "pipeline", "automation"],
+            "cybersecurity": ["security", "owasp", "vulnerability", "penetration", "threat", "cyber"],
+            "mobile": ["android", "ios", "flutter", "react native", "mobile development"],
+            "product design": ["product design", "ui/ux", "ux", "ui", "design", "wireframe", "prototype", "figma", "sketch", "invision", "framer", "adobe xd", "adobe"],
+            "video editing": ["video editing", "video", "editing", "premiere", "after effects", "final cut", "davinci", "resolve", "film", "cinematography", "motion graphics", "animation", "post production"],
+            "graphic design": ["graphic design", "photoshop", "illustrator", "indesign", "canva", "visual design", "branding", "logo", "typography", "layout"],
+            "content creation": ["content creation", "content", "social media", "youtube", "instagram", "tiktok", "blogging", "writing", "copywriting", "marketing"],
+            "photography": ["photography", "photo", "camera", "lightroom", "photoshop", "portrait", "landscape", "wedding", "fashion", "commercial"],
+            "music production": ["music production", "music", "audio", "sound", "mixing", "mastering", "recording", "studio", "pro tools", "ableton", "logic"],
+            "gaming": ["gaming", "game development", "unity", "unreal", "game design", "level design", "game art", "3d modeling", "animation", "game programming"]
+        }
+
+        inferred_interests = []
+        for label, kws in interest_keywords_map.items():
+            if any((kw in lowered) for kw in kws):
+                inferred_interests.append(label)
+
+        # Enhanced experience and project extraction
+        experience = []
+        projects = []
+        education = []
+
+        for line in lowered.splitlines():
+            line_stripped = line.strip()
+            if not line_stripped:
+                continue
+            if any(h in line_stripped for h in ["experience", "intern", "worked", "company", "employment", "position", "role"]):
+                experience.append(line.strip())
+            if any(h in line_stripped for h in ["project", "built", "developed", "created", "implemented", "designed"]):
+                projects.append(line.strip())
+            if any(h in line_stripped for h in ["b.tech", "btech", "bachelor", "master", "university", "college", "degree", "education", "graduated"]):
+                education.append(line.strip())
+
+        # Location is not parsed from resume - always set to None
+        location = None
+
+        # Ensure at least one interest to avoid downstream errors
+        if not inferred_interests and found_skills:
+            # Map some common skills to interests using ML confidence
+            if any(s in found_skills for s in ["pandas", "numpy", "scikit-learn", "tensorflow", "pytorch"]):
+                inferred_interests.append("ai-ml")
+            if any(s in found_skills for s in ["react", "javascript", "typescript", "html", "css", "node"]):
+                inferred_interests.append("web development")
+            if any(s in found_skills for s in ["aws", "azure", "gcp", "docker", "kubernetes"]):
+                inferred_interests.append("cloud")
+
+        return {
+            "skills": sorted(set(found_skills)),
+            "interests": sorted(set(inferred_interests)),
+            "experience": experience[:20],
+            "projects": projects[:20],
+            "education": education[:20],
+            "location": location,
+            "ml_features": features,  # Include ML-extracted features
+            "skills_confidence": skills_with_confidence
+        }
+    except Exception as e:
+        print(f"Error in advanced parsing: {e}")
+        # Fallback to basic parsing
+        return basic_infer_from_text(text)
+
+def basic_infer_from_text(text: str) -> dict:
+    """Basic fallback parsing method"""
+    found_skills = list(SKILL_LEXICON.match(text))
+
+    # Basic interest mapping
+    inferred_interests = []
+    if any(s in found_skills for s in ["pandas", "numpy", "scikit-learn", "tensorflow", "pytorch"]):
+        inferred_interests.append("ai-ml")
+    if any(s in found_skills for s in ["react", "javascript", "typescript", "html", "css", "node"]):
+        inferred_interests.append("web development")
+    if any(s in found_skills for s in ["aws", "azure", "gcp", "docker", "kubernetes"]):
+        inferred_interests.append("cloud")
+
+    return {
+        "skills": sorted(set(found_skills)),
+        "interests": sorted(set(inferred_interests)),
+        "experience": [],
+        "projects": [],
+        "education": [],
+        "location": None,
+    }
+
+
+def parse_document(filename: str, data: Upload, mime: Optional[str]) -> dict:
+    """Extract the text of an uploaded resume and infer its profile (one pool job)"""
+    return infer_from_text(extract_text_generic(filename, data, mime))
+
+
+def _init_worker():
+    """Preload the parsing libraries once per worker process"""
+    try:
+        from app.services.ml_engine import ml_engine
+        ml_engine.warmup_parsing()
+    except Exception as e:
+        print(f"Warning: Parser worker could not preload parsing helpers: {e}")
+
+
+def _worker_ready() -> bool:
+    return True
+
+
+class ParseTimeout(TimeoutError):
+    """A parsing job did not finish within the pool's timeout"""
+
+
+class ParserUnavailable(RuntimeError):
+    """A parser worker could not be started (or kept dying)"""
+
+
+class ParserPool:
+    """
+    Resume parsing jobs in worker processes. Each worker is its own single-process
+    executor (a slot) running one job at a time, so a job can be stopped by replacing
+    only its own worker. run() awaits a job without blocking the event loop. Waiting
+    for a slot, the worker's warm-up and the job all count towards the timeout. On
+    timeout, or when the awaiting request is cancelled, the job's worker is replaced.
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS, timeout: float = PARSE_TIMEOUT,
+                 start_method: str = PARSE_START_METHOD):
+        self.workers = workers
+        self.timeout = timeout
+        self.start_method = start_method
+        slots = max(0, workers)
+        self._executors: List[Optional[ProcessPoolExecutor]] = [None] * slots
+        # Per slot: completes once its worker has started and preloaded
+        self._ready: List[Optional[Future]] = [None] * slots
+        self._idle: List[int] = list(range(slots))
+        # Counts idle slots for the event loop that uses the pool
+        self._free: Optional[asyncio.Semaphore] = None
+        self._free_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def _slot_executor(self, slot: int) -> Tuple[ProcessPoolExecutor, Future]:
+        with self._lock:
+            executor = self._executors[slot]
+            if executor is None:
+                executor = self._executors[slot] = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                )
+                # Spawn and warm the worker now
+                self._ready[slot] = executor.submit(_worker_ready)
+            return executor, self._ready[slot]
+
+    def start(self):
+        """Start every worker now instead of on the first upload"""
+        for slot in range(len(self._executors)):
+            self._slot_executor(slot)
+
+    def _recycle(self, slot: int, executor: ProcessPoolExecutor):
+        """Kill the worker of one slot (running a runaway job); the next job starts a fresh one"""
+        with self._lock:
+            if self._executors[slot] is not executor:
+                return
+            self._executors[slot] = None
+            self._ready[slot] = None
+            self.restarts += 1
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free_loop is not loop:
+                self._free_loop = loop
+                self._free = asyncio.Semaphore(len(self._idle))
+            return self._free
+
+    def _release(self, slot: int, free: asyncio.Semaphore):
+        with self._lock:
+            self._idle.append(slot)
+        free.release()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Result of fn(*args) from a worker; raises ParseTimeout after timeout seconds and
+        ParserUnavailable when no worker can be started
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if not self._executors:
+            # In-process fallback: off the event loop, but a thread cannot be killed on timeout
+            try:
+                return await asyncio.wait_for(asyncio.to_thread(fn, *args), timeout)
+            except asyncio.TimeoutError:
+                raise ParseTimeout(f"Parsing did not finish within {timeout:g}s")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        free = self._semaphore()
+        acquire = asyncio.ensure_future(free.acquire())
+        try:
+            await asyncio.wait({acquire}, timeout=timeout)
+        except asyncio.CancelledError:
+            if acquire.done() and not acquire.cancelled():
+                free.release()
+            else:
+                acquire.cancel()
+            raise
+        if not acquire.done():
+            acquire.cancel()
+            raise ParseTimeout(f"No parser worker became free within {timeout:g}s")
+        with self._lock:
+            slot = self._idle.pop()
+        try:
+            for attempt in range(2):
+                executor, ready = self._slot_executor(slot)
+                job: Optional[Future] = None
+                try:
+                    # The worker's warm-up is under the same deadline as the job
+                    await self._wait(ready, deadline, timeout)
+                    job = executor.submit(fn, *args)
+                    return await self._wait(job, deadline, timeout)
+                except BrokenProcessPool:
+                    # The worker died (crashed, or failed to start): replace it and retry once
+                    self._recycle(slot, executor)
+                    if attempt or loop.time() >= deadline:
+                        raise ParserUnavailable("Parser worker could not be started")
+                except ParseTimeout:
+                    if job is None or not job.cancel():
+                        self._recycle(slot, executor)
+                    raise
+                except asyncio.CancelledError:
+                    if job is None or not job.cancel():
+                        self._recycle(slot, executor)
+                    raise
+        finally:
+            self._release(slot, free)
+
+    @staticmethod
+    async def _wait(future: Future, deadline: float, timeout: float) -> Any:
+        """Outcome of a worker future, or ParseTimeout at deadline; cancelling the wait never cancels the future"""
+        waiter = asyncio.wrap_future(future)
+        loop = asyncio.get_running_loop()
+        done = set()
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=max(0.0, deadline - loop.time()))
+        finally:
+            if not done:
+                # Nobody awaits it any more; retrieve its outcome so it is not logged
+                waiter.add_done_callback(lambda finished: finished.cancelled() or finished.exception())
+        if not done:
+            raise ParseTimeout(f"Parsing did not finish within {timeout:g}s")
+        return waiter.result()
+
+    def shutdown(self):
+        with self._lock:
+            executors, self._executors = self._executors, [None] * len(self._executors)
+            self._ready = [None] * len(self._executors)
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {"workers": self.workers, "timeout": self.timeout, "restarts": self.restarts, "idle": idle}
+
+
+# Shared pool for the API process
+PARSER_POOL = ParserPool()
@@ -0,0 +1,212 @@
+"""
+Serving layer for mined association rules
+Rules are indexed by a prefix trie over their sorted antecedents, so a profile
+only visits the antecedent prefixes it contains instead of testing every rule.
+Matches are aggregated into per-sector / per-company confidences before any
+company is expanded. Rules come from one source, fixed at startup: the rules
+file, reloaded atomically when a new one is published (see association_rules.py),
+or an in-process IncrementalRuleMiner kept current as transactions arrive
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.association_rules import RULES_PATH, normalize_item
+
+# Seconds between checks of the rules file for a newer version
+RELOAD_INTERVAL = float(os.environ.get("ML_RULES_RELOAD_INTERVAL", "5"))
+# Where served rules come from: "file" (the published rules file; no file, no rules),
+# "live" (the in-process miner over the replayed transaction log, updated as
+# transactions arrive) or "auto" (the file when one exists at startup, otherwise live).
+# Live rules change recommendations, so they are opt-in
+RULES_SOURCE = os.environ.get("ML_RULES_SOURCE", "file")
+RULE_SOURCES = ("auto", "file", "live")
+
+# (rule family, profile field) pairs served from the index
+RULE_FAMILIES = (("skill_company_rules", "skills"), ("interest_sector_rules", "interests"))
+
+
+class _TrieNode:
+    __slots__ = ("children", "rules")
+
+    def __init__(self):
+        self.children: Dict[int, "_TrieNode"] = {}
+        self.rules: List[int] = []
+
+
+class RuleIndex:
+    """Immutable antecedent index over one `association_rules` structure"""
+
+    def __init__(self, association_rules: Dict[str, Dict[str, Dict[str, Any]]]):
+        self.rules: List[Tuple[str, Dict[str, Any]]] = []
+        self._vocabularies: Dict[str, Dict[str, int]] = {}
+        self._roots: Dict[str, _TrieNode] = {}
+        for family, _ in RULE_FAMILIES:
+            vocabulary: Dict[str, int] = {}
+            root = _TrieNode()
+            for name, rule in (association_rules.get(family) or {}).items():
+                items = {normalize_item(item) for item in rule.get("antecedent", [])}
+                if not items or not rule.get("consequent"):
+                    continue
+                ids = sorted(vocabulary.setdefault(item, len(vocabulary)) for item in items)
+                node = root
+                for item_id in ids:
+                    node = node.children.setdefault(item_id, _TrieNode())
+                node.rules.append(len(self.rules))
+                self.rules.append((name, rule))
+            self._vocabularies[family] = vocabulary
+            self._roots[family] = root
+        # Hash of what aggregate() reads from each rule, so support / lift drift or a
+        # renamed rule does not count as a change
+        served = sorted(
+            (family, sorted({normalize_item(item) for item in rule.get("antecedent", [])}),
+             rule.get("consequent_type") == "company", str(rule["consequent"]), float(rule.get("confidence", 0.0)))
+            for family, _ in RULE_FAMILIES
+            for rule in (association_rules.get(family) or {}).values()
+            if rule.get("antecedent") and rule.get("consequent")
+        )
+        self.fingerprint = hashlib.blake2b(json.dumps(served).encode("utf-8"), digest_size=16).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, profile: Dict[str, List[str]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Every (name, rule) whose antecedent is contained in the profile"""
+        matched: List[int] = []
+        for family, field in RULE_FAMILIES:
+            vocabulary = self._vocabularies[family]
+            ids = sorted({vocabulary[item] for item in (normalize_item(value) for value in profile.get(field) or [])
+                          if item in vocabulary})
+            # Depth-first over trie prefixes made only of profile items
+            stack = [(self._roots[family], 0)]
+            while stack:
+                node, start = stack.pop()
+                for position in range(start, len(ids)):
+                    child = node.children.get(ids[position])
+                    if child is not None:
+                        matched.extend(child.rules)
+                        if child.children:
+                            stack.append((child, position + 1))
+        return [self.rules[index] for index in sorted(matched)]
+
+    def aggregate(self, profile: Dict[str, List[str]]) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Best rule confidence per consequent: ({sector tag: conf}, {company: conf})"""
+        sectors: Dict[str, float] = {}
+        companies: Dict[str, float] = {}
+        for _, rule in self.match(profile):
+            target = companies if rule.get("consequent_type") == "company" else sectors
+            consequent = rule["consequent"]
+            target[consequent] = max(target.get(consequent, 0.0), float(rule.get("confidence", 0.0)))
+        return sectors, companies
+
+
+class RuleStore:
+    """
+    Current RuleIndex for one rule source. Readers take the index reference once per
+    request; reload() builds a new index and swaps the reference, so a request
+    never sees a half-loaded rule set. The source is chosen once, in the constructor,
+    so responses never switch between file and live rules at runtime.
+    """
+
+    def __init__(self, path: Optional[str] = RULES_PATH, reload_interval: float = RELOAD_INTERVAL,
+                 live_source: Optional[Callable[[], Any]] = None, source: str = RULES_SOURCE):
+        self.path = path
+        self.reload_interval = reload_interval
+        # Returns anything with `version` and `rules()` (IncrementalRuleMiner). Called on
+        # the first reload, so building the miner (replaying the transaction log) never
+        # happens at import
+        self.live_source = live_source
+        if source not in RULE_SOURCES:
+            print(f"Warning: Unknown ML_RULES_SOURCE {source!r}, using auto")
+            source = "auto"
+        if source == "live" and live_source is None:
+            print("Warning: Live rules requested without a rule miner; serving the rules file")
+            source = "file"
+        if source == "auto":
+            source = "file" if live_source is None or self._file_stamp() is not None else "live"
+        self.source = source
+        self.index = RuleIndex({})
+        self.loaded_at: Optional[float] = None
+        # Bumped only when a swap changes the served rules
+        self.generation = 0
+        self._live = None
+        self._live_version: Optional[int] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        if source == "file":
+            self.reload()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except (OSError, TypeError):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild the index if the source changed since the last load; True when swapped"""
+        with self._lock:
+            self._checked = time.monotonic()
+            if self.source == "live":
+                return self._reload_live(force)
+            return self._reload_file(force)
+
+    def _reload_file(self, force: bool) -> bool:
+        stamp = self._file_stamp()
+        if stamp is None or (stamp == self._stamp and not force):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            index = RuleIndex(data.get("association_rules", data))
+        except Exception as e:
+            print(f"Warning: Could not load association rules from {self.path}: {e}")
+            return False
+        self._stamp = stamp
+        return self.publish(index)
+
+    def _reload_live(self, force: bool) -> bool:
+        try:
+            if self._live is None:
+                self._live = self.live_source()
+            version = self._live.version
+            if version == self._live_version and not force:
+                return False
+            index = RuleIndex(self._live.rules())
+        except Exception as e:
+            print(f"Warning: Could not load live association rules: {e}")
+            return False
+        self._live_version = version
+        return self.publish(index)
+
+    def maybe_reload(self):
+        """Cheap per-request hook: check for new rules at most every reload_interval seconds"""
+        if time.monotonic() - self._checked >= self.reload_interval:
+            self.reload()
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the served rules"""
+        return self.index.fingerprint
+
+    def publish(self, index: RuleIndex) -> bool:
+        """Swap in a new index (e.g. rules mined in-process); False when its rules are unchanged"""
+        self.loaded_at = time.time()
+        if index.fingerprint == self.index.fingerprint:
+            return False
+        self.index = index
+        self.generation += 1
+        return True
+
+    def aggregate(self, skills: List[str], interests: List[str]) -> Tuple[Dict[str, float], Dict[str, float]]:
+        return self.index.aggregate({"skills": skills, "interests": interests})
+
+    def stats(self) -> Dict[str, Any]:
+        return {"rules": len(self.index), "source": self.source, "path": self.path, "loaded_at": self.loaded_at,
+                "live_version": self._live_version, "generation": self.generation,
+                "fingerprint": self.fingerprint}
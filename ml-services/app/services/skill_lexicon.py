@@ -0,0 +1,93 @@
+"""
+Shared skill lexicon
+One precompiled vocabulary of skills with categories, confidence weights and
+aliases, matched in a single linear pass over the text with token boundaries
+"""
+
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+from app.services.keyword_automaton import KeywordAutomaton
+
+
+class Skill(NamedTuple):
+    name: str
+    category: str
+    confidence: float
+
+
+# Skill categories with confidence weights
+SKILL_CATEGORIES: Dict[str, Dict[str, float]] = {
+    'programming': {
+        'python': 0.9, 'java': 0.9, 'javascript': 0.9, 'typescript': 0.9,
+        'c++': 0.9, 'c#': 0.9, 'go': 0.9, 'rust': 0.9, 'php': 0.9, 'ruby': 0.9
+    },
+    'web_development': {
+        'react': 0.8, 'angular': 0.8, 'vue': 0.8, 'node': 0.8, 'express': 0.8,
+        'django': 0.8, 'flask': 0.8, 'spring': 0.8, 'laravel': 0.8,
+        'html': 0.7, 'css': 0.7, 'bootstrap': 0.6, 'jquery': 0.6
+    },
+    'databases': {
+        'sql': 0.8, 'mysql': 0.8, 'postgresql': 0.8, 'mongodb': 0.8,
+        'redis': 0.7, 'elasticsearch': 0.7, 'cassandra': 0.7
+    },
+    'cloud_tech': {
+        'aws': 0.8, 'azure': 0.8, 'gcp': 0.8, 'docker': 0.8, 'kubernetes': 0.8,
+        'terraform': 0.7, 'ansible': 0.7, 'jenkins': 0.7, 'linux': 0.7, 'git': 0.7
+    },
+    'ai_ml': {
+        'machine learning': 0.9, 'deep learning': 0.9, 'data science': 0.9, 'ai': 0.8, 'nlp': 0.8,
+        'tensorflow': 0.8, 'pytorch': 0.8, 'scikit-learn': 0.8, 'pandas': 0.7, 'numpy': 0.7,
+        'matplotlib': 0.6
+    },
+    'analytics': {
+        'analytics': 0.6, 'statistics': 0.6
+    },
+    'design': {
+        'ui/ux': 0.8, 'figma': 0.8, 'sketch': 0.8, 'adobe': 0.7, 'photoshop': 0.7,
+        'illustrator': 0.7, 'invision': 0.7
+    }
+}
+
+# Alternative spellings → canonical skill
+SKILL_ALIASES: Dict[str, str] = {
+    'golang': 'go', 'cpp': 'c++', 'csharp': 'c#',
+    'reactjs': 'react', 'react.js': 'react', 'vue.js': 'vue', 'vuejs': 'vue', 'angularjs': 'angular',
+    'node.js': 'node', 'nodejs': 'node', 'express.js': 'express', 'spring boot': 'spring',
+    'postgres': 'postgresql', 'mongo': 'mongodb', 'k8s': 'kubernetes',
+    'amazon web services': 'aws', 'google cloud': 'gcp',
+    'ml': 'machine learning', 'artificial intelligence': 'ai', 'natural language processing': 'nlp',
+    'sklearn': 'scikit-learn', 'ux/ui': 'ui/ux', 'ui ux': 'ui/ux',
+}
+
+# Categories that count towards the technical-skill features
+NON_TECHNICAL_CATEGORIES = {'design'}
+
+
+class SkillLexicon:
+    """Skill vocabulary compiled into one keyword automaton (canonical names and aliases)"""
+
+    def __init__(self, categories: Dict[str, Dict[str, float]] = SKILL_CATEGORIES,
+                 aliases: Dict[str, str] = SKILL_ALIASES):
+        self.skills: Dict[str, Skill] = {}
+        for category, skills in categories.items():
+            for name, confidence in skills.items():
+                self.skills[name] = Skill(name, category, confidence)
+
+        self._automaton = KeywordAutomaton((name, name) for name in self.skills)
+        for alias, name in aliases.items():
+            if name in self.skills:
+                self._automaton.add(alias, name)
+
+    def match(self, text: str) -> Set[str]:
+        """Canonical names of every skill mentioned in text (whole tokens only)"""
+        return self._automaton.find_labels(text.lower(), whole_words=True)
+
+    def with_confidence(self, matched: Set[str]) -> List[Tuple[str, float]]:
+        """(skill, confidence) pairs in lexicon order"""
+        return [(name, skill.confidence) for name, skill in self.skills.items() if name in matched]
+
+    def technical(self, matched: Set[str]) -> List[str]:
+        return [name for name in matched if self.skills[name].category not in NON_TECHNICAL_CATEGORIES]
+
+
+SKILL_LEXICON = SkillLexicon()
@@ -0,0 +1,93 @@
+"""
+Per-stage latency accounting for the recommendation pipelines
+A StageTimer times the stages of one request (retrieve, rerank, ...); STAGE_STATS
+keeps a rolling window of recent durations per pipeline and stage, reported by
+GET /metrics/pipeline
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+# Recent requests kept per (pipeline, stage) for the percentiles
+STAGE_TIMING_WINDOW = int(os.environ.get("ML_STAGE_TIMING_WINDOW", "1024"))
+
+
+class StageStats:
+    """Thread-safe rolling windows of stage durations (seconds) and candidate counts"""
+
+    def __init__(self, window: int = STAGE_TIMING_WINDOW):
+        self.window = max(1, window)
+        self._durations: Dict[Tuple[str, str], Deque[float]] = {}
+        self._candidates: Dict[str, Deque[int]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, pipeline: str, durations: Dict[str, float], candidates: Optional[int] = None):
+        with self._lock:
+            self._counts[pipeline] = self._counts.get(pipeline, 0) + 1
+            for stage, seconds in durations.items():
+                self._durations.setdefault((pipeline, stage), deque(maxlen=self.window)).append(seconds)
+            if candidates is not None:
+                self._candidates.setdefault(pipeline, deque(maxlen=self.window)).append(candidates)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """{pipeline: {"requests", "candidates_mean", "stages": {stage: ms percentiles}}}"""
+        with self._lock:
+            durations = {key: list(values) for key, values in self._durations.items()}
+            candidates = {key: list(values) for key, values in self._candidates.items()}
+            counts = dict(self._counts)
+        report: Dict[str, Dict] = {}
+        for pipeline, count in counts.items():
+            report[pipeline] = {"requests": count, "stages": {}}
+            if candidates.get(pipeline):
+                report[pipeline]["candidates_mean"] = round(float(np.mean(candidates[pipeline])), 1)
+        for (pipeline, stage), values in durations.items():
+            ms = np.asarray(values) * 1000
+            report[pipeline]["stages"][stage] = {
+                "samples": len(values),
+                "mean_ms": round(float(ms.mean()), 3),
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                "p99_ms": round(float(np.percentile(ms, 99)), 3),
+            }
+        return report
+
+    def clear(self):
+        with self._lock:
+            self._durations.clear()
+            self._candidates.clear()
+            self._counts.clear()
+
+
+STAGE_STATS = StageStats()
+
+
+class StageTimer:
+    """Durations of the stages of one pipeline run, recorded into stats by finish()"""
+
+    def __init__(self, pipeline: str, stats: StageStats = STAGE_STATS):
+        self.pipeline = pipeline
+        self.stats = stats
+        self.durations: Dict[str, float] = {}
+        self.candidates: Optional[int] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - start
+
+    def finish(self):
+        self.stats.record(self.pipeline, self.durations, self.candidates)
+
+    def server_timing(self) -> str:
+        """Value for a Server-Timing response header"""
+        return ", ".join(f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in self.durations.items())
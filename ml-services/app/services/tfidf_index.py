@@ -0,0 +1,62 @@
+"""
+Lexical similarity over the company catalog, used when no sentence model is available
+One TF-IDF vectorizer is fitted over every company document (description, skills,
+specializations, culture, internship focus) and the documents are kept as an
+L2-normalized CSR matrix. Scoring a query against the whole catalog is one
+transform plus one sparse matrix-vector product; nothing is refitted per request,
+so the index is read-only and safe to share between threads.
+"""
+
+import os
+from typing import List
+
+import numpy as np
+from scipy import sparse
+
+from app.services.cache import LRUCache
+
+TFIDF_MAX_FEATURES = int(os.environ.get("ML_TFIDF_MAX_FEATURES", "50000"))
+# Similarity rows kept per query text (per-company scoring reuses one row)
+TFIDF_QUERY_CACHE_SIZE = int(os.environ.get("ML_TFIDF_QUERY_CACHE_SIZE", "256"))
+
+
+class TfidfIndex:
+    """Catalog documents as TF-IDF rows (rows follow names)"""
+
+    def __init__(self, names: List[str], documents: List[str], max_features: int = TFIDF_MAX_FEATURES,
+                 cache_size: int = TFIDF_QUERY_CACHE_SIZE):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        self.names = list(names)
+        self.row_of = {name: row for row, name in enumerate(self.names)}
+        self.vectorizer = TfidfVectorizer(
+            max_features=max_features,
+            stop_words='english',
+            ngram_range=(1, 3),
+            sublinear_tf=True,
+            # Terms in nearly every company carry no signal; tiny catalogs keep everything
+            max_df=0.95 if len(documents) >= 20 else 1.0,
+            dtype=np.float32,
+        )
+        self.matrix: sparse.csr_matrix = sparse.csr_matrix(self.vectorizer.fit_transform(documents))
+        self._queries = LRUCache(cache_size)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def vector(self, text: str) -> sparse.csr_matrix:
+        """L2-normalized 1 x vocabulary row for text (all zeros when no term is known)"""
+        return self.vectorizer.transform([text])
+
+    def similarities(self, text: str) -> np.ndarray:
+        """Cosine similarity of text to every company (read-only float32 array)"""
+        scores = self._queries.get(text)
+        if scores is None:
+            query = self.vector(text).toarray().ravel()
+            scores = np.asarray(self.matrix @ query, dtype=np.float32)
+            scores.flags.writeable = False
+            self._queries.put(text, scores)
+        return scores
+
+    def similarity(self, text1: str, text2: str) -> float:
+        """Cosine similarity of two texts under the catalog's vocabulary and IDF weights"""
+        return float(self.vector(text1).multiply(self.vector(text2)).sum())
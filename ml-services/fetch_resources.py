@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Build-time script that bundles NLP resources for offline use
+Run once while building the image; the service never downloads at runtime
+"""
+import os
+import sys
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+# This script is the one place allowed to reach the network
+os.environ["HF_HUB_OFFLINE"] = "0"
+os.environ["TRANSFORMERS_OFFLINE"] = "0"
+
+from app.services.ml_engine import RESOURCE_DIR, NLTK_DATA_DIR, ONNX_MODEL_DIR, SPACY_MODEL, SENTENCE_MODEL_NAME
+
+NLTK_PACKAGES = [
+    "punkt", "punkt_tab", "stopwords", "wordnet",
+    "averaged_perceptron_tagger", "averaged_perceptron_tagger_eng",
+]
+
+
+def fetch_nltk():
+    import nltk
+    os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+    for package in NLTK_PACKAGES:
+        nltk.download(package, download_dir=NLTK_DATA_DIR, quiet=True)
+    print(f"NLTK data: {NLTK_DATA_DIR}")
+
+
+def fetch_spacy():
+    import spacy
+    target = os.path.join(RESOURCE_DIR, "models", SPACY_MODEL)
+    try:
+        nlp = spacy.load(SPACY_MODEL)
+    except OSError:
+        from spacy.cli import download
+        download(SPACY_MODEL)
+        nlp = spacy.load(SPACY_MODEL)
+    nlp.to_disk(target)
+    print(f"spaCy model: {target}")
+
+
+def fetch_sentence_model():
+    from sentence_transformers import SentenceTransformer
+    target = os.path.join(RESOURCE_DIR, "models", SENTENCE_MODEL_NAME)
+    SentenceTransformer(SENTENCE_MODEL_NAME).save(target)
+    print(f"Sentence model: {target}")
+
+
+def export_sentence_model_onnx():
+    # For ML_EMBEDDING_BACKEND=onnx / onnx-int8; needs onnx and onnxruntime
+    from app.services.embedding_backend import export_onnx
+    export_onnx(os.path.join(RESOURCE_DIR, "models", SENTENCE_MODEL_NAME), ONNX_MODEL_DIR)
+    print(f"ONNX sentence model: {ONNX_MODEL_DIR}")
+
+
+if __name__ == "__main__":
+    for step in (fetch_nltk, fetch_spacy, fetch_sentence_model, export_sentence_model_onnx):
+        try:
+            step()
+        except Exception as e:
+            print(f"Warning: {step.__name__} failed: {e}")
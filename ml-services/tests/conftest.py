@@ -0,0 +1,72 @@
+"""
+Shared test setup. The environment is fixed before app modules are imported, so
+tests never write the transaction log, the embedding store or the catalog artifact,
+and never start background warm-up, catalog-watch or parser worker processes.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+for name, value in {
+    "ML_TRANSACTION_LOG": "",
+    "ML_EMBEDDING_STORE_DIR": "",
+    "ML_CATALOG_ARTIFACT": "",
+    "ML_CATALOG_WATCH_INTERVAL": "0",
+    "ML_WARMUP": "0",
+    "ML_PARSE_WORKERS": "0",
+}.items():
+    os.environ.setdefault(name, value)
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVICE_DIR not in sys.path:
+    sys.path.insert(0, SERVICE_DIR)
+
+CATALOG_PATH = os.path.join(SERVICE_DIR, "data", "company_database.json")
+
+
+@pytest.fixture(scope="session")
+def companies():
+    """The shipped company catalog: {name: company}"""
+    with open(CATALOG_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)["companies"]
+
+
+class FakeSentenceModel:
+    """Deterministic hashed bag-of-words embeddings standing in for the sentence model"""
+
+    name = "fake"
+
+    def __init__(self, dimension: int = 64):
+        self.dimension = dimension
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                digest = hashlib.md5(token.encode("utf-8")).digest()
+                matrix[row, digest[0] % self.dimension] += 1.0 + digest[1] / 255
+        return matrix
+
+
+@pytest.fixture
+def fake_sentence_model(monkeypatch):
+    """Install a FakeSentenceModel in the shared engine, with fresh embedding caches"""
+    from app.services.cache import LRUCache
+    from app.services.embedding_batcher import EmbeddingBatcher
+    from app.services.ml_engine import ml_engine
+
+    model = FakeSentenceModel()
+    monkeypatch.setattr(ml_engine, "_sentence_model", model)
+    monkeypatch.setattr(ml_engine, "_loaded", ml_engine._loaded | {"sentence_model"})
+    monkeypatch.setattr(ml_engine, "embedding_cache", LRUCache(256))
+    monkeypatch.setattr(ml_engine, "embedding_batcher", EmbeddingBatcher(ml_engine._encode))
+    monkeypatch.setattr(ml_engine, "_company_embedding_state", None)
+    monkeypatch.setattr(ml_engine, "_ann_state", None)
+    return model
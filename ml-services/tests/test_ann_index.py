@@ -0,0 +1,79 @@
+"""ANN indexes against exact search"""
+
+import numpy as np
+import pytest
+
+from app.services import ann_index
+from app.services.ann_index import FlatIndex, IVFIndex, _synthetic_vectors, benchmark_recall, build_ann_index
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    return _synthetic_vectors(4000, 32, 40, seed=0)
+
+
+@pytest.fixture(scope="module")
+def queries():
+    return _synthetic_vectors(50, 32, 40, seed=1)
+
+
+def test_flat_index_is_exact(vectors, queries):
+    index = FlatIndex(vectors)
+    for query in queries[:10]:
+        ids, scores = index.search(query, 20)
+        exact = np.argsort(-(vectors @ query), kind="stable")[:20]
+        np.testing.assert_allclose(scores, (vectors @ query)[exact], rtol=1e-6)
+        assert np.all(np.diff(scores) <= 0)
+
+
+def test_ivf_recall_grows_with_n_probe(vectors, queries):
+    recalls = [benchmark_recall(IVFIndex(vectors, n_lists=64, n_probe=n_probe), vectors, queries, k=50)["recall"]
+               for n_probe in (4, 8, 16)]
+    assert recalls == sorted(recalls)
+    assert recalls[-1] >= 0.95
+
+
+def test_ivf_probing_every_list_is_exact(vectors, queries):
+    index = IVFIndex(vectors, n_lists=16)
+    exact = FlatIndex(vectors)
+    for query in queries[:10]:
+        ids, _ = index.search(query, 25, n_probe=16)
+        assert set(ids.tolist()) == set(exact.search(query, 25)[0].tolist())
+
+
+def test_ivf_lists_partition_the_catalog(vectors):
+    index = IVFIndex(vectors, n_lists=32)
+    assert np.array_equal(np.sort(index.order), np.arange(len(vectors)))
+    assert index.offsets[0] == 0 and index.offsets[-1] == len(vectors)
+    rebuilt = IVFIndex.from_arrays(vectors, index.centroids, index.order, index.offsets, n_probe=4)
+    query = vectors[0]
+    np.testing.assert_array_equal(rebuilt.search(query, 10, n_probe=4)[0], index.search(query, 10, n_probe=4)[0])
+
+
+def test_k_larger_than_catalog():
+    vectors = _synthetic_vectors(5, 8, 2, seed=3)
+    ids, _ = IVFIndex(vectors, n_lists=2).search(vectors[0], 50, n_probe=2)
+    assert sorted(ids.tolist()) == list(range(5))
+
+
+def test_hnsw_falls_back_to_ivf_without_hnswlib(vectors, monkeypatch):
+    monkeypatch.setattr(ann_index, "hnswlib", None)
+    assert isinstance(build_ann_index(vectors, "hnsw"), IVFIndex)
+    assert isinstance(build_ann_index(vectors, "flat"), FlatIndex)
+
+
+def test_engine_shortlists_nearest_profiles(fake_sentence_model, monkeypatch, companies):
+    from app.services import ml_engine as engine_module
+    from app.services.catalog import profile_text
+
+    engine = engine_module.ml_engine
+    assert engine.ann_candidates("python machine learning") is None
+    monkeypatch.setattr(engine_module, "ANN_MIN_CATALOG", 10)
+    engine._ensure_ann_index()
+    query = "python machine learning cloud"
+    names = list(engine.catalog.names)
+    profiles = engine.encode_texts([profile_text(companies[name]) for name in names], use_cache=False)
+    exact = np.argsort(-(profiles @ engine.encode_texts([query])[0]), kind="stable")[:8]
+    # A 60-company catalog has fewer lists than n_probe, so the shortlist is exact
+    assert set(engine.ann_candidates(query, k=8)) == {names[i] for i in exact}
+    assert engine.ann_candidates("   ") is None
@@ -0,0 +1,116 @@
+"""Bitset frequent-itemset mining and rule generation against brute force"""
+
+import itertools
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from app.services.association_rules import (
+    ASSOCIATION_RULE_CONFIG, TransactionDatabase, catalog_transactions, frequent_itemsets, mine_association_rules,
+)
+
+
+def _brute_force_itemsets(paths, min_count, max_length, targets):
+    rows = [set(path) for path, count in paths.items() for _ in range(count)]
+    items = sorted({item for row in rows for item in row})
+    frequent = {}
+    for length in range(1, max_length + 1):
+        for itemset in itertools.combinations(items, length):
+            if len(targets.intersection(itemset)) > 1:
+                continue
+            support = sum(1 for row in rows if row.issuperset(itemset))
+            if support >= min_count:
+                frequent[frozenset(itemset)] = support
+    return frequent
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_frequent_itemsets_match_brute_force(seed):
+    rng = random.Random(seed)
+    n_items = rng.randint(4, 9)
+    targets = frozenset(rng.sample(range(n_items), rng.randint(0, 3)))
+    paths = Counter()
+    for _ in range(rng.randint(5, 60)):
+        paths[tuple(sorted(rng.sample(range(n_items), rng.randint(1, n_items))))] += rng.randint(1, 3)
+    min_count = rng.randint(1, 10)
+    max_length = rng.randint(1, 4)
+    assert frequent_itemsets(paths, min_count, max_length, targets) == \
+        _brute_force_itemsets(paths, min_count, max_length, targets)
+
+
+def _transactions(seed, n=300):
+    rng = random.Random(seed)
+    skills = ["python", "sql", "excel", "java", "figma", "react", "aws"]
+    sectors = {"data": ["python", "sql"], "design": ["figma"], "web": ["react", "java"], "finance": ["excel"]}
+    for _ in range(n):
+        sector = rng.choice(list(sectors))
+        chosen = set(sectors[sector]) if rng.random() < 0.8 else set()
+        chosen.update(rng.sample(skills, rng.randint(0, 2)))
+        yield {"skills": sorted(chosen), "interests": [sector] if rng.random() < 0.7 else [],
+               "sector": sector.title(), "company": f"{sector} co" if rng.random() < 0.2 else None}
+
+
+def _brute_force_rules(transactions, family, config):
+    rows = []
+    for t in transactions:
+        consequents = [("sector", t["sector"])] + ([("company", t["company"])] if t["company"] and family == "skills" else [])
+        rows.append((set(t[family]), {c for c in consequents}))
+    total = len(rows)
+    min_count = max(1, -(-config["min_support"] * total // 1))
+    antecedent_items = sorted({item for items, _ in rows for item in items})
+    consequents = sorted({c for _, cs in rows for c in cs})
+    rules = {}
+    for length in range(1, config["max_antecedent_length"] + 1):
+        for antecedent in itertools.combinations(antecedent_items, length):
+            having = [cs for items, cs in rows if items.issuperset(antecedent)]
+            for consequent in consequents:
+                count = sum(1 for cs in having if consequent in cs)
+                if count < min_count or not having:
+                    continue
+                confidence = count / len(having)
+                lift = confidence / (sum(1 for _, cs in rows if consequent in cs) / total)
+                if confidence >= config["min_confidence"] and lift >= config["min_lift"]:
+                    rules[(antecedent, consequent)] = (round(confidence, 4), round(count / total, 4), round(lift, 4))
+    return rules
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_mined_rules_match_brute_force(seed):
+    transactions = list(_transactions(seed))
+    mined = mine_association_rules(transactions)["association_rules"]
+    for family, key in (("skills", "skill_company_rules"), ("interests", "interest_sector_rules")):
+        got = {(tuple(rule["antecedent"]), (rule["consequent_type"], rule["consequent"])):
+               (rule["confidence"], rule["support"], rule["lift"]) for rule in mined[key].values()}
+        assert got == _brute_force_rules(transactions, family, ASSOCIATION_RULE_CONFIG)
+        assert got, "no rules mined: the comparison is vacuous"
+
+
+def test_rules_are_sorted_and_pass_thresholds(companies):
+    result = mine_association_rules(catalog_transactions(companies), {"min_support": 0.03})
+    rules = list(result["association_rules"]["skill_company_rules"].values())
+    assert rules and result["stats"]["rules"] >= len(rules)
+    assert [rule["confidence"] for rule in rules] == sorted((rule["confidence"] for rule in rules), reverse=True)
+    for rule in rules:
+        assert rule["confidence"] >= 0.7 and rule["lift"] >= 1.2 and rule["support"] >= 0.03
+        assert 1 <= len(rule["antecedent"]) <= 3
+    json.dumps(result)
+
+
+def test_database_normalizes_items_and_splits_sectors():
+    database = TransactionDatabase()
+    database.add({"skills": ["Python ", "python", "Machine  Learning"], "interests": ["AI"],
+                  "sector": "Technology / Software", "company": "Acme"})
+    assert sorted(database.items) == [("company", "Acme"), ("interest", "ai"), ("sector", "Software"),
+                                      ("sector", "Technology"), ("skill", "machine learning"), ("skill", "python")]
+    skill_path, interest_path = next(iter(database.skill_paths)), next(iter(database.interest_paths))
+    assert len(skill_path) == 5 and len(interest_path) == 3
+
+
+def test_negative_counts_retract_and_counts_aggregate():
+    transaction = {"skills": ["python"], "interests": [], "sector": "Data"}
+    database = TransactionDatabase().update([{**transaction, "count": 3}])
+    assert database.total == 3 and sum(database.skill_paths.values()) == 3
+    database.add(transaction, -3)
+    assert database.total == 0 and not database.skill_paths and not database.interest_paths
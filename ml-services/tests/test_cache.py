@@ -0,0 +1,90 @@
+"""LRU cache and the query-side embedding cache"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from app.services import cache as cache_module
+from app.services.cache import LRUCache
+from app.services.ml_engine import ml_engine
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache and cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1 and len(cache) == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache(4, ttl=10)
+    cache.put("a", 1)
+    clock[0] += 9.9
+    assert cache.get("a") == 1
+    clock[0] += 0.1
+    assert "a" not in cache
+    assert cache.get("a", "missing") == "missing"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["size"]) == (1, 1, 1, 0)
+
+
+def test_put_refreshes_expiry(clock):
+    cache = LRUCache(4, ttl=10)
+    cache.put("a", 1)
+    clock[0] += 8
+    cache.put("a", 2)
+    clock[0] += 8
+    assert cache.get("a") == 2
+
+
+def test_zero_size_and_zero_ttl():
+    disabled = LRUCache(0)
+    disabled.put("a", 1)
+    assert disabled.get("a") is None and len(disabled) == 0
+    assert LRUCache(4, ttl=0).ttl is None
+
+
+def test_concurrent_puts_stay_bounded():
+    cache = LRUCache(50)
+
+    def fill(offset):
+        for i in range(1000):
+            cache.put(offset + i, i)
+            cache.get(offset + i // 2)
+
+    threads = [threading.Thread(target=fill, args=(n * 10000,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 50
+    assert cache.stats()["evictions"] == 8 * 1000 - 50
+
+
+def test_encode_texts_only_sends_misses_to_the_model(fake_sentence_model):
+    first = ml_engine.encode_texts(["Python", "machine learning"])
+    again = ml_engine.encode_texts(["  python ", "SQL", "Machine   Learning"])
+    assert fake_sentence_model.calls == [["python", "machine learning"], ["sql"]]
+    np.testing.assert_array_equal(again[0], first[0])
+    np.testing.assert_array_equal(again[2], first[1])
+    np.testing.assert_allclose(np.linalg.norm(again, axis=1), 1.0, rtol=1e-6)
+
+
+def test_cached_rows_are_read_only_and_keyed_on_model_version(fake_sentence_model, monkeypatch):
+    ml_engine.encode_texts(["python"])
+    version, row = next((key[0], ml_engine.embedding_cache.get(key)) for key in list(ml_engine.embedding_cache._data))
+    assert version == ml_engine.model_version and not row.flags.writeable
+    monkeypatch.setattr(fake_sentence_model, "name", "other")
+    ml_engine.encode_texts(["python"])
+    assert len(fake_sentence_model.calls) == 2
@@ -0,0 +1,80 @@
+"""Inverted postings used to prune /recommend candidates"""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.main import CANDIDATE_FALLBACK
+from app.services.confidence_engine import ConfidenceEngine, _Vocabulary
+
+TERMS = ["python", "py", "java", "javascript", "sql", "nosql", "c", "c++", "go", "golang", "machine learning",
+         "learning", "data", "big data", "react", "react native"]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rng = random.Random(11)
+    companies = [rng.sample(TERMS, rng.randint(0, 5)) for _ in range(200)]
+    vocabulary = _Vocabulary()
+    for row, terms in enumerate(companies):
+        for term in terms:
+            vocabulary.add(row, term)
+    vocabulary.freeze(len(companies))
+    return companies, vocabulary
+
+
+def _masks(vocabulary, count=100):
+    rng = np.random.default_rng(2)
+    return [rng.random(len(vocabulary.terms)) < p for p in np.linspace(0, 0.5, count)]
+
+
+def test_posting_rows_are_the_companies_with_a_selected_term(corpus):
+    companies, vocabulary = corpus
+    for mask in _masks(vocabulary):
+        selected = {term for term, on in zip(vocabulary.terms, mask) if on}
+        expected = {row for row, terms in enumerate(companies) if selected & set(terms)}
+        assert set(vocabulary.posting_rows(mask).tolist()) == expected
+        with_any = vocabulary.companies_with_any(mask)
+        assert set(np.flatnonzero(with_any).tolist()) == expected
+
+
+def test_row_subsets_and_many_masks_agree(corpus):
+    companies, vocabulary = corpus
+    masks = _masks(vocabulary, 20)
+    rows = np.arange(3, len(companies), 7)
+    many = vocabulary.companies_with_any_many(masks)
+    for mask, hits in zip(masks, many):
+        full = vocabulary.companies_with_any(mask)
+        np.testing.assert_array_equal(hits, full)
+        np.testing.assert_array_equal(vocabulary.companies_with_any(mask, rows), full[rows])
+
+
+@pytest.mark.parametrize("query", ["py", "python", "data", "react native", "c", "golang developer", "rust",
+                                   "senior machine learning engineer with big data and javascript"])
+def test_related_terms_match_a_vocabulary_scan(corpus, query):
+    _, vocabulary = corpus
+    contains, within = vocabulary.matches(query)
+    assert [t for t, on in zip(vocabulary.terms, contains) if on] == [t for t in vocabulary.terms if query in t]
+    assert [t for t, on in zip(vocabulary.terms, within) if on] == [t for t in vocabulary.terms if t in query]
+    # Cached masks are shared between requests, so they must not be writable
+    assert not contains.flags.writeable and not within.flags.writeable
+
+
+def test_candidates_cover_every_postings_hit():
+    rng = random.Random(4)
+    skills = ["Python", "SQL", "Java", "Excel", "Figma", "Tableau", "Go", "Sales"]
+    catalog = {
+        f"Company {i}": {"sector": rng.choice(["Retail / E-commerce", "Healthcare", "Media / Design"]),
+                         "specializations": rng.sample(["analytics", "design", "logistics", "payments"], 1),
+                         "required_skills": rng.sample(skills, rng.randint(1, 3))}
+        for i in range(400)
+    }
+    engine = ConfidenceEngine(catalog)
+    rows = engine.candidate_rows(["sculpture"], [], ["python"], CANDIDATE_FALLBACK)
+    assert rows is not None
+    names = {engine.names[row] for row in rows.tolist()}
+    with_python = {name for name, info in catalog.items() if "Python" in info["required_skills"]}
+    assert with_python <= names
+    # Only the postings hits plus the per-class name-order fallback
+    assert len(names - with_python) <= 2 * CANDIDATE_FALLBACK
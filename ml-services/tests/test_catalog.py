@@ -0,0 +1,68 @@
+"""Shared Catalog: normalized company records match the per-request computations they replace"""
+
+import numpy as np
+import pytest
+
+from app.services.catalog import (
+    COMPANY_SECTOR_RULES,
+    Catalog,
+    clean_name,
+    name_sector,
+)
+
+
+def _scan_sector(name_clean):
+    """The original rule-by-rule keyword scan"""
+    for sector, keywords in COMPANY_SECTOR_RULES:
+        if any(keyword in name_clean for keyword in keywords):
+            return sector
+    return "Technology / Software / Digital Services"
+
+
+@pytest.fixture(scope="module")
+def catalog(companies):
+    return Catalog({"companies": companies}, "v1")
+
+
+def test_records_hold_the_normalized_forms(catalog, companies):
+    assert catalog.names == list(companies)
+    assert len(catalog) == len(companies)
+    for row, (name, info) in enumerate(companies.items()):
+        record = catalog.get(name)
+        assert record.info is info
+        assert record.name_lower == name.lower()
+        assert record.name_clean == clean_name(name.lower())
+        assert record.sector_lower == info.get("sector", "").lower()
+        assert record.specializations_lower == tuple(s.lower() for s in info.get("specializations", []))
+        assert record.skills_lower == tuple(s.lower().strip() for s in info.get("required_skills", []))
+        assert record.role_keywords == tuple(tuple(r.lower().split()) for r in info.get("preferred_roles", []))
+        assert record.name_sector == _scan_sector(record.name_clean)
+        assert catalog.tiers[row] == np.float32(record.tier)
+        assert catalog.reputations[row] == np.float32(record.reputation)
+    assert catalog.get("NO SUCH COMPANY") is None
+    assert "NO SUCH COMPANY" not in catalog
+
+
+@pytest.mark.parametrize("name", [
+    "hdfc bank", "bajaj finance", "bajaj auto", "tata steel", "apollo hospital research",
+    "deloitte consulting", "oil and natural gas", "unknown widgets", "", "paytm payments",
+])
+def test_name_sector_matches_the_rule_scan(name):
+    assert name_sector(name) == _scan_sector(name)
+
+
+def test_strings_are_interned(catalog, companies):
+    # Shared skills are one object across records
+    skill = next(s for info in companies.values() for s in info.get("required_skills", []))
+    owners = [catalog.get(name) for name, info in companies.items() if skill in info.get("required_skills", [])]
+    values = {id(value) for record in owners for value in record.skills_lower if value == skill.lower().strip()}
+    assert len(values) == 1
+
+
+def test_api_and_engine_share_one_catalog():
+    from app import main
+    from app.services.ml_engine import ml_engine
+
+    assert main.ml_engine is ml_engine
+    assert list(ml_engine.catalog.names) == list(ml_engine.company_database["companies"])
+    assert main.CONFIDENCE_ENGINE.names == list(ml_engine.catalog.names)
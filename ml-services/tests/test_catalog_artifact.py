@@ -0,0 +1,123 @@
+"""Compiled catalog artifact: what the server maps from it equals what it derives from the JSON"""
+
+import json
+import os
+import random
+
+import numpy as np
+import pytest
+
+from app.main import _infer_target_sectors
+from app.services import catalog_artifact
+from app.services.catalog import Catalog, load_catalog, profile_text, skill_text
+from app.services.catalog_artifact import compile_catalog, load_artifact, open_catalog
+from app.services.confidence_engine import ConfidenceEngine
+from conftest import CATALOG_PATH, FakeSentenceModel
+
+
+def _encode(texts):
+    matrix = FakeSentenceModel().encode(texts)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+@pytest.fixture(scope="module")
+def compiled(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("artifact")
+    json_path = directory / "company_database.json"
+    with open(CATALOG_PATH, "rb") as f:
+        json_path.write_bytes(f.read())
+    output = directory / "catalog.npz"
+    stats = compile_catalog(str(json_path), str(output), encode=_encode, model_version="fake", ivf_min_companies=0)
+    return str(json_path), str(output), stats
+
+
+def test_compiled_catalog_matches_the_json_catalog(compiled):
+    json_path, output, stats = compiled
+    parsed = Catalog(*load_catalog(json_path))
+    mapped = open_catalog(json_path, output)
+    assert mapped.artifact is not None
+    assert stats["companies"] == len(parsed) and stats["embeddings"] and stats["ivf"]
+    assert mapped.version == parsed.version
+    assert mapped.names == parsed.names
+    assert dict(mapped.companies) == parsed.companies
+    assert {k: v for k, v in mapped.database.items() if k != "companies"} == \
+        {k: v for k, v in parsed.database.items() if k != "companies"}
+    np.testing.assert_array_equal(mapped.tiers, parsed.tiers)
+    np.testing.assert_array_equal(mapped.reputations, parsed.reputations)
+    for name in parsed.names:
+        expected, record = parsed.get(name), mapped.get(name)
+        for slot in type(record).__slots__:
+            if slot != "info":
+                assert getattr(record, slot) == getattr(expected, slot), (name, slot)
+    assert mapped.get("NO SUCH COMPANY") is None
+
+
+def test_mapped_engine_scores_like_the_built_engine(compiled, companies):
+    json_path, output, _ = compiled
+    mapped = open_catalog(json_path, output)
+    built = ConfidenceEngine(companies)
+    engine = ConfidenceEngine.from_arrays(mapped.names, mapped.artifact)
+    rng = random.Random(5)
+    skills = sorted({s for c in companies.values() for s in c.get("required_skills", [])})
+    interests = sorted({s.lower() for c in companies.values() for s in c.get("specializations", [])})
+    for _ in range(50):
+        chosen = rng.sample(interests, rng.randint(1, 3))
+        profile = (chosen, _infer_target_sectors(chosen), rng.sample(skills, rng.randint(0, 5)), None)
+        np.testing.assert_array_equal(engine.score(*profile), built.score(*profile))
+
+
+def test_embeddings_are_tied_to_the_model_version(compiled):
+    json_path, output, _ = compiled
+    mapped = open_catalog(json_path, output)
+    names = mapped.names
+    skills = mapped.embeddings("company_skills", "fake")
+    np.testing.assert_allclose(skills, _encode([skill_text(mapped.companies[n]) for n in names]), atol=1e-6)
+    np.testing.assert_allclose(mapped.embeddings("company_profiles", "fake"),
+                               _encode([profile_text(mapped.companies[n]) for n in names]), atol=1e-6)
+    assert mapped.embeddings("company_skills", "another-model") is None
+    # Memory-mapped, not copied
+    assert isinstance(skills.base, np.memmap) or isinstance(skills, np.memmap)
+
+
+def test_artifact_of_another_json_is_ignored(compiled, tmp_path):
+    _, output, _ = compiled
+    with open(CATALOG_PATH, "r", encoding="utf-8") as f:
+        database = json.load(f)
+    # Same content, other file: accepted by hash
+    same = tmp_path / "same.json"
+    with open(CATALOG_PATH, "rb") as f:
+        same.write_bytes(f.read())
+    assert open_catalog(str(same), output).artifact is not None
+    # Different content: the JSON is parsed instead
+    database["companies"].popitem()
+    other = tmp_path / "other.json"
+    other.write_text(json.dumps(database), encoding="utf-8")
+    catalog = open_catalog(str(other), output)
+    assert catalog.artifact is None and len(catalog) == len(database["companies"])
+
+
+def test_unusable_artifacts_load_as_none(compiled, tmp_path, monkeypatch):
+    _, output, _ = compiled
+    assert load_artifact(str(tmp_path / "missing.npz")) is None
+    assert load_artifact("") is None
+
+    compressed = tmp_path / "compressed.npz"
+    np.savez_compressed(compressed, meta=np.frombuffer(b"{}", dtype=np.uint8))
+    assert load_artifact(str(compressed)) is None
+
+    monkeypatch.setattr(catalog_artifact, "FORMAT_VERSION", catalog_artifact.FORMAT_VERSION + 1)
+    assert load_artifact(output) is None
+
+
+def test_compile_is_atomic(compiled, tmp_path, monkeypatch):
+    json_path, _, _ = compiled
+    output = tmp_path / "catalog.npz"
+
+    def failing(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(catalog_artifact.np, "savez", failing)
+    with pytest.raises(RuntimeError):
+        compile_catalog(json_path, str(output))
+    assert os.listdir(tmp_path) == []
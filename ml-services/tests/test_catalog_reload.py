@@ -0,0 +1,127 @@
+"""Catalog hot reload: diffs, carried-over embedding rows and the file watcher"""
+
+import copy
+import json
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.services.catalog import CatalogDiff, CatalogWatcher, carry_over, skill_text
+from app.services.ml_engine import ml_engine
+
+
+def _edited(companies):
+    """The catalog with one company changed, one removed and one added"""
+    names = list(companies)
+    edited = copy.deepcopy(companies)
+    edited[names[0]]["required_skills"] = edited[names[0]]["required_skills"] + ["Rust"]
+    del edited[names[1]]
+    edited["NEW STARTUP PRIVATE LIMITED"] = {**companies[names[2]], "required_skills": ["Go", "Kafka"]}
+    return edited, names
+
+
+def test_diff(companies):
+    edited, names = _edited(companies)
+    diff = CatalogDiff(companies, edited)
+    assert diff.added == ["NEW STARTUP PRIVATE LIMITED"]
+    assert diff.changed == [names[0]]
+    assert diff.removed == [names[1]]
+    assert diff.summary() == {"added": 1, "changed": 1, "removed": 1, "unchanged": len(companies) - 2}
+    assert not CatalogDiff(companies, copy.deepcopy(companies))
+
+
+def test_carry_over_encodes_only_new_text():
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.asarray([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+    previous = {"a": ("x", np.array([9, 9], dtype=np.float32)), "b": ("yy", np.array([8, 8], dtype=np.float32))}
+    matrix, encoded = carry_over(["c", "b", "a"], {"a": "x", "b": "changed", "c": "zzz"}, previous, encode)
+    assert encoded == 2 and calls == [["zzz", "changed"]]
+    np.testing.assert_array_equal(matrix, [[3, 1], [7, 1], [9, 9]])
+    # Nothing to encode: previous rows only
+    matrix, encoded = carry_over(["a"], {"a": "x"}, previous, encode)
+    assert encoded == 0 and len(calls) == 1
+    np.testing.assert_array_equal(matrix, [[9, 9]])
+
+
+@pytest.fixture
+def served_catalog(monkeypatch):
+    """Restore whatever catalog state a test installs"""
+    for name in ("catalog", "catalog_version", "_tfidf_state", "_ann_thread", "_rule_miner"):
+        monkeypatch.setattr(ml_engine, name, getattr(ml_engine, name))
+    monkeypatch.setattr(ml_engine, "_rule_miner", None)
+
+
+def test_reload_reencodes_only_changed_companies(companies, tmp_path, fake_sentence_model, served_catalog):
+    row_of, _ = ml_engine._ensure_company_embeddings()
+    assert len(row_of) == len(companies)
+
+    edited, names = _edited(companies)
+    path = tmp_path / "company_database.json"
+    path.write_text(json.dumps({"companies": edited}), encoding="utf-8")
+    fake_sentence_model.calls.clear()
+    update = ml_engine.prepare_catalog(str(path))
+
+    assert update.diff.summary()["unchanged"] == len(companies) - 2
+    assert update.encoded == 2
+    assert sorted(text for call in fake_sentence_model.calls for text in call) == \
+        sorted([skill_text(edited[names[0]]), skill_text(edited["NEW STARTUP PRIVATE LIMITED"])])
+    # Every row equals a fresh encoding of its company
+    new_row_of, matrix = update.embedding_state
+    assert list(new_row_of) == list(edited)
+    fresh = ml_engine.encode_texts([skill_text(edited[name]) for name in edited], use_cache=False)
+    np.testing.assert_allclose(matrix, fresh, atol=1e-6)
+
+    ml_engine.install_catalog(update)
+    assert ml_engine.catalog_version == update.version
+    assert ml_engine._company_embedding_state is update.embedding_state
+    assert "NEW STARTUP PRIVATE LIMITED" in ml_engine.catalog and names[1] not in ml_engine.catalog
+    # Same content again: nothing to do
+    assert ml_engine.prepare_catalog(str(path)) is None
+
+
+def test_malformed_catalog_is_refused(tmp_path, served_catalog):
+    path = tmp_path / "company_database.json"
+    path.write_text("{not json", encoding="utf-8")
+    version = ml_engine.catalog_version
+    with pytest.raises(ValueError):
+        ml_engine.prepare_catalog(str(path))
+    assert ml_engine.catalog_version == version
+
+
+def test_watcher_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / "company_database.json"
+    path.write_text('{"companies": {}}', encoding="utf-8")
+    reloaded = threading.Event()
+    watcher = CatalogWatcher(reloaded.set, str(path), interval=0.02)
+    watcher.start()
+    try:
+        assert not reloaded.wait(0.2)
+        path.write_text('{"companies": {"A": {}}}', encoding="utf-8")
+        assert reloaded.wait(5)
+    finally:
+        watcher.stop()
+
+
+def test_reload_endpoint_requires_the_admin_token(monkeypatch):
+    reloads = []
+    monkeypatch.setattr(main, "reload_catalog", lambda force=False: reloads.append(force) or {"reloaded": True})
+    client = TestClient(main.app)
+    # No token configured: the endpoint is closed to everyone
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    assert client.post("/admin/reload_catalog").status_code == 403
+    assert client.post("/admin/reload_catalog", headers={"X-Admin-Token": ""}).status_code == 403
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    assert client.post("/admin/reload_catalog").status_code == 403
+    assert client.post("/admin/reload_catalog", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert reloads == []
+    response = client.post("/admin/reload_catalog?force=true", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200 and response.json() == {"reloaded": True}
+    assert reloads == [True]
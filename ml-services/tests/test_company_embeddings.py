@@ -0,0 +1,40 @@
+"""Precomputed company skill matrix against per-pair cosine similarity"""
+
+import numpy as np
+
+from app.services.catalog import skill_text
+from app.services.ml_engine import ml_engine
+
+
+def _unit(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float64))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def test_similarities_match_pairwise_cosine(fake_sentence_model, companies):
+    skills = ["Python", "SQL", "machine learning"]
+    similarities = ml_engine.company_skill_similarities(skills)
+    rows, _ = ml_engine._ensure_company_embeddings()
+    query = _unit(fake_sentence_model.encode([" ".join(skills).lower()]))[0]
+    for name, row in rows.items():
+        expected = _unit(fake_sentence_model.encode([skill_text(companies[name])]))[0] @ query
+        assert abs(similarities[row] - expected) < 1e-5, name
+
+
+def test_catalog_is_encoded_once(fake_sentence_model):
+    for skills in (["Python"], ["Java", "Spring"], ["Python"]):
+        ml_engine.company_skill_similarities(skills)
+    # One catalog encode, then one call per distinct query (the repeat is cached)
+    assert len(fake_sentence_model.calls) == 3
+    assert len(fake_sentence_model.calls[0]) == len(ml_engine.catalog.names)
+
+
+def test_batched_scores_match_single_scores(fake_sentence_model, companies):
+    resume = {"skills": ["Python", "Docker", "AWS"], "experience": ["Built data pipelines"],
+              "projects": ["Payments dashboard in React"]}
+    interests = ["fintech", "cloud"]
+    names = list(companies)[:25]
+    batched = ml_engine.calculate_advanced_match_scores(resume, names, interests)
+    for name in names:
+        assert abs(batched[name] - ml_engine.calculate_advanced_match_score(resume, name, interests)) < 1e-9
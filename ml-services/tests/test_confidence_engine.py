@@ -0,0 +1,65 @@
+"""Vectorized confidence scoring against the per-company scalar path"""
+
+import random
+
+import numpy as np
+import pytest
+
+from app import main
+from app.main import CONFIDENCE_ENGINE, _calculate_confidence_score, _infer_target_sectors
+
+
+def _profiles(companies, count=300, seed=1):
+    rng = random.Random(seed)
+    specializations = sorted({s.lower() for c in companies.values() for s in c.get("specializations", [])})
+    skills = sorted({s for c in companies.values() for s in c.get("required_skills", [])})
+    interests = list(main.INTEREST_TO_SECTORS) + specializations + ["python", "hotel", "go", "ai", "x"]
+    for _ in range(count):
+        chosen_skills = rng.sample(skills + ["c", "Java ", "py", "unknown"], rng.randint(0, 6))
+        if rng.random() < 0.2:
+            chosen_skills += chosen_skills[:1]
+        yield rng.sample(interests, rng.randint(1, 4)), chosen_skills
+
+
+def test_confidences_match_scalar_scores(companies):
+    for interests, skills in _profiles(companies):
+        expected = [(name, confidence) for name in companies
+                    for confidence in [_calculate_confidence_score(name, interests, {"skills": skills})]
+                    if confidence > 0]
+        assert CONFIDENCE_ENGINE.confidences(interests, _infer_target_sectors(interests), skills) == expected
+
+
+def test_score_on_rows_matches_full_score(companies):
+    rows = np.arange(0, len(CONFIDENCE_ENGINE), 3)
+    for interests, skills in _profiles(companies, count=50, seed=2):
+        sectors = _infer_target_sectors(interests)
+        full = CONFIDENCE_ENGINE.score(interests, sectors, skills)
+        np.testing.assert_array_equal(CONFIDENCE_ENGINE.score(interests, sectors, skills, rows), full[rows])
+
+
+def test_score_many_matches_score(companies):
+    profiles = [(interests, _infer_target_sectors(interests), skills, None)
+                for interests, skills in _profiles(companies, count=80, seed=3)]
+    profiles.append((["fintech"], _infer_target_sectors(["fintech"]), ["Python"], ({"fintech": 0.9}, {})))
+    matrix = CONFIDENCE_ENGINE.score_many(profiles)
+    for row, (interests, sectors, skills, rules) in zip(matrix, profiles):
+        np.testing.assert_allclose(row, CONFIDENCE_ENGINE.score(interests, sectors, skills, rules=rules), rtol=0, atol=1e-12)
+
+
+def test_top_confidences_is_the_head_of_confidences(companies):
+    profiles = [(interests, _infer_target_sectors(interests), skills, None)
+                for interests, skills in _profiles(companies, count=80, seed=4)]
+    heads = CONFIDENCE_ENGINE.top_confidences(CONFIDENCE_ENGINE.score_many(profiles))
+    for head, (interests, sectors, skills, _) in zip(heads, profiles):
+        scored = sorted(CONFIDENCE_ENGINE.confidences(interests, sectors, skills), key=lambda x: (-x[1], x[0]))
+        assert main._select_top(head) == main._select_top(scored)
+
+
+@pytest.mark.parametrize("rules", [({}, {}), ({"fintech": 0.9}, {}), ({}, {"PAYTM (ONE97 COMMUNICATIONS LIMITED)": 0.7})])
+def test_rules_only_raise_confidence(rules):
+    interests, skills = ["fintech", "payments"], ["Python", "SQL"]
+    sectors = _infer_target_sectors(interests)
+    plain = CONFIDENCE_ENGINE.score(interests, sectors, skills)
+    boosted = CONFIDENCE_ENGINE.score(interests, sectors, skills, rules=rules)
+    assert np.all(boosted >= plain)
+    assert np.array_equal(boosted, plain) == (not rules[0] and not rules[1])
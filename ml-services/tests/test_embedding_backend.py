@@ -0,0 +1,42 @@
+"""ONNX embedding backends against the torch reference (skipped without the runtimes or model)"""
+
+import os
+
+import pytest
+
+from app.services import embedding_backend
+from app.services.embedding_backend import CONFIG_FILE, MODEL_FILE, QUANTIZED_MODEL_FILE, load_backend, parity
+from app.services.ml_engine import ONNX_MODEL_DIR, SENTENCE_MODEL_NAME, _bundled_model_path
+
+TEXTS = [
+    "python machine learning", "fintech", "web development react", "data analyst sql excel",
+    "Cloud infrastructure and DevOps with Kubernetes, Terraform and AWS",
+    "Healthcare analytics, patient data platforms and medical imaging research",
+    "Mobile apps in Swift and Kotlin for consumer banking", "", "embedded C firmware",
+    "Natural language processing, transformers and large-scale search ranking " * 8,
+]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        load_backend("tensorrt", "model", "onnx-dir")
+
+
+@pytest.mark.parametrize("backend, model_file, min_cosine", [
+    ("onnx", MODEL_FILE, 0.999),
+    ("onnx-int8", QUANTIZED_MODEL_FILE, 0.98),
+])
+def test_onnx_matches_torch(backend, model_file, min_cosine):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    pytest.importorskip("sentence_transformers")
+    model_path = _bundled_model_path(SENTENCE_MODEL_NAME)
+    if not os.path.isdir(model_path):
+        pytest.skip(f"no bundled {SENTENCE_MODEL_NAME} (run fetch_resources.py)")
+    if not os.path.exists(os.path.join(ONNX_MODEL_DIR, CONFIG_FILE)) or \
+            not os.path.exists(os.path.join(ONNX_MODEL_DIR, model_file)):
+        pytest.skip(f"no ONNX export in {ONNX_MODEL_DIR} (python -m app.services.embedding_backend export)")
+
+    report = parity(embedding_backend.TorchBackend(model_path), load_backend(backend, model_path, ONNX_MODEL_DIR),
+                    TEXTS, repeat=1)
+    assert report["cosine_min"] >= min_cosine, report
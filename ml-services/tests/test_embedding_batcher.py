@@ -0,0 +1,125 @@
+"""Embedding micro-batcher: concurrent callers share encoder calls and each gets its own rows"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.ml_engine import ml_engine
+
+
+class Encoder:
+    """Rows derived from the text alone, recording every batch it is called with"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("model failed")
+        return np.asarray([[len(text), sum(map(ord, text)) % 997, 1.0] for text in texts], dtype=np.float32)
+
+
+def _fan_out(batcher, requests):
+    """Run every request on its own thread, all released at once"""
+    barrier = threading.Barrier(len(requests))
+
+    def call(texts):
+        barrier.wait()
+        return batcher.encode(texts)
+
+    with ThreadPoolExecutor(len(requests)) as pool:
+        return list(pool.map(call, requests))
+
+
+def test_concurrent_callers_get_their_own_rows():
+    encoder = Encoder(delay=0.02)
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=200, max_texts=1000)
+    requests = [[f"query {i}", "shared", f"query {i % 3}"] for i in range(16)]
+    results = _fan_out(batcher, requests)
+
+    reference = Encoder()
+    for texts, rows in zip(requests, results):
+        np.testing.assert_array_equal(rows, reference(texts))
+    # Fewer model calls than callers, and each distinct text encoded once per call
+    assert len(encoder.calls) < len(requests)
+    for call in encoder.calls:
+        assert len(call) == len(set(call))
+    stats = batcher.stats()
+    assert stats["requests"] == 16 and stats["texts"] == 48
+    assert stats["encoded"] == sum(len(call) for call in encoder.calls) < 48
+    assert stats["batches"] == len(encoder.calls)
+
+
+def test_batches_stop_at_max_texts():
+    encoder = Encoder(delay=0.01)
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=200, max_texts=4)
+    requests = [[f"text {i}"] for i in range(12)]
+    results = _fan_out(batcher, requests)
+    assert [rows.tolist() for rows in results] == [Encoder()(texts).tolist() for texts in requests]
+    assert all(len(call) <= 4 for call in encoder.calls)
+    assert batcher.stats()["largest_batch"] <= 4
+
+
+def test_encoder_errors_reach_every_caller_in_the_batch():
+    encoder = Encoder(delay=0.02)
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=200)
+    encoder.fail = True
+    errors = []
+
+    def call(texts):
+        try:
+            batcher.encode(texts)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call, args=([f"t{i}"],)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 6
+    # The worker survives a failed batch
+    encoder.fail = False
+    np.testing.assert_array_equal(batcher.encode(["ok"]), Encoder()(["ok"]))
+
+
+def test_lone_caller_is_not_held_for_the_window():
+    batcher = EmbeddingBatcher(Encoder(), max_wait_ms=2000)
+    batcher.encode(["warm up the worker"])
+    start = time.monotonic()
+    batcher.encode(["alone"])
+    assert time.monotonic() - start < 1.0
+
+
+def test_zero_wait_calls_the_encoder_directly():
+    encoder = Encoder()
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=0)
+    assert not batcher.enabled
+    np.testing.assert_array_equal(batcher.encode(["a", "b"]), Encoder()(["a", "b"]))
+    assert encoder.calls == [["a", "b"]]
+    assert batcher._worker is None and batcher.stats()["batches"] == 0
+
+
+def test_engine_queries_go_through_the_batcher(fake_sentence_model):
+    texts = [f"python developer {i}" for i in range(8)]
+    expected = ml_engine.encode_texts(texts, use_cache=False)
+    fake_sentence_model.calls.clear()
+    ml_engine.embedding_cache.clear()
+    results = _fan_out(ml_engine.embedding_batcher, [[text] for text in texts])
+    np.testing.assert_allclose(np.vstack(results), expected, atol=1e-6)
+    assert ml_engine.embedding_batcher.stats()["requests"] == 8
+    assert sum(len(call) for call in fake_sentence_model.calls) == 8
+
+
+def test_empty_request_skips_the_queue():
+    encoder = Encoder()
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=50)
+    assert len(batcher.encode([])) == 0
+    assert encoder.calls == [[]] and batcher._worker is None
@@ -0,0 +1,87 @@
+"""Versioned, memory-mapped embedding store"""
+
+import os
+
+import numpy as np
+
+from app.services.embedding_store import EmbeddingStore, catalog_fingerprint, store_key
+
+
+def test_compute_once_then_memory_map(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.arange(6, dtype=np.float32).reshape(3, 2)
+
+    first = store.get_or_compute("company_skills", "k1", ["a", "b", "c"], compute, model="m")
+    second = EmbeddingStore(str(tmp_path)).get_or_compute("company_skills", "k1", ["a", "b", "c"], compute)
+    assert len(calls) == 1
+    assert isinstance(second, np.memmap) and not second.flags.writeable
+    np.testing.assert_array_equal(first, second)
+
+
+def test_changed_rows_are_recomputed(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.get_or_compute("company_skills", "k1", ["a", "b"], lambda: np.zeros((2, 2), dtype=np.float32))
+    array = store.get_or_compute("company_skills", "k1", ["a", "c"], lambda: np.ones((2, 2), dtype=np.float32))
+    np.testing.assert_array_equal(array, np.ones((2, 2)))
+    assert store.load("company_skills", "k1")[0] == ["a", "c"]
+
+
+def test_torn_files_read_as_missing(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.save("company_skills", "k1", ["a", "b"], np.zeros((2, 2), dtype=np.float32))
+    array_path, _ = store._paths("company_skills", "k1")
+    with open(array_path, "wb") as f:
+        f.write(b"not an array")
+    assert store.load("company_skills", "k1") is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_prune_keeps_only_the_current_version(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    for key in ("old", "new"):
+        store.save("company_skills", key, ["a"], np.zeros((1, 2), dtype=np.float32), model="m")
+    store.save("company_profiles", "old", ["a"], np.zeros((1, 2), dtype=np.float32), model="m")
+    store.prune("company_skills", "new", "m")
+    assert sorted(os.listdir(tmp_path)) == ["company_profiles-old.json", "company_profiles-old.npy",
+                                            "company_skills-new.json", "company_skills-new.npy"]
+
+
+def test_prune_leaves_other_models_mapped(tmp_path):
+    # Two workers share the directory, one on torch and one on the ONNX backend
+    store = EmbeddingStore(str(tmp_path))
+    store.save("company_skills", "torch-v1", ["a"], np.ones((1, 2), dtype=np.float32), model="minilm")
+    store.save("company_skills", "onnx-v1", ["a"], np.full((1, 2), 2, dtype=np.float32), model="minilm+onnx")
+    store.save("company_skills", "legacy", ["a"], np.zeros((1, 2), dtype=np.float32))
+    mapped = store.load("company_skills", "onnx-v1")[1]
+
+    store.save("company_skills", "torch-v2", ["a"], np.ones((1, 2), dtype=np.float32), model="minilm")
+    store.prune("company_skills", "torch-v2", "minilm")
+    assert store.load("company_skills", "torch-v1") is None
+    assert store.load("company_skills", "torch-v2") is not None
+    assert store.load("company_skills", "onnx-v1")[1].tolist() == [[2.0, 2.0]]
+    assert store.load("company_skills", "legacy") is not None
+    assert mapped.tolist() == [[2.0, 2.0]]
+
+    store.prune("company_skills", "onnx-v2", "minilm+onnx")
+    assert store.load("company_skills", "onnx-v1") is None
+    assert store.load("company_skills", "torch-v2") is not None
+
+
+def test_disabled_store_computes_every_time():
+    store = EmbeddingStore("")
+    calls = []
+    compute = lambda: calls.append(1) or np.zeros((1, 2), dtype=np.float32)
+    store.get_or_compute("company_skills", "k", ["a"], compute)
+    store.get_or_compute("company_skills", "k", ["a"], compute)
+    assert len(calls) == 2 and not store.enabled
+
+
+def test_keys_change_with_catalog_and_model():
+    catalog = catalog_fingerprint(b'{"companies": {}}')
+    assert catalog != catalog_fingerprint(b'{"companies": {"a": {}}}')
+    assert store_key(catalog, "model-a") != store_key(catalog, "model-b")
+    assert store_key(catalog, "model-a") == store_key(catalog, "model-a")
@@ -0,0 +1,137 @@
+"""Incremental rule mining against a full re-mine, and the transaction log"""
+
+import json
+import random
+
+import pytest
+
+from app.services import association_rules
+from app.services.association_rules import (
+    IncrementalRuleMiner, catalog_transactions, compact_transaction_log, frequent_itemsets, mine_association_rules,
+)
+
+
+def _full(transactions):
+    return mine_association_rules(list(transactions))["association_rules"]
+
+
+def _resumes(companies, n, seed):
+    return list(association_rules._synthetic_transactions(n, companies, seed))
+
+
+def test_counts_track_a_full_mine_when_itemsets_are_stable(companies, monkeypatch):
+    base = list(catalog_transactions(companies))
+    miner = IncrementalRuleMiner(base, drift_threshold=10, log_path=None)
+    # Counting path only: items briefly look newly frequent halfway through
+    monkeypatch.setattr(miner, "_start_remine", lambda: None)
+    # Every transaction again: supports and min_count double, so the frequent itemsets end up unchanged
+    for transaction in base:
+        miner.add(transaction, log=False)
+    assert miner.rules() == _full(base + base)
+    database = miner.database
+    for counts, paths in zip(miner._counts, (database.skill_paths, database.interest_paths)):
+        recount = frequent_itemsets(paths, 1, 4, database.targets())
+        assert all(recount[itemset] == count for itemset, count in counts.counts().items())
+
+
+def test_remines_converge_to_a_full_mine(companies):
+    base = list(catalog_transactions(companies))
+    added = _resumes(companies, 120, seed=1)
+    miner = IncrementalRuleMiner(base, drift_threshold=0.2, log_path=None)
+    for transaction in added:
+        miner.add(transaction, log=False)
+    miner.wait(timeout=30)
+    # The last re-mine may predate the last few adds; one more brings it to the current data
+    miner._start_remine()
+    miner.wait(timeout=30)
+    assert miner.rules() == _full(base + added)
+
+
+def test_zero_threshold_remines_once_per_change(companies):
+    miner = IncrementalRuleMiner(catalog_transactions(companies), drift_threshold=0, log_path=None)
+    miner.add({"skills": ["python"], "interests": [], "sector": "Data"}, log=False)
+    miner.wait(timeout=10)
+    assert miner._remine_thread is None and miner.version == 2
+
+
+def test_retraction_restores_the_rules(companies):
+    base = list(catalog_transactions(companies))
+    miner = IncrementalRuleMiner(base, drift_threshold=10, log_path=None)
+    before = miner.rules()
+    transaction = _resumes(companies, 1, seed=2)[0]
+    miner.add(transaction, count=3, log=False)
+    assert miner.rules() != before
+    miner.add(transaction, count=-3, log=False)
+    assert miner.rules() == before
+
+
+def test_log_replay_rebuilds_the_same_rules(tmp_path, companies):
+    log_path = str(tmp_path / "transactions.jsonl")
+    base = list(catalog_transactions(companies))
+    added = _resumes(companies, 40, seed=3)
+    miner = IncrementalRuleMiner(base, drift_threshold=10, log_path=log_path)
+    for transaction in added:
+        miner.add(transaction)
+    replayed = IncrementalRuleMiner(base, drift_threshold=10, log_path=log_path)
+    assert replayed.database.total == len(base) + len(added)
+    assert replayed.rules() == _full(base + added)
+
+
+def test_compaction_keeps_counts(tmp_path):
+    log_path = str(tmp_path / "transactions.jsonl")
+    rng = random.Random(4)
+    transactions = [{"skills": [rng.choice(["python", "sql"])], "interests": [], "sector": "Data"} for _ in range(50)]
+    with open(log_path, "w", encoding="utf-8") as f:
+        for transaction in transactions:
+            f.write(json.dumps(transaction) + "\n")
+    assert compact_transaction_log(log_path) == (50, 2)
+    with open(log_path, encoding="utf-8") as f:
+        compacted = [json.loads(line) for line in f]
+    assert sum(entry.get("count", 1) for entry in compacted) == 50
+    assert compact_transaction_log(log_path) == (2, 2)
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+
+
+def test_log_compacts_as_it_grows(tmp_path, companies, monkeypatch):
+    monkeypatch.setattr(association_rules, "LOG_COMPACT_MIN_LINES", 20)
+    log_path = str(tmp_path / "transactions.jsonl")
+    transactions = _resumes(companies, 5, seed=5)
+    miner = IncrementalRuleMiner((), drift_threshold=1000, log_path=log_path)
+    for i in range(60):
+        miner.add(transactions[i % 5])
+    with open(log_path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) < 20
+    assert sum(entry.get("count", 1) for entry in lines) == 60
+    assert IncrementalRuleMiner((), drift_threshold=1000, log_path=log_path).database.total == 60
+
+
+@pytest.mark.parametrize("count", [0, -1])
+def test_non_positive_counts_are_not_logged(tmp_path, count):
+    log_path = str(tmp_path / "transactions.jsonl")
+    miner = IncrementalRuleMiner((), drift_threshold=1000, log_path=log_path)
+    miner.add({"skills": ["python"], "interests": [], "sector": "Data"}, count=count)
+    assert not (tmp_path / "transactions.jsonl").exists()
+
+
+def test_engine_miner_learns_only_from_recorded_labels(companies, monkeypatch):
+    from app.services.ml_engine import ml_engine
+
+    monkeypatch.setattr(ml_engine, "_rule_miner", None)
+    monkeypatch.setattr(ml_engine, "training_data", {"resumes": [], "companies": [], "matches": [], "feedback": []})
+    # The catalog's own records are not transactions: nothing to mine yet
+    miner = ml_engine.rule_miner
+    assert miner.database.total == 0
+    assert not any(miner.rules().values())
+
+    fintech, design = "PAYTM (ONE97 COMMUNICATIONS LIMITED)", "TATA CONSULTANCY SERVICES LIMITED"
+    for company, skills in ((fintech, ["Python", "SQL"]), (design, ["Figma"])):
+        for _ in range(4):
+            ml_engine.add_feedback("rec", 5, company=company, profile={"skills": skills, "interests": []})
+    ml_engine.add_feedback("rec", 1, company=design, profile={"skills": ["Python"], "interests": []})
+    assert miner.database.total == 8
+    # New labels drift past the (empty) last mine, so the background re-mine finds them
+    miner.wait(timeout=30)
+    consequents = {rule["consequent"] for rule in miner.rules()["skill_company_rules"].values()
+                   if rule["consequent_type"] == "company"}
+    assert consequents == {fintech, design}
@@ -0,0 +1,55 @@
+"""Aho-Corasick keyword automaton against brute-force substring scans"""
+
+import random
+
+from app.services.keyword_automaton import KeywordAutomaton
+
+
+def _whole_word_occurrences(keyword, text):
+    found = []
+    start = text.find(keyword)
+    while start != -1:
+        end = start + len(keyword)
+        if not (start > 0 and text[start - 1].isalnum()) and not (end < len(text) and text[end].isalnum()):
+            found.append(keyword)
+        start = text.find(keyword, start + 1)
+    return found
+
+
+def test_find_keywords_matches_substring_scan():
+    rng = random.Random(0)
+    keywords = ["".join(rng.choice("abc ") for _ in range(rng.randint(1, 4))) for _ in range(40)]
+    automaton = KeywordAutomaton((keyword, None) for keyword in keywords)
+    for _ in range(500):
+        text = "".join(rng.choice("abcd -") for _ in range(rng.randint(0, 30)))
+        assert automaton.find_keywords(text) == {k for k in keywords if k in text}
+        assert automaton.find_keywords(text, whole_words=True) == \
+            {k for k in keywords if _whole_word_occurrences(k, text)}
+
+
+def test_overlapping_and_nested_occurrences():
+    automaton = KeywordAutomaton((keyword, None) for keyword in ["he", "she", "his", "hers"])
+    assert sorted(automaton.iter_matches("ushers")) == [(4, "he"), (4, "she"), (6, "hers")]
+
+
+def test_whole_words_respect_letters_and_digits():
+    automaton = KeywordAutomaton([("go", "go"), ("c++", "c++"), ("ai", "ai")])
+    assert automaton.find_keywords("good golang", whole_words=True) == set()
+    assert automaton.find_keywords("go, c++ and ai.", whole_words=True) == {"go", "c++", "ai"}
+    assert automaton.find_keywords("go2 ai1 x-go", whole_words=True) == {"go"}
+    assert automaton.find_keywords("good") == {"go"}
+
+
+def test_labels_and_priority():
+    automaton = KeywordAutomaton.from_groups([["bank"], ["fin", "pay"], ["tech"]])
+    automaton.add("fintech", "sector")
+    assert automaton.find_labels("fintech payments") == {1, 2, "sector"}
+    assert KeywordAutomaton.from_groups([["bank"], ["fin"], ["tech"]]).first_label("fintech bank") == 0
+    assert KeywordAutomaton.from_groups([["bank"]]).first_label("insurance") is None
+
+
+def test_adding_after_matching_recompiles():
+    automaton = KeywordAutomaton([("data", "data")])
+    assert automaton.find_keywords("data science") == {"data"}
+    automaton.add("science")
+    assert automaton.find_keywords("data science") == {"data", "science"}
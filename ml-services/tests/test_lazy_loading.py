@@ -0,0 +1,70 @@
+"""Lazy backends: importing and serving /health loads no model, and each backend loads once"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+from app.services import ml_engine as engine_module
+from app.services.ml_engine import ml_engine
+from conftest import SERVICE_DIR
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "spacy", "nltk", "textblob", "sklearn",
+                 "onnxruntime")
+
+
+def test_import_and_health_load_no_backend():
+    # A fresh interpreter: other tests load backends into this one
+    script = textwrap.dedent(f"""
+        import sys
+        heavy = {HEAVY_MODULES!r}
+        import app.main
+        from fastapi.testclient import TestClient
+        assert TestClient(app.main.app).get("/health").json() == {{"status": "healthy", "modelsReady": False}}
+        print("loaded:" + ",".join(name for name in heavy if name in sys.modules))
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=SERVICE_DIR, env=os.environ.copy(),
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "loaded:"
+
+
+def test_backend_loads_once_for_concurrent_first_callers(monkeypatch):
+    loads = []
+    model = object()
+
+    def load_embedding_backend(name, model_path, onnx_dir):
+        loads.append(name)
+        time.sleep(0.05)
+        return model
+
+    monkeypatch.setattr(engine_module, "load_embedding_backend", load_embedding_backend)
+    monkeypatch.setattr(ml_engine, "_loaded", ml_engine._loaded - {"sentence_model"})
+    monkeypatch.setattr(ml_engine, "_sentence_model", None)
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(ml_engine.sentence_model)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads == [engine_module.EMBEDDING_BACKEND]
+    assert seen == [model] * 8
+
+
+def test_failed_backend_falls_back_then_stays_unavailable(monkeypatch):
+    loads = []
+
+    def load_embedding_backend(name, model_path, onnx_dir):
+        loads.append(name)
+        raise ImportError(f"{name} not installed")
+
+    monkeypatch.setattr(engine_module, "EMBEDDING_BACKEND", "onnx")
+    monkeypatch.setattr(engine_module, "load_embedding_backend", load_embedding_backend)
+    monkeypatch.setattr(ml_engine, "_loaded", ml_engine._loaded - {"sentence_model"})
+    assert ml_engine.sentence_model is None
+    assert ml_engine.sentence_model is None
+    # The configured backend, then torch, each tried once
+    assert loads == ["onnx", "torch"]
+    assert "sentence_model" in ml_engine._loaded
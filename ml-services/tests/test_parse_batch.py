@@ -0,0 +1,143 @@
+"""/parse_resume/batch: one line per resume, ZIP members included, and disconnects"""
+
+import asyncio
+import io
+import json
+import time
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers, UploadFile
+
+from app import main
+
+RESUMES = {
+    "alice.txt": b"Python developer with Django, SQL and Docker experience. Interested in fintech.",
+    "bob.txt": b"Frontend engineer: React, TypeScript, CSS. Built an e-commerce storefront.",
+    "carol.txt": b"Machine learning with PyTorch and pandas; deployed models on AWS.",
+    "dan.txt": b"Android and Kotlin mobile apps, Firebase, CI pipelines with Jenkins.",
+}
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Parsed resumes, instead of transactions for the shared rule miner"""
+    transactions = []
+    monkeypatch.setattr(main, "_record_resume", transactions.append)
+    return transactions
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def _lines(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return sorted((json.loads(line) for line in response.text.splitlines() if line), key=lambda r: r["index"])
+
+
+def _single(client, filename, data):
+    response = client.post("/parse_resume", files={"file": (filename, data, "text/plain")})
+    assert response.status_code == 200
+    return {k: v for k, v in response.json().items() if k != "filename"}
+
+
+def test_batch_matches_single_parses(client, recorded):
+    archive = _zip({"cv/carol.txt": RESUMES["carol.txt"], "cv/dan.txt": RESUMES["dan.txt"],
+                    "__MACOSX/cv/._carol.txt": b"junk", ".DS_Store": b"junk", "cv/": b""})
+    files = [
+        ("files", ("alice.txt", RESUMES["alice.txt"], "text/plain")),
+        ("files", ("resumes.zip", archive, "application/zip")),
+        ("files", ("broken.zip", b"not a zip", "application/zip")),
+        ("files", ("bob.txt", RESUMES["bob.txt"], "text/plain")),
+    ]
+    lines = _lines(client.post("/parse_resume/batch", files=files))
+
+    assert [(r["index"], r["filename"], r.get("archive")) for r in lines] == [
+        (0, "alice.txt", None),
+        (1, "cv/carol.txt", "resumes.zip"),
+        (2, "cv/dan.txt", "resumes.zip"),
+        (3, "broken.zip", None),
+        (4, "bob.txt", None),
+    ]
+    assert lines[3]["error"].startswith("Could not read ZIP archive")
+    # Every parsed resume is recorded once
+    assert len(recorded) == 4
+    for line in lines[:3] + lines[4:]:
+        name = line["filename"].split("/")[-1]
+        expected = _single(client, name, RESUMES[name])
+        assert {k: v for k, v in line.items() if k not in ("index", "filename", "archive")} == expected
+
+
+def test_batch_file_limit_and_per_item_errors(client, recorded, monkeypatch):
+    monkeypatch.setattr(main, "PARSE_BATCH_MAX_FILES", 2)
+    monkeypatch.setattr(main, "PARSE_BATCH_CONCURRENCY", 1)
+
+    def parse_document(filename, data, mime):
+        if filename == "bob.txt":
+            raise main.DocumentTooLarge("too many characters")
+        return {"skills": [filename]}
+
+    monkeypatch.setattr(main, "parse_document", parse_document)
+    files = [("files", (name, data, "text/plain")) for name, data in RESUMES.items()]
+    lines = _lines(client.post("/parse_resume/batch", files=files))
+
+    assert lines[0]["skills"] == ["alice.txt"]
+    assert lines[1]["error"].startswith("Resume document too large")
+    assert [r["error"] for r in lines[2:]] == ["Batch is limited to 2 files"] * 2
+
+
+def test_disconnect_lets_in_flight_parses_finish_and_closes_archives(recorded, monkeypatch):
+    monkeypatch.setattr(main, "PARSE_BATCH_CONCURRENCY", 2)
+    parsed = []
+
+    def parse_document(filename, data, mime):
+        time.sleep(0.05 if filename == "alice.txt" else 0.3)
+        parsed.append(filename)
+        return {"skills": []}
+
+    opened = []
+
+    class ZipFile(zipfile.ZipFile):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            opened.append(self)
+
+    def upload(filename, data, mime):
+        return UploadFile(io.BytesIO(data), filename=filename, headers=Headers({"content-type": mime}))
+
+    files = [upload("alice.txt", RESUMES["alice.txt"], "text/plain"),
+             upload("more.zip", _zip({"bob.txt": RESUMES["bob.txt"], "carol.txt": RESUMES["carol.txt"]}),
+                    "application/zip")]
+    monkeypatch.setattr(main, "parse_document", parse_document)
+    monkeypatch.setattr(main.zipfile, "ZipFile", ZipFile)
+
+    async def scenario():
+        results = main._parse_batch_results(files, None)
+        first = json.loads(await results.__anext__())
+        # The client goes away with bob.txt still being parsed
+        await results.aclose()
+        assert opened and opened[0].fp is not None
+        for _ in range(100):
+            if not main._ORPHANED_PARSES:
+                break
+            await asyncio.sleep(0.05)
+        return first
+
+    first = asyncio.run(scenario())
+    assert first["filename"] == "alice.txt"
+    # bob.txt finished with its result dropped; carol.txt was never started
+    assert parsed == ["alice.txt", "bob.txt"]
+    assert not main._ORPHANED_PARSES
+    assert opened[0].fp is None
@@ -0,0 +1,84 @@
+"""Parser pool: timeouts, cancellation and dead workers stay confined to one job"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from app.services.resume_parser import ParserPool, ParserUnavailable, ParseTimeout
+
+
+# Jobs run in spawned workers, which import them from this module
+def sleep(seconds, value=None):
+    time.sleep(seconds)
+    return os.getpid() if value is None else value
+
+
+def crash():
+    os._exit(3)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ParserPool(workers=2, timeout=20)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+async def _cancel_after(delay, coroutine):
+    task = asyncio.ensure_future(coroutine)
+    await asyncio.sleep(delay)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+def test_timeout_replaces_only_its_own_worker(pool):
+    async def scenario():
+        return await asyncio.gather(pool.run(sleep, 5, timeout=1), pool.run(sleep, 2, "ok"), return_exceptions=True)
+
+    restarts = pool.restarts
+    slow, other = asyncio.run(scenario())
+    assert isinstance(slow, ParseTimeout) and other == "ok"
+    assert pool.restarts == restarts + 1 and pool.stats()["idle"] == 2
+
+
+def test_cancel_replaces_the_worker(pool):
+    restarts = pool.restarts
+    asyncio.run(_cancel_after(0.3, pool.run(sleep, 3)))
+    assert pool.restarts == restarts + 1 and pool.stats()["idle"] == 2
+
+
+def test_dead_worker_is_replaced_then_reported():
+    pool = ParserPool(workers=1, timeout=30)
+    try:
+        with pytest.raises(ParserUnavailable):
+            asyncio.run(pool.run(crash))
+        assert pool.restarts == 2
+        assert asyncio.run(pool.run(sleep, 0, "fine")) == "fine"
+    finally:
+        pool.shutdown()
+
+
+def test_warm_up_counts_towards_the_timeout():
+    pool = ParserPool(workers=1, timeout=0.5)
+    try:
+        pool._slot_executor(0)
+        pool._ready[0] = Future()  # a warm-up that never finishes
+        start = time.monotonic()
+        with pytest.raises(ParseTimeout):
+            asyncio.run(pool.run(sleep, 0))
+        assert time.monotonic() - start < 5
+        assert asyncio.run(pool.run(sleep, 0, "fine", timeout=30)) == "fine"
+    finally:
+        pool.shutdown()
+
+
+def test_in_process_fallback_times_out():
+    pool = ParserPool(workers=0, timeout=0.2)
+    assert asyncio.run(pool.run(sleep, 0, "inline")) == "inline"
+    with pytest.raises(ParseTimeout):
+        asyncio.run(pool.run(sleep, 1))
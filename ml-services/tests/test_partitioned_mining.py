@@ -0,0 +1,50 @@
+"""Partitioned (SON) mining against single-pass mining"""
+
+import json
+
+import pytest
+
+from app.services.association_rules import _synthetic_transactions, catalog_transactions, mine_association_rules
+from app.services.partitioned_mining import _partition_transactions, file_partitions, mine_partitioned
+
+
+@pytest.fixture(scope="module")
+def log_file(tmp_path_factory, companies):
+    path = tmp_path_factory.mktemp("son") / "transactions.jsonl"
+    transactions = list(_synthetic_transactions(600, companies, seed=0))
+    with open(path, "w", encoding="utf-8") as f:
+        for i, transaction in enumerate(transactions):
+            # Some lines carry a count, as in a compacted log
+            entry = {**transaction, "count": 2} if i % 7 == 0 else transaction
+            f.write(json.dumps(entry) + "\n")
+            if i % 50 == 0:
+                f.write("\n")
+    return str(path)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 997, 20_000, 10 ** 9])
+def test_partitions_cover_every_line_once(log_file, chunk_bytes):
+    partitions = file_partitions(log_file, chunk_bytes)
+    assert [t for partition in partitions for t in _partition_transactions(partition)] == _read(log_file)
+
+
+def test_partitioned_rules_equal_single_pass(log_file, companies):
+    partitions = file_partitions(log_file, 20_000) + [("rows", list(catalog_transactions(companies)))]
+    assert len(partitions) > 3
+    config = {"min_support": 0.01}
+    result = mine_partitioned(partitions, config, workers=2)
+    expected = mine_association_rules(_read(log_file) + list(catalog_transactions(companies)), config)
+    assert result["association_rules"] == expected["association_rules"]
+    assert result["stats"]["transactions"] == expected["stats"]["transactions"]
+    assert result["association_rules"]["skill_company_rules"], "no rules mined: the comparison is vacuous"
+
+
+def test_empty_partitions():
+    result = mine_partitioned([("rows", [])], workers=1)
+    assert result["association_rules"] == {"skill_company_rules": {}, "interest_sector_rules": {}}
+    assert result["stats"]["transactions"] == 0
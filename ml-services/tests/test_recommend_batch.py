@@ -0,0 +1,72 @@
+"""/recommend/batch returns, item for item, what /recommend returns"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.services import ml_engine as engine_module
+
+ITEMS = [
+    {"type": "interests", "interests": ["machine learning", "fintech"]},
+    {"type": "resume", "interests": ["Cloud", "devops"], "skills": ["Docker", "Kubernetes", "AWS"],
+     "experience": ["Built CI pipelines"], "projects": [], "location": "Bangalore"},
+    {"type": "interests", "interests": ["  "]},
+    {"type": "resume", "interests": ["web development"], "skills": ["React", "JavaScript", "Node.js"],
+     "experience": [], "projects": ["Storefront"], "education": ["B.Tech"]},
+    {"type": "interests", "interests": ["cybersecurity", "data science"]},
+    {"type": "resume", "interests": ["mobile"], "skills": [], "experience": [], "projects": []},
+    {"type": "interests", "interests": ["machine learning", "fintech"]},
+]
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def _single(client, item):
+    main.RESPONSE_CACHE.clear()
+    response = client.post("/recommend", json=item)
+    if response.status_code != 200:
+        return {"error": response.json()["detail"]}
+    return response.json()
+
+
+def _batch(client, items, stream=False):
+    response = client.post("/recommend/batch" + ("?stream=true" if stream else ""), json={"items": items})
+    assert response.status_code == 200
+    if stream:
+        return [json.loads(line) for line in response.text.splitlines() if line]
+    return response.json()["results"]
+
+
+def _expected(client, items):
+    return [{"index": index, **_single(client, item)} for index, item in enumerate(items)]
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 256])
+def test_batch_matches_single_requests(client, monkeypatch, chunk):
+    monkeypatch.setattr(main, "BATCH_CHUNK", chunk)
+    expected = _expected(client, ITEMS)
+    assert any("error" in result for result in expected)
+    assert any(result.get("recommendations") for result in expected)
+    assert _batch(client, ITEMS) == expected
+    assert _batch(client, ITEMS, stream=True) == expected
+
+
+def test_batch_matches_single_requests_with_ann_candidates(client, monkeypatch, fake_sentence_model):
+    # Force the ANN retrieval path on the small catalog, for both endpoints
+    monkeypatch.setattr(engine_module, "ANN_MIN_CATALOG", 10)
+    monkeypatch.setattr(engine_module, "ANN_CANDIDATES", 8)
+    engine_module.ml_engine._ensure_ann_index()
+    assert engine_module.ml_engine.ann_candidates("python machine learning") is not None
+    assert _batch(client, ITEMS) == _expected(client, ITEMS)
+
+
+def test_batch_size_limit(client, monkeypatch):
+    monkeypatch.setattr(main, "BATCH_MAX_ITEMS", 2)
+    response = client.post("/recommend/batch", json={"items": ITEMS[:3]})
+    assert response.status_code == 413
+    assert _batch(client, ITEMS[:2]) == _expected(client, ITEMS[:2])
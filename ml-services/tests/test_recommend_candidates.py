@@ -0,0 +1,82 @@
+"""Stage-one candidate retrieval: with the cut disabled /recommend is exact"""
+
+import random
+
+import numpy as np
+import pytest
+
+from app import main
+from app.services.confidence_engine import ConfidenceEngine
+
+
+@pytest.fixture(scope="module")
+def large_engine(companies):
+    """Ten copies of the catalog with shuffled skill lists, so postings cover a fraction of it"""
+    rng = random.Random(7)
+    catalog = {}
+    for copy in range(10):
+        for name, company in companies.items():
+            skills = list(company.get("required_skills", []))
+            rng.shuffle(skills)
+            catalog[f"{name} #{copy}"] = {**company, "required_skills": skills[:rng.randint(0, len(skills))]}
+    return ConfidenceEngine(catalog)
+
+
+def _profiles(companies, count=150):
+    rng = random.Random(3)
+    specializations = sorted({s.lower() for c in companies.values() for s in c.get("specializations", [])})
+    skills = sorted({s for c in companies.values() for s in c.get("required_skills", [])})
+    interests = list(main.INTEREST_TO_SECTORS) + specializations
+    sectors = sorted({c.get("sector", "") for c in companies.values()} - {""})
+    for _ in range(count):
+        rules = None
+        if rng.random() < 0.3:
+            rules = ({rng.choice(sectors): 0.9}, {rng.choice(list(companies)) + " #0": 0.8})
+        yield rng.sample(interests, rng.randint(1, 4)), rng.sample(skills, rng.randint(0, 6)), rules
+
+
+def _selection(engine, interests, skills, rules, rows):
+    scored = engine.confidences(interests, main._infer_target_sectors(interests), skills, rows, rules)
+    scored.sort(key=lambda x: (-x[1], x[0]))
+    return main._select_top(scored)
+
+
+def test_cut_is_off_by_default():
+    assert main.RECOMMEND_MAX_CANDIDATES == 0
+
+
+def test_uncut_candidates_select_like_full_scoring(large_engine, companies):
+    narrowed = 0
+    for interests, skills, rules in _profiles(companies):
+        rows = large_engine.candidate_rows(
+            interests, main._infer_target_sectors(interests), skills, main.CANDIDATE_FALLBACK, rules, limit=None
+        )
+        if rows is not None:
+            narrowed += 1
+        assert _selection(large_engine, interests, skills, rules, rows) == \
+            _selection(large_engine, interests, skills, rules, None)
+    # The comparison is only meaningful if stage one actually narrowed some requests
+    assert narrowed > 0
+
+
+def test_recommend_matches_full_catalog_scoring(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    client = TestClient(main.app)
+    payload = {"interests": ["machine learning", "fintech"], "skills": ["Python", "SQL", "Docker"]}
+    main.RESPONSE_CACHE.clear()
+    expected = client.post("/recommend", json=payload).json()
+    monkeypatch.setattr(ConfidenceEngine, "candidate_rows", lambda self, *args, **kwargs: None)
+    main.RESPONSE_CACHE.clear()
+    assert client.post("/recommend", json=payload).json() == expected
+    assert expected["recommendations"]
+
+
+def test_cut_bounds_the_candidates(large_engine, companies):
+    interests, skills, rules = next(_profiles(companies))
+    rows = large_engine.candidate_rows(
+        interests, main._infer_target_sectors(interests), skills, main.CANDIDATE_FALLBACK, rules, limit=50
+    )
+    assert rows is not None and np.all(np.diff(rows) > 0)
+    # The cut keeps 50 matches; the per-class fallback rows come on top
+    assert len(rows) <= 50 + main.CANDIDATE_FALLBACK * len(large_engine._by_name)
@@ -0,0 +1,79 @@
+"""/recommend response cache: hits, key normalization and invalidation on served content"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.services.cache import LRUCache
+from app.services.ml_engine import ml_engine
+from app.services.rule_store import RuleIndex, RuleStore
+
+PAYLOAD = {"type": "resume", "interests": ["machine learning", "fintech"], "skills": ["Python", "SQL"],
+           "experience": [], "projects": [], "location": "Mumbai"}
+
+RULES = {"skill_company_rules": {"r1": {
+    "antecedent": ["python"], "consequent": "PAYTM (ONE97 COMMUNICATIONS LIMITED)",
+    "consequent_type": "company", "confidence": 0.9, "support": 0.1}}}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # A fresh cache and a rule store with no file behind it, so only publish() changes rules
+    monkeypatch.setattr(main, "RESPONSE_CACHE", LRUCache(64, ttl=300))
+    monkeypatch.setattr(main, "_response_cache_version", None)
+    monkeypatch.setattr(main, "RULE_STORE", RuleStore(path=None, source="file"))
+    return TestClient(main.app)
+
+
+def _post(client, payload=PAYLOAD):
+    response = client.post("/recommend", json=payload)
+    assert response.status_code == 200
+    # Only a computed response carries stage timings
+    return response.json(), "server-timing" not in response.headers
+
+
+def test_repeat_request_is_served_from_the_cache(client):
+    body, cached = _post(client)
+    assert not cached and body["recommendations"]
+    assert _post(client) == (body, True)
+    assert main.RESPONSE_CACHE.stats()["hits"] == 1
+
+
+def test_key_ignores_interest_case_and_whitespace(client):
+    body, _ = _post(client)
+    assert _post(client, {**PAYLOAD, "interests": ["  Machine Learning ", "FINTECH", ""]}) == (body, True)
+    # Anything else in the request is a different entry
+    assert _post(client, {**PAYLOAD, "location": "Pune"})[1] is False
+    assert _post(client, {**PAYLOAD, "skills": ["Python"]})[1] is False
+
+
+def test_unchanged_rules_keep_the_cache_and_changed_rules_clear_it(client):
+    main.RULE_STORE.publish(RuleIndex(RULES))
+    body, _ = _post(client)
+    generation = main.RULE_STORE.generation
+
+    # Same served rules (support differs): no swap, still a hit
+    same = {"skill_company_rules": {"renamed": {**RULES["skill_company_rules"]["r1"], "support": 0.5}}}
+    assert main.RULE_STORE.publish(RuleIndex(same)) is False
+    assert main.RULE_STORE.generation == generation
+    assert _post(client) == (body, True)
+
+    changed = {"skill_company_rules": {"r1": {**RULES["skill_company_rules"]["r1"], "confidence": 0.5}}}
+    assert main.RULE_STORE.publish(RuleIndex(changed)) is True
+    assert _post(client)[1] is False
+    assert main.RESPONSE_CACHE.stats()["size"] == 1
+
+
+def test_catalog_swap_clears_the_cache(client, monkeypatch):
+    _post(client)
+    monkeypatch.setattr(ml_engine, "catalog_version", "another-catalog")
+    assert _post(client)[1] is False
+    assert main.RESPONSE_CACHE.stats()["size"] == 1
+
+
+def test_zero_size_disables_the_cache(client, monkeypatch):
+    monkeypatch.setattr(main, "RESPONSE_CACHE", LRUCache(0))
+    assert main._response_cache_key(None, {"interests": ["x"], "skills": [], "experience": [], "projects": []}) \
+        is None
+    assert _post(client)[1] is False
+    assert _post(client)[1] is False
@@ -0,0 +1,158 @@
+"""Rule serving: antecedent trie against a linear scan, and RuleStore sources"""
+
+import json
+import os
+import random
+
+import pytest
+
+from app.services.association_rules import normalize_item
+from app.services.rule_store import RULE_FAMILIES, RuleIndex, RuleStore
+
+ITEMS = ["python", "sql", "machine learning", "excel", "figma", "java", "react", "aws"]
+
+
+def _rules(seed, count=150):
+    rng = random.Random(seed)
+    rules = {}
+    for family, _ in RULE_FAMILIES:
+        rules[family] = {}
+        for i in range(count):
+            antecedent = rng.sample(ITEMS, rng.randint(1, 3))
+            if rng.random() < 0.3:
+                antecedent = [item.upper() + " " for item in antecedent]
+            rules[family][f"{family}-{i}"] = {
+                "antecedent": antecedent,
+                "consequent": rng.choice(["Data", "Design", "Acme", "Globex"]),
+                "consequent_type": rng.choice(["sector", "company"]),
+                "confidence": round(rng.uniform(0.7, 1.0), 4),
+            }
+    return rules
+
+
+def _linear_match(rules, profile):
+    matched = []
+    for family, field in RULE_FAMILIES:
+        items = {normalize_item(value) for value in profile.get(field) or []}
+        for name, rule in rules[family].items():
+            if {normalize_item(item) for item in rule["antecedent"]} <= items:
+                matched.append((name, rule))
+    return matched
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_trie_matches_linear_scan(seed):
+    rules = _rules(seed)
+    index = RuleIndex(rules)
+    rng = random.Random(seed + 100)
+    for _ in range(200):
+        profile = {"skills": rng.sample(ITEMS + ["go"], rng.randint(0, 6)),
+                   "interests": rng.sample(ITEMS, rng.randint(0, 4))}
+        assert sorted(name for name, _ in index.match(profile)) == \
+            sorted(name for name, _ in _linear_match(rules, profile))
+
+
+def test_aggregate_keeps_the_best_confidence_per_consequent():
+    rules = {"skill_company_rules": {
+        "a": {"antecedent": ["python"], "consequent": "Acme", "consequent_type": "company", "confidence": 0.8},
+        "b": {"antecedent": ["python", "sql"], "consequent": "Acme", "consequent_type": "company", "confidence": 0.9},
+        "c": {"antecedent": ["python"], "consequent": "Data", "consequent_type": "sector", "confidence": 0.75},
+        "d": {"antecedent": ["java"], "consequent": "Data", "consequent_type": "sector", "confidence": 0.95},
+        "e": {"antecedent": [], "consequent": "Data", "consequent_type": "sector", "confidence": 1.0},
+    }}
+    sectors, companies = RuleIndex(rules).aggregate({"skills": ["Python", "SQL"]})
+    assert sectors == {"Data": 0.75} and companies == {"Acme": 0.9}
+
+
+def _write(path, rules):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"association_rules": rules}, f)
+
+
+def test_file_store_reloads_only_changed_rules(tmp_path):
+    path = str(tmp_path / "rules.json")
+    rules = _rules(0, count=5)
+    _write(path, rules)
+    store = RuleStore(path=path, reload_interval=0, source="file")
+    assert store.source == "file" and len(store.index) == 10 and store.generation == 1
+    rules["skill_company_rules"]["skill_company_rules-0"]["support"] = 0.5
+    _write(path, rules)
+    assert store.reload(force=True) is False and store.generation == 1
+    rules["skill_company_rules"]["skill_company_rules-0"]["confidence"] = 0.71
+    _write(path, rules)
+    fingerprint = store.fingerprint
+    assert store.reload(force=True) is True and store.generation == 2 and store.fingerprint != fingerprint
+
+
+def test_unreadable_file_keeps_the_served_rules(tmp_path):
+    path = str(tmp_path / "rules.json")
+    _write(path, _rules(0, count=5))
+    store = RuleStore(path=path, reload_interval=0, source="file")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{not json")
+    assert store.reload(force=True) is False and len(store.index) == 10
+
+
+class _FakeMiner:
+    def __init__(self, rules):
+        self.version = 0
+        self._rules = rules
+
+    def rules(self):
+        return self._rules
+
+
+def test_source_is_fixed_at_startup(tmp_path):
+    path = str(tmp_path / "rules.json")
+    built = []
+    live = lambda: built.append(1) or _FakeMiner(_rules(1, count=3))
+    assert RuleStore(path=path, live_source=live, source="auto").source == "live"
+    assert not built, "the live source must be resolved lazily"
+    _write(path, _rules(0, count=5))
+    assert RuleStore(path=path, live_source=live, source="auto").source == "file"
+    assert RuleStore(path=path, live_source=None, source="live").source == "file"
+
+
+def test_live_store_follows_the_miner_version(tmp_path):
+    miner = _FakeMiner(_rules(1, count=3))
+    store = RuleStore(path=str(tmp_path / "missing.json"), reload_interval=0, live_source=lambda: miner, source="auto")
+    assert len(store.index) == 0 and store.reload() is True and len(store.index) == 6
+    assert store.reload() is False
+    miner.version += 1
+    assert store.reload() is False, "same rules at a new version keep the index"
+    miner.version += 1
+    miner._rules = _rules(2, count=3)
+    assert store.reload() is True and store.stats()["live_version"] == 2
+
+
+def test_default_source_serves_no_rules_without_a_rules_file(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import main
+    from app.services import rule_store
+
+    if "ML_RULES_SOURCE" not in os.environ:
+        assert rule_store.RULES_SOURCE == "file"
+    built = []
+    store = RuleStore(path=str(tmp_path / "missing.json"), reload_interval=0,
+                      live_source=lambda: built.append(1) or _FakeMiner(_rules(1, count=3)))
+    assert store.source == "file" and not store.reload() and len(store.index) == 0 and not built
+
+    # /recommend under the default configuration equals scoring without rules
+    monkeypatch.setattr(main, "RULE_STORE", store)
+    client = TestClient(main.app)
+    rng = random.Random(11)
+    interests = list(main.INTEREST_TO_SECTORS)
+    skills = sorted({s for c in main.ml_engine.company_database["companies"].values()
+                     for s in c.get("required_skills", [])})
+    for _ in range(300):
+        chosen, picked = rng.sample(interests, rng.randint(1, 3)), rng.sample(skills, rng.randint(0, 5))
+        main.RESPONSE_CACHE.clear()
+        response = client.post("/recommend", json={"type": "resume", "interests": chosen, "skills": picked,
+                                                   "experience": [], "projects": []})
+        normalized = main._normalize_terms(chosen)
+        scored = main.CONFIDENCE_ENGINE.confidences(normalized, main._infer_target_sectors(normalized), picked)
+        scored.sort(key=lambda x: (-x[1], x[0]))
+        assert [(r["company"], r["matchScore"]) for r in response.json()["recommendations"]] == \
+            [(name, pytest.approx(confidence)) for name, confidence in main._select_top(scored)]
+    assert not built
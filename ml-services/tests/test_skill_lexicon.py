@@ -0,0 +1,45 @@
+"""Single-pass skill extraction"""
+
+import random
+import re
+
+from app.services.skill_lexicon import SKILL_ALIASES, SKILL_LEXICON, SkillLexicon
+
+
+def _scan(text):
+    # One boundary-aware search per skill and alias: the behaviour the lexicon replaces
+    text = text.lower()
+    found = set()
+    for keyword, name in [(name, name) for name in SKILL_LEXICON.skills] + list(SKILL_ALIASES.items()):
+        if re.search(r"(?<![0-9a-z])" + re.escape(keyword) + r"(?![0-9a-z])", text):
+            found.add(name)
+    return found
+
+
+def test_match_equals_per_skill_scan():
+    rng = random.Random(5)
+    vocabulary = list(SKILL_LEXICON.skills) + list(SKILL_ALIASES) + ["good", "golang2", "xpython", "and", "with"]
+    for _ in range(400):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(0, 12))]
+        text = "".join(word + rng.choice([" ", ", ", "/", ".", "-", ""]) for word in words)
+        if rng.random() < 0.5:
+            text = text.upper()
+        assert SKILL_LEXICON.match(text) == _scan(text), text
+
+
+def test_boundaries_and_aliases():
+    assert SKILL_LEXICON.match("Good communication, Golang and C++ (C#)") == {"go", "c++", "c#"}
+    assert SKILL_LEXICON.match("ReactJS, node.js and k8s on Amazon Web Services") == \
+        {"react", "node", "kubernetes", "aws"}
+    assert SKILL_LEXICON.match("javascripting pythonic") == set()
+
+
+def test_confidence_order_and_technical_filter():
+    matched = SKILL_LEXICON.match("figma, python and sql")
+    assert SKILL_LEXICON.with_confidence(matched) == [("python", 0.9), ("sql", 0.8), ("figma", 0.8)]
+    assert sorted(SKILL_LEXICON.technical(matched)) == ["python", "sql"]
+
+
+def test_aliases_of_unknown_skills_are_ignored():
+    lexicon = SkillLexicon({"programming": {"python": 0.9}}, {"py": "python", "golang": "go"})
+    assert lexicon.match("py and golang") == {"python"}
@@ -0,0 +1,86 @@
+"""Per-stage latency accounting and its /recommend and /metrics/pipeline surfaces"""
+
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.services import stage_timing
+from app.services.stage_timing import StageStats, StageTimer
+
+
+def test_snapshot_percentiles_over_a_rolling_window():
+    stats = StageStats(window=4)
+    for seconds in (1.0, 0.001, 0.002, 0.003, 0.004):
+        stats.record("recommend", {"retrieve": seconds}, candidates=int(seconds * 1000))
+    report = stats.snapshot()["recommend"]
+    # Five requests counted, the oldest sample left the window
+    assert report["requests"] == 5
+    assert report["candidates_mean"] == 2.5
+    retrieve = report["stages"]["retrieve"]
+    ms = np.array([1.0, 2.0, 3.0, 4.0])
+    assert retrieve["samples"] == 4
+    assert retrieve["mean_ms"] == pytest.approx(ms.mean())
+    assert retrieve["p50_ms"] == pytest.approx(np.percentile(ms, 50))
+    assert retrieve["p99_ms"] == pytest.approx(np.percentile(ms, 99))
+    stats.clear()
+    assert stats.snapshot() == {}
+
+
+def test_timer_adds_up_repeated_stages(monkeypatch):
+    clock = iter([0.0, 0.5, 1.0, 1.25, 2.0, 2.5])
+    monkeypatch.setattr(stage_timing.time, "perf_counter", lambda: next(clock))
+    stats = StageStats()
+    timer = StageTimer("recommend", stats)
+    with timer.stage("retrieve"):
+        pass
+    with timer.stage("retrieve"):
+        pass
+    with pytest.raises(RuntimeError):
+        with timer.stage("rerank"):
+            raise RuntimeError("timed anyway")
+    assert timer.durations == {"retrieve": 0.75, "rerank": 0.5}
+    assert timer.server_timing() == "retrieve;dur=750.000, rerank;dur=500.000"
+    timer.finish()
+    assert stats.snapshot()["recommend"]["stages"]["rerank"]["samples"] == 1
+
+
+def test_concurrent_records_are_all_counted():
+    stats = StageStats()
+
+    def worker():
+        for _ in range(500):
+            stats.record("recommend", {"retrieve": 0.001, "rerank": 0.002}, candidates=3)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = stats.snapshot()["recommend"]
+    assert report["requests"] == 4000
+    assert report["stages"]["rerank"]["samples"] == min(4000, stats.window)
+
+
+def _requests(client, pipeline):
+    return client.get("/metrics/pipeline").json().get(pipeline, {}).get("requests", 0)
+
+
+def test_recommend_reports_its_stages():
+    main.RESPONSE_CACHE.clear()
+    client = TestClient(main.app)
+    single, batch = _requests(client, "recommend"), _requests(client, "recommend_batch")
+    response = client.post("/recommend", json={"type": "interests", "interests": ["fintech", "cloud"]})
+    assert response.status_code == 200
+    assert [part.split(";")[0] for part in response.headers["server-timing"].split(", ")] == \
+        ["retrieve", "rerank", "build"]
+    client.post("/recommend/batch", json={"items": [{"type": "interests", "interests": ["cloud"]}] * 3})
+
+    report = client.get("/metrics/pipeline").json()
+    assert report["recommend"]["requests"] == single + 1
+    assert report["recommend"]["candidates_mean"] > 0
+    # One run per batch chunk
+    assert report["recommend_batch"]["requests"] == batch + 1
+    assert set(report["recommend_batch"]["stages"]) == {"retrieve", "rerank", "build"}
@@ -0,0 +1,90 @@
+"""Catalog TF-IDF index: one matrix-vector product per query equals per-pair cosine similarity"""
+
+import numpy as np
+import pytest
+
+from app.services.catalog import Catalog, document_text
+from app.services.ml_engine import ml_engine
+from app.services.tfidf_index import TfidfIndex
+
+QUERIES = [
+    "python machine learning data analysis",
+    "react javascript frontend web development",
+    "financial analysis risk management compliance",
+    "java spring microservices cloud",
+    "zzzz unknown terms only",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def index(companies):
+    names = list(companies)
+    return TfidfIndex(names, [document_text(companies[name]) for name in names])
+
+
+def _cosine(a, b):
+    a, b = a.toarray().ravel(), b.toarray().ravel()
+    norm = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(a @ b / norm) if norm else 0.0
+
+
+def test_similarities_match_per_pair_cosine(index, companies):
+    documents = [document_text(companies[name]) for name in index.names]
+    for query in QUERIES:
+        scores = index.similarities(query)
+        assert scores.shape == (len(companies),) and scores.dtype == np.float32
+        for row, document in enumerate(documents):
+            expected = _cosine(index.vector(query), index.vector(document))
+            assert scores[row] == pytest.approx(expected, abs=1e-5)
+            assert index.similarity(query, document) == pytest.approx(expected, abs=1e-5)
+
+
+def test_unknown_terms_score_zero(index):
+    assert not index.similarities("zzzz qqqq").any()
+    assert index.similarity("zzzz", "python") == 0.0
+
+
+def test_query_rows_are_cached_read_only(index):
+    scores = index.similarities(QUERIES[0])
+    assert index.similarities(QUERIES[0]) is scores
+    with pytest.raises(ValueError):
+        scores[0] = 1.0
+
+
+def test_engine_fallback_reads_the_index(companies, monkeypatch):
+    # No sentence model: skill similarity is the company's TF-IDF row
+    monkeypatch.setattr(ml_engine, "_ensure_company_embeddings", lambda: None)
+    index = ml_engine.tfidf_index
+    assert index is not None and index.names == list(ml_engine.catalog.names)
+    skills = ["Python", "SQL", "Machine Learning"]
+    similarities = ml_engine.company_skill_similarities(skills)
+    np.testing.assert_array_equal(similarities, index.similarities(" ".join(skills)))
+    for name in list(companies)[:10]:
+        row = index.row_of[name]
+        assert ml_engine._company_skill_similarity(skills, name, []) == pytest.approx(float(similarities[row]))
+
+
+def test_retrieve_candidates_keeps_the_most_similar(companies, monkeypatch):
+    monkeypatch.setattr(ml_engine, "ann_candidates", lambda *args, **kwargs: None)
+    names = list(ml_engine.catalog.names)
+    query = "python machine learning cloud"
+    similarities = ml_engine.tfidf_index.similarities(query)
+    kept = ml_engine.retrieve_candidates(query, names, limit=10)
+    assert kept == [name for name in names if name in set(kept)]
+    # Nothing left out scores higher than anything kept
+    kept_rows = [names.index(name) for name in kept]
+    dropped = np.delete(similarities, kept_rows)
+    assert len(kept) == 10 and similarities[kept_rows].min() >= dropped.max()
+    assert ml_engine.retrieve_candidates(query, names, limit=len(names)) == names
+
+
+def test_index_follows_the_served_catalog(companies, monkeypatch):
+    monkeypatch.setattr(ml_engine, "_tfidf_state", None)
+    first = ml_engine.tfidf_index
+    assert ml_engine.tfidf_index is first
+    smaller = dict(list(companies.items())[:30])
+    monkeypatch.setattr(ml_engine, "catalog", Catalog({"companies": smaller}, "smaller"))
+    assert ml_engine.tfidf_index is not first and len(ml_engine.tfidf_index) == 30
+    monkeypatch.setattr(ml_engine, "catalog", Catalog({"companies": {}}, "empty"))
+    assert ml_engine.tfidf_index is None
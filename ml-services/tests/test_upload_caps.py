@@ -0,0 +1,152 @@
+"""Upload spooling and the byte / page / character / uncompressed-size budgets"""
+
+import asyncio
+import io
+import os
+import zipfile
+
+import pytest
+
+from app.services import resume_parser
+from app.services.resume_parser import (
+    DocumentTooLarge,
+    UploadTooLarge,
+    discard_upload,
+    extract_member,
+    extract_text_generic,
+    spool_upload,
+)
+
+
+class _Upload:
+    """The slice of starlette's UploadFile that spool_upload() reads"""
+
+    def __init__(self, data: bytes, filename: str = "resume.txt", size=None):
+        self._stream = io.BytesIO(data)
+        self.filename = filename
+        self.size = size
+        self.reads = 0
+
+    async def read(self, n: int = -1) -> bytes:
+        self.reads += 1
+        return self._stream.read(n)
+
+
+def _spool(data: bytes, **kwargs):
+    return asyncio.run(spool_upload(_Upload(data, **kwargs.pop("upload", {})), **kwargs))
+
+
+def test_small_upload_stays_in_memory():
+    data = b"python developer " * 100
+    upload, size = _spool(data, max_bytes=1 << 20, spool_bytes=1 << 20)
+    assert upload == data
+    assert size == len(data)
+
+
+def test_large_upload_spools_to_a_temp_file():
+    data = os.urandom(3 * resume_parser.UPLOAD_CHUNK_BYTES + 17)
+    upload, size = _spool(data, max_bytes=1 << 20, spool_bytes=1024, upload={"filename": "cv.pdf"})
+    try:
+        assert isinstance(upload, str) and upload.endswith(".pdf")
+        assert size == len(data)
+        with open(upload, "rb") as f:
+            assert f.read() == data
+    finally:
+        discard_upload(upload)
+    assert not os.path.exists(upload)
+
+
+def test_declared_size_over_the_cap_is_refused_without_reading():
+    upload = _Upload(b"x" * 10, size=10_000)
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(spool_upload(upload, max_bytes=1000))
+    assert upload.reads == 0
+
+
+def test_streamed_size_over_the_cap_is_refused_and_the_temp_file_removed(monkeypatch, tmp_path):
+    monkeypatch.setattr(resume_parser.tempfile, "tempdir", str(tmp_path))
+    data = b"y" * (4 * resume_parser.UPLOAD_CHUNK_BYTES)
+    with pytest.raises(UploadTooLarge):
+        # No declared size: the cap is enforced while reading
+        _spool(data, max_bytes=2 * resume_parser.UPLOAD_CHUNK_BYTES + 1, spool_bytes=1024)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_discard_upload_ignores_bytes_and_missing_files(tmp_path):
+    discard_upload(b"in memory")
+    discard_upload(str(tmp_path / "already-gone.pdf"))
+
+
+def _archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return zipfile.ZipFile(buffer)
+
+
+def test_extract_member_round_trips_and_caps():
+    small = b"java spring " * 50
+    big = b"z" * 5000
+    with _archive({"a.txt": small, "b.txt": big}) as archive:
+        upload, size = extract_member(archive, archive.getinfo("a.txt"), max_bytes=4096)
+        assert (upload, size) == (small, len(small))
+        with pytest.raises(UploadTooLarge):
+            extract_member(archive, archive.getinfo("b.txt"), max_bytes=4096)
+
+
+def test_text_over_the_character_budget_is_refused(monkeypatch):
+    monkeypatch.setattr(resume_parser, "PARSE_MAX_CHARS", 100)
+    assert extract_text_generic("cv.txt", b"a" * 100, "text/plain") == "a" * 100
+    with pytest.raises(DocumentTooLarge):
+        extract_text_generic("cv.txt", b"a" * 101, "text/plain")
+
+
+def test_pdf_page_budget():
+    if resume_parser.PyPDF2 is None:
+        pytest.skip("PyPDF2 not installed")
+    writer = resume_parser.PyPDF2.PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=72, height=72)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+
+    buffer.seek(0)
+    assert resume_parser._extract_text_from_pdf(buffer, max_pages=3) == "\n\n"
+    buffer.seek(0)
+    with pytest.raises(DocumentTooLarge):
+        resume_parser._extract_text_from_pdf(buffer, max_pages=2)
+
+
+def _docx(paragraphs):
+    document = resume_parser.docx.Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_docx_character_and_uncompressed_budgets():
+    if resume_parser.docx is None:
+        pytest.skip("python-docx not installed")
+    paragraphs = ["Python and SQL", "Docker on AWS"]
+    assert resume_parser._extract_text_from_docx(_docx(paragraphs)) == "\n".join(paragraphs)
+    with pytest.raises(DocumentTooLarge):
+        resume_parser._extract_text_from_docx(_docx(paragraphs), max_chars=20)
+    with pytest.raises(DocumentTooLarge):
+        resume_parser._extract_text_from_docx(_docx(paragraphs), max_uncompressed=1000)
+
+
+def test_parse_resume_maps_budgets_to_413(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    monkeypatch.setattr(resume_parser, "PARSE_MAX_CHARS", 1000)
+    client = TestClient(app)
+    response = client.post("/parse_resume", files={"file": ("cv.txt", b"b" * 2000, "text/plain")})
+    assert response.status_code == 413
+    assert "too large" in response.json()["detail"]